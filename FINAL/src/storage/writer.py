@@ -17,7 +17,8 @@ class VideoWriter:
         output_path: str,
         fourcc: str = 'mp4v',
         fps: float = 30.0,
-        frame_size: Optional[Tuple[int, int]] = None
+        frame_size: Optional[Tuple[int, int]] = None,
+        hw_accel: bool = True
     ):
         """
         Inicializa el escritor de video.
@@ -27,12 +28,17 @@ class VideoWriter:
             fourcc: Código de codec (ej: 'mp4v', 'H264', 'XVID')
             fps: Frames por segundo
             frame_size: Tamaño del frame (width, height), None para auto-detectar
+            hw_accel: Intentar H.264 con encoder por hardware (NVENC/QSV) antes
+                de usar el fourcc indicado
         """
         self.output_path = output_path
         self.fourcc_str = fourcc
         self.fps = fps
         self.frame_size = frame_size
+        self.hw_accel = hw_accel
         self.writer: Optional[cv2.VideoWriter] = None
+        # True si el writer abierto codifica por hardware (H.264)
+        self.hw_encoding = False
         self.lock = threading.RLock()
         self.is_open = False
         self.frame_count = 0
@@ -61,23 +67,67 @@ class VideoWriter:
             # Crear directorio si no existe
             Path(self.output_path).parent.mkdir(parents=True, exist_ok=True)
 
-            # Configurar codec
-            fourcc = cv2.VideoWriter_fourcc(*self.fourcc_str)
+            # Probar primero encoder por hardware (si está disponible)
+            if self.hw_accel:
+                self.writer = self._open_hw_writer()
+            self.hw_encoding = self.writer is not None
 
-            # Crear writer
-            self.writer = cv2.VideoWriter(
-                self.output_path,
-                fourcc,
-                self.fps,
-                self.frame_size
-            )
+            if self.writer is None:
+                # Configurar codec
+                fourcc = cv2.VideoWriter_fourcc(*self.fourcc_str)
+
+                # Crear writer
+                self.writer = cv2.VideoWriter(
+                    self.output_path,
+                    fourcc,
+                    self.fps,
+                    self.frame_size
+                )
 
             if not self.writer.isOpened():
+                self.writer.release()
+                self.writer = None
                 return False
 
             self.is_open = True
             return True
 
+    def _open_hw_writer(self) -> Optional[cv2.VideoWriter]:
+        """
+        Intenta abrir un writer H.264 (avc1) con aceleración por hardware.
+
+        No modifica fourcc_str: si no hay encoder por hardware se usa el
+        fourcc pedido, no un avc1 por software.
+
+        Returns:
+            El writer abierto, o None si el backend/GPU no lo soporta
+        """
+        # OpenCV < 4.5.2 no expone las propiedades de aceleración
+        if not hasattr(cv2, 'VIDEOWRITER_PROP_HW_ACCELERATION'):
+            return None
+
+        try:
+            writer = cv2.VideoWriter(
+                self.output_path,
+                cv2.CAP_FFMPEG,
+                cv2.VideoWriter_fourcc(*'avc1'),
+                self.fps,
+                self.frame_size,
+                [cv2.VIDEOWRITER_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY]
+            )
+        except cv2.error:
+            return None
+
+        # isOpened() sólo dice que el backend aceptó el pedido: FFmpeg puede
+        # caer a un encoder por software sin avisar. La aceleración efectiva
+        # se lee de la propiedad una vez abierto.
+        if (not writer.isOpened()
+                or writer.get(cv2.VIDEOWRITER_PROP_HW_ACCELERATION) == cv2.VIDEO_ACCELERATION_NONE):
+            writer.release()
+            return None
+
+        return writer
+
     def write(self, frame: np.ndarray) -> bool:
         """
         Escribe un frame al video.
@@ -113,7 +163,9 @@ class VideoWriter:
         with self.lock:
             if self.is_open and self.writer is not None:
                 self.writer.release()
+                self.writer = None
                 self.is_open = False
+                self.hw_encoding = False
                 print(f"Video guardado: {self.output_path} ({self.frame_count} frames)")
 
     def __enter__(self):
@@ -10,6 +10,7 @@ import time
 import cv2
 import numpy as np
 from celery import Celery
+from celery.signals import worker_process_init
 from typing import Dict, Any, Tuple
 import psutil
 import logging
@@ -55,6 +56,28 @@ app.conf.update(
 sys.path.insert(0, os.path.dirname(__file__))
 from filters import apply_blur, apply_edge_detection, detect_and_draw_faces, detect_motion, FaceDetector, MotionDetector
 
+# Estado por proceso worker (detectores reutilizables entre frames)
+_WORKER_STATE: Dict[str, Any] = {}
+
+
+@worker_process_init.connect
+def _init_worker_state(**kwargs) -> None:
+    """
+    Inicializa los detectores al arrancar cada proceso worker.
+
+    Así el costo de cargar los clasificadores Haar no cae en la latencia
+    del primer frame procesado.
+    """
+    _WORKER_STATE['face_detector'] = FaceDetector()
+    _WORKER_STATE['motion_detectors'] = {}
+
+
+def _worker_state() -> Dict[str, Any]:
+    """Retorna el estado del worker, inicializándolo si no pasó por el hook (ej: pool solo)."""
+    if not _WORKER_STATE:
+        _init_worker_state()
+    return _WORKER_STATE
+
 
 @app.task(bind=True, max_retries=3, default_retry_delay=5, queue='frames', name='process_frame')
 def process_frame(
@@ -74,6 +97,10 @@ def process_frame(
     metadata = metadata or {}
 
     try:
+        # Dentro del try: si falla la inicialización del estado del worker
+        # (p. ej. el modelo de FaceDetector) se reporta como error del frame
+        state = _worker_state()
+
         # Decodificar frame
         nparr = np.frombuffer(frame_data, np.uint8)
         frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
@@ -103,27 +130,23 @@ def process_frame(
             filter_name = f"edges_{params.get('edge_type', 'canny')}"
 
         elif processing_type == "faces":
-            # Inicializar detector compartido (FaceDetector no tiene estado por frame)
-            if not hasattr(self, 'face_detector'):
-                self.face_detector = FaceDetector()
-
+            # Detector compartido (FaceDetector no tiene estado por frame)
             params = metadata.get("face_params", {})
-            processed_frame = detect_and_draw_faces(frame, self.face_detector, params)
+            processed_frame = detect_and_draw_faces(frame, state['face_detector'], params)
             filter_name = "face_detection"
 
         elif processing_type == "motion":
             # Usar detector por sesión para evitar mezclar estado entre videos
-            if not hasattr(self, 'motion_detectors'):
-                self.motion_detectors = {}
-
+            motion_detectors = state['motion_detectors']
             session_id = metadata.get('session_id', 'default')
-            if session_id not in self.motion_detectors:
-                self.motion_detectors[session_id] = MotionDetector()
+            motion_detector = motion_detectors.get(session_id)
+            if motion_detector is None:
+                motion_detector = motion_detectors[session_id] = MotionDetector()
 
             params = metadata.get("motion_params", {"motion_type": "diff"})
             processed_frame = detect_motion(
                 frame,
-                self.motion_detectors[session_id],
+                motion_detector,
                 motion_type=params.get("motion_type", "diff"),
                 params=params
             )
@@ -144,9 +167,7 @@ def process_frame(
                 elif filter_type == "edges":
                     processed_frame = apply_edge_detection(processed_frame, params=filter_params)
                 elif filter_type == "faces":
-                    if not hasattr(self, 'face_detector'):
-                        self.face_detector = FaceDetector()
-                    processed_frame = detect_and_draw_faces(processed_frame, self.face_detector, filter_params)
+                    processed_frame = detect_and_draw_faces(processed_frame, state['face_detector'], filter_params)
 
                 filter_name += filter_type + "_"
 
@@ -1,61 +1,215 @@
+import argparse
 import multiprocessing
 import os
 import time
 import random
 import datetime
 import hashlib
+import hmac
 import json
-import statistics
+import math
 import queue
 import select
+import struct
+from collections import deque
+from typing import NamedTuple
 
 # --- Constantes y Configuraciones ---
 NUM_SAMPLES = 60
 WINDOW_SIZE = 30
 PIPE_BUFFER_SIZE = 4096 
+# Muestra empaquetada en binario para el pipe: timestamp (epoch en segundos),
+# frecuencia, presión sistólica, presión diastólica y oxígeno (SAMPLE_RECORD.size = 15 bytes)
+SAMPLE_RECORD = struct.Struct('<qHHHB')
+BLOCK_TIMEOUT = 2 # Segundos que el verificador espera los tres resultados de un timestamp
 BLOCKCHAIN_FILE = "blockchain.json"
+CHECKPOINT_FILE = BLOCKCHAIN_FILE + ".ckpt"
+# Clave HMAC del checkpoint. Sin clave no se escriben ni se confía en checkpoints.
+CHECKPOINT_KEY = os.environ.get("BLOCKCHAIN_KEY", "").encode('utf-8')
+
+
+def sha256_hex(message):
+    """Devuelve el SHA-256 en hexadecimal de un mensaje en bytes."""
+    return hashlib.sha256(message).hexdigest()
+
+# Encoders preconstruidos: json.dumps(..., sort_keys=True) arma un JSONEncoder
+# nuevo en cada llamada; así se construyen una sola vez
+_encode_json = json.JSONEncoder().encode
+_encode_json_sorted = json.JSONEncoder(sort_keys=True).encode
+
+
+def block_message(timestamp, data, alert, prev_hash):
+    """
+    Devuelve los bytes que se hashean para un bloque: prev_hash seguido del
+    JSON canónico del bloque sin hash.
+
+    Equivale a json.dumps(block_dict, sort_keys=True), pero como las claves
+    del bloque son fijas se arma directamente en orden alfabético y solo se
+    ordena el diccionario de datos.
+    """
+    block_string = (
+        '{"alerta": ' + _encode_json(alert)
+        + ', "datos": ' + _encode_json_sorted(data)
+        + ', "prev_hash": ' + _encode_json(prev_hash)
+        + ', "timestamp": ' + _encode_json(timestamp) + '}'
+    )
+    return (prev_hash + block_string).encode('utf-8')
 
 # --- Clase para el Bloque de la Cadena de Bloques ---
 class Block:
-    def __init__(self, timestamp, data, alert, prev_hash=''):
+    def __init__(self, timestamp, data, alert, prev_hash='', block_hash=None):
         self.timestamp = timestamp
         self.data = data
         self.alert = alert
         self.prev_hash = prev_hash
-        self.hash = self.calculate_hash()
+        self._message = None
+        # Si el hash ya fue calculado (ej: al cargar la cadena) no se recalcula
+        self.hash = block_hash if block_hash is not None else self.calculate_hash()
+
+        # El bloque es inmutable después de construido: las dos vistas en
+        # diccionario se arman una sola vez y to_dict() las reutiliza
+        self._dict = {
+            "timestamp": timestamp,
+            "datos": data,
+            "alerta": alert,
+            "prev_hash": prev_hash
+        }
+        self._full_dict = {**self._dict, "hash": self.hash}
+
+    def canonical_bytes(self):
+        # El bloque no se modifica después de creado: se serializa una sola vez
+        if self._message is None:
+            self._message = block_message(self.timestamp, self.data, self.alert, self.prev_hash)
+        return self._message
 
     def calculate_hash(self):
-        block_string = json.dumps(self.to_dict(include_hash=False), sort_keys=True)
-        return hashlib.sha256((self.prev_hash + block_string).encode('utf-8')).hexdigest()
+        return sha256_hex(self.canonical_bytes())
 
     def to_dict(self, include_hash=True):
-        block_dict = {
-            "timestamp": self.timestamp,
-            "datos": self.data,
-            "alerta": self.alert,
-            "prev_hash": self.prev_hash
-        }
-        if include_hash:
-            block_dict["hash"] = self.hash
-        return block_dict
+        # Devuelve el diccionario cacheado: no debe modificarse
+        return self._full_dict if include_hash else self._dict
+
+# --- Resultado de un analizador (lo que viaja por la cola al verificador) ---
+class AnalysisResult(NamedTuple):
+    timestamp: str
+    tipo: str
+    media: float
+    desv: float
+
+# --- Ventana móvil con estadísticas incrementales ---
+class RunningWindow:
+    """
+    Ventana de los últimos `size` valores con suma y suma de cuadrados
+    acumuladas, para obtener media y desviación estándar en O(1).
+    """
+    __slots__ = ("values", "total", "sq_total")
+
+    def __init__(self, size):
+        self.values = deque(maxlen=size)
+        self.total = 0
+        self.sq_total = 0
+
+    def push(self, value):
+        values = self.values
+        if len(values) == values.maxlen:
+            # El deque descarta el más viejo al hacer append
+            oldest = values[0]
+            self.total -= oldest
+            self.sq_total -= oldest * oldest
+        values.append(value)
+        self.total += value
+        self.sq_total += value * value
+
+    def mean(self):
+        n = len(self.values)
+        return self.total / n if n else 0
+
+    def stdev(self):
+        n = len(self.values)
+        if n < 2:
+            return 0
+        # Varianza muestral; con enteros el numerador es exacto
+        variance = (n * self.sq_total - self.total * self.total) / (n * (n - 1))
+        return math.sqrt(max(variance, 0))
 
 # --- Funciones de Blockchain ---
+def _checkpoint_mac(n_blocks, last_hash, file_size):
+    message = f"{n_blocks}:{last_hash}:{file_size}".encode('utf-8')
+    return hmac.new(CHECKPOINT_KEY, message, 'sha256').hexdigest()
+
+def write_checkpoint(blockchain):
+    """
+    Guarda (cantidad de bloques, último hash, tamaño del archivo) firmado con
+    HMAC, para que la próxima carga pueda saltear el recálculo de hashes.
+    Se escribe a un temporal y se renombra para que sea atómico.
+    """
+    if not CHECKPOINT_KEY or not blockchain:
+        return
+    file_size = os.path.getsize(BLOCKCHAIN_FILE)
+    checkpoint = {
+        "n": len(blockchain),
+        "h": blockchain[-1].hash,
+        "size": file_size,
+        "mac": _checkpoint_mac(len(blockchain), blockchain[-1].hash, file_size)
+    }
+    tmp_path = CHECKPOINT_FILE + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, CHECKPOINT_FILE)
+
+def _load_checkpoint():
+    """Devuelve el checkpoint si su firma es válida y coincide con el archivo actual."""
+    if not CHECKPOINT_KEY or not os.path.exists(CHECKPOINT_FILE):
+        return None
+    try:
+        with open(CHECKPOINT_FILE, 'r') as f:
+            checkpoint = json.load(f)
+        expected_mac = _checkpoint_mac(checkpoint["n"], checkpoint["h"], checkpoint["size"])
+    except (OSError, ValueError, KeyError):
+        return None
+    if not hmac.compare_digest(expected_mac, checkpoint["mac"]):
+        return None
+    if checkpoint["size"] != os.path.getsize(BLOCKCHAIN_FILE):
+        return None
+    return checkpoint
+
 def load_blockchain():
     if os.path.exists(BLOCKCHAIN_FILE) and os.path.getsize(BLOCKCHAIN_FILE) > 0:
+        checkpoint = _load_checkpoint()
         with open(BLOCKCHAIN_FILE, 'r') as f:
             try:
                 raw_blocks = json.load(f)
+
+                # Checkpoint válido: el archivo no cambió desde que se firmó, se
+                # confía en los hashes guardados sin recalcularlos
+                if (checkpoint is not None and raw_blocks
+                        and checkpoint["n"] == len(raw_blocks)
+                        and checkpoint["h"] == raw_blocks[-1]["hash"]):
+                    blockchain = [
+                        Block(b["timestamp"], b["datos"], b["alerta"], b["prev_hash"], block_hash=b["hash"])
+                        for b in raw_blocks
+                    ]
+                    print(f"Cadena de bloques cargada con {len(blockchain)} bloques (checkpoint válido).")
+                    return blockchain
+
+                # Recalcular todos los hashes en una sola pasada
+                messages = [
+                    block_message(b["timestamp"], b["datos"], b["alerta"], b["prev_hash"])
+                    for b in raw_blocks
+                ]
+                hashes = [sha256_hex(m) for m in messages]
+
                 blockchain = []
-                for b_data in raw_blocks:
-                    block = Block(
+                for b_data, block_hash in zip(raw_blocks, hashes):
+                    if block_hash != b_data["hash"]:
+                        print(f"ADVERTENCIA: Hash del bloque {b_data['timestamp']} no coincide al cargar.")
+                    blockchain.append(Block(
                         b_data["timestamp"],
                         b_data["datos"],
                         b_data["alerta"],
-                        b_data["prev_hash"]
-                    )
-                    if block.hash != b_data["hash"]:
-                        print(f"ADVERTENCIA: Hash del bloque {b_data['timestamp']} no coincide al cargar.")
-                    blockchain.append(block)
+                        b_data["prev_hash"],
+                        block_hash=block_hash
+                    ))
                 print(f"Cadena de bloques cargada con {len(blockchain)} bloques.")
                 return blockchain
             except json.JSONDecodeError:
@@ -63,40 +217,97 @@ def load_blockchain():
                 return []
     return []
 
-def save_blockchain(blockchain_list):
-    with open(BLOCKCHAIN_FILE, 'w') as f:
-        json.dump([b.to_dict() for b in blockchain_list], f, indent=4)
+def append_block(chain_file, block):
+    """
+    Agrega un bloque al final de blockchain.json sin reescribir el archivo.
+
+    El archivo sigue siendo un arreglo JSON válido (mismo formato que
+    json.dump(..., indent=4)): se retrocede sobre el ']' final, se escribe
+    el bloque nuevo y se vuelve a cerrar el arreglo. Así cada bloque cuesta
+    O(1) bytes escritos en lugar de volcar la cadena entera.
+    """
+    # json.dumps de una lista de un elemento -> "[\n    {...}\n]"; nos quedamos con el elemento
+    item = json.dumps([block.to_dict()], indent=4)[2:-2].encode('utf-8')
+
+    chain_file.seek(0, os.SEEK_END)
+    size = chain_file.tell()
+    if size == 0:
+        chain_file.write(b"[\n" + item + b"\n]")
+    else:
+        tail_len = min(size, 64)
+        chain_file.seek(size - tail_len)
+        tail = chain_file.read(tail_len).rstrip()
+        if not tail.endswith(b"]"):
+            raise ValueError(f"{BLOCKCHAIN_FILE} no termina en ']', no se puede agregar el bloque")
+        body = tail[:-1].rstrip()
+        chain_file.seek(size - tail_len + len(body))
+        chain_file.truncate()
+        separator = b"\n" if body.endswith(b"[") else b",\n"
+        chain_file.write(separator + item + b"\n]")
+    chain_file.flush()
+
+# --- Afinidad de CPU ---
+def pin_process(cpu, realtime=False):
+    """
+    Fija el proceso actual a una CPU y, si se pide, lo pasa a SCHED_FIFO con
+    prioridad mínima. Si el sistema no lo soporta (no Linux) o no hay permisos,
+    se sigue con la planificación normal.
+    """
+    if cpu is None:
+        return
+    try:
+        os.sched_setaffinity(0, {cpu})
+    except (AttributeError, OSError):
+        pass
+    if realtime:
+        try:
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(1))
+        except (AttributeError, OSError):
+            pass
 
 # --- Proceso Principal (Generador de Datos) ---
-def data_generator(freq_pipe_w, pres_pipe_w, oxy_pipe_w, stop_event):
+def data_generator(pipes_w, stop_event, cpu=None):
     pid = os.getpid()
+    pin_process(cpu)
     print(f"[Generador PID: {pid}] Iniciado.")
 
+    # Referencias locales para evitar búsquedas de atributos en cada iteración
+    now_fn = datetime.datetime.now
+    randint = random.randint
+    pack = SAMPLE_RECORD.pack
+    write = os.write
+
+    # Cada muestra i sale en t0 + i segundos: el tiempo de trabajo del loop no
+    # se acumula como deriva (antes se sumaba trabajo + sleep(1) por muestra)
+    t0 = time.monotonic()
+
     for i in range(NUM_SAMPLES):
         if stop_event.is_set():
             print(f"[Generador PID: {pid}] Detenido por evento de stop.")
             break
 
-        timestamp = datetime.datetime.now().isoformat(timespec='seconds')
-
-        frecuencia = random.randint(60, 180)
-        presion_sistolica = random.randint(110, 180)
-        presion_diastolica = random.randint(70, 110)
-        oxigeno = random.randint(90, 100)
-
-        data = {
-            "timestamp": timestamp,
-            "frecuencia": frecuencia,
-            "presion": [presion_sistolica, presion_diastolica],
-            "oxigeno": oxigeno
-        }
-
-        data_str = json.dumps(data)
+        now = now_fn()
+        timestamp = now.isoformat(timespec='seconds')
+
+        frecuencia = randint(60, 180)
+        presion_sistolica = randint(110, 180)
+        presion_diastolica = randint(70, 110)
+        oxigeno = randint(90, 100)
+
+        # Los mismos campos del diccionario de la muestra ("timestamp", "frecuencia",
+        # "presion" [sist, diast], "oxigeno"), empaquetados con struct en lugar de JSON.
+        # Registro de tamaño fijo (< PIPE_BUF): cada write es atómico.
+        frame = pack(
+            int(now.timestamp()),
+            frecuencia,
+            presion_sistolica,
+            presion_diastolica,
+            oxigeno
+        )
 
         try:
-            os.write(freq_pipe_w, data_str.encode('utf-8'))
-            os.write(pres_pipe_w, data_str.encode('utf-8'))
-            os.write(oxy_pipe_w, data_str.encode('utf-8'))
+            for pipe_w in pipes_w:
+                write(pipe_w, frame)
             print(f"[Generador PID: {pid}] Enviado muestra {i+1}/{NUM_SAMPLES} ({timestamp}).")
         except BrokenPipeError:
             print(f"[Generador PID: {pid}] Error: Pipe roto. El receptor pudo haber terminado.")
@@ -105,20 +316,30 @@ def data_generator(freq_pipe_w, pres_pipe_w, oxy_pipe_w, stop_event):
             print(f"[Generador PID: {pid}] Error al escribir en pipe: {e}")
             break
 
-        time.sleep(1)
+        # Esperar hasta el próximo deadline; stop_event.wait permite que el
+        # evento de stop interrumpa la espera en lugar de dormir el segundo entero
+        remaining = t0 + (i + 1) - time.monotonic()
+        if remaining > 0:
+            stop_event.wait(remaining)
 
     print(f"[Generador PID: {pid}] Finalizado. Cerrando pipes de escritura.")
-    os.close(freq_pipe_w)
-    os.close(pres_pipe_w)
-    os.close(oxy_pipe_w)
+    for pipe_w in pipes_w:
+        os.close(pipe_w)
 
 
 # --- Proceso Analizador (Genérico) ---
-def analyzer_process(pipe_r, result_queue, analysis_type, stop_event):
+def analyzer_process(pipe_r, result_queue, analysis_type, stop_event, cpu=None):
     pid = os.getpid()
+    pin_process(cpu)
     print(f"[Analizador {analysis_type.capitalize()} PID: {pid}] Iniciado.")
 
-    data_window = [] # Ventana móvil de los últimos 30 segundos
+    data_window = RunningWindow(WINDOW_SIZE) # Ventana móvil de los últimos 30 segundos
+    # Buffer de lectura preasignado: os.readv escribe directo en él (sin crear
+    # un bytes nuevo por lectura). `filled` marca cuántos bytes tiene cargados.
+    record_size = SAMPLE_RECORD.size
+    read_buffer = bytearray(PIPE_BUFFER_SIZE + record_size)
+    read_view = memoryview(read_buffer)
+    filled = 0
     
     # Hacer el pipe no bloqueante para el select, aunque os.read() sigue siendo bloqueante.
     # select.select es lo que nos permite el timeout.
@@ -137,49 +358,47 @@ def analyzer_process(pipe_r, result_queue, analysis_type, stop_event):
 
         if ready_to_read: # Si hay datos disponibles
             try:
-                data_str = os.read(pipe_r, PIPE_BUFFER_SIZE).decode('utf-8')
+                n_read = os.readv(pipe_r, [read_view[filled:]])
 
-                if not data_str: # Pipe cerrado por el escritor (EOF)
+                if not n_read: # Pipe cerrado por el escritor (EOF)
                     print(f"[Analizador {analysis_type.capitalize()} PID: {pid}] Pipe cerrado por el generador (EOF).")
                     break # Sale del bucle
 
-                full_data = json.loads(data_str)
-                current_timestamp = full_data["timestamp"]
-
-                signal_value = None
-                if analysis_type == "frecuencia":
-                    signal_value = full_data["frecuencia"]
-                elif analysis_type == "presion":
-                    signal_value = full_data["presion"][0]
-                elif analysis_type == "oxigeno":
-                    signal_value = full_data["oxigeno"]
-                
-                if signal_value is not None:
-                    data_window.append(signal_value)
-                    if len(data_window) > WINDOW_SIZE:
-                        data_window.pop(0)
-
-                    media = 0
-                    desv = 0
-                    if len(data_window) > 1:
-                        media = statistics.mean(data_window)
-                        desv = statistics.stdev(data_window)
-                    elif len(data_window) == 1:
-                        media = data_window[0]
-                        desv = 0
-
-                    result = {
-                        "tipo": analysis_type,
-                        "timestamp": current_timestamp,
-                        "media": round(media, 2),
-                        "desv": round(desv, 2)
-                    }
-                    
-                    result_queue.put(result)
-                    print(f"[Analizador {analysis_type.capitalize()} PID: {pid}] Procesado {current_timestamp}. Media: {result['media']:.2f}")
+                # Extraer todos los registros completos del buffer.
+                # Un read puede traer varios registros juntos o uno a medias.
+                filled += n_read
+                offset = 0
+                while filled - offset >= record_size:
+                    epoch, frecuencia, presion_sistolica, _, oxigeno = SAMPLE_RECORD.unpack_from(read_buffer, offset)
+                    offset += record_size
+
+                    signal_value = None
+                    if analysis_type == "frecuencia":
+                        signal_value = frecuencia
+                    elif analysis_type == "presion":
+                        signal_value = presion_sistolica
+                    elif analysis_type == "oxigeno":
+                        signal_value = oxigeno
+
+                    # El timestamp vuelve a ISO una sola vez por muestra
+                    current_timestamp = datetime.datetime.fromtimestamp(epoch).isoformat(timespec='seconds')
+
+                    if signal_value is not None:
+                        data_window.push(signal_value)
+                        media = round(data_window.mean(), 2)
+                        desv = round(data_window.stdev(), 2)
+
+                        # NamedTuple: se serializa con pickle como una tupla, bastante
+                        # más chica y rápido que un dict con las mismas claves
+                        result_queue.put(AnalysisResult(current_timestamp, analysis_type, media, desv))
+                        print(f"[Analizador {analysis_type.capitalize()} PID: {pid}] Procesado {current_timestamp}. Media: {media:.2f}")
+
+                # Mover el registro incompleto (si lo hay) al principio del buffer
+                remaining = filled - offset
+                if remaining:
+                    read_buffer[:remaining] = read_buffer[offset:filled]
+                filled = remaining
 
-            except json.JSONDecodeError:
-                print(f"[Analizador {analysis_type.capitalize()} PID: {pid}] Error de JSON al leer del pipe. Datos recibidos: {data_str[:50]}...")
             except BrokenPipeError:
                 print(f"[Analizador {analysis_type.capitalize()} PID: {pid}] Error: Pipe roto. El generador pudo haber terminado.")
                 break
@@ -195,142 +414,154 @@ def analyzer_process(pipe_r, result_queue, analysis_type, stop_event):
 
 
 # --- Proceso Verificador ---
-def verifier_process(freq_q, pres_q, oxy_q, stop_event, blockchain_lock):
+def verifier_process(result_q, stop_event, blockchain_lock, cpu=None):
     pid = os.getpid()
+    pin_process(cpu, realtime=True)
     print(f"[Verificador PID: {pid}] Iniciado.")
 
     blockchain = load_blockchain()
-    processed_timestamps = {}
+    # El archivo se abre una sola vez; si no se pudo cargar una cadena se empieza de cero
+    chain_file = open(BLOCKCHAIN_FILE, 'r+b' if blockchain else 'w+b')
+    processed_timestamps = {} # timestamp -> {tipo: AnalysisResult}
+    first_seen = {}           # timestamp -> instante (monotónico) del primer resultado
 
-    while not stop_event.is_set() or any(q.qsize() > 0 for q in [freq_q, pres_q, oxy_q]):
+    while not stop_event.is_set() or not result_q.empty():
         try:
-            result_freq = freq_q.get(timeout=0.1) # Timeout más pequeño para mayor reactividad
-            
-            timestamp = result_freq["timestamp"]
-            if timestamp not in processed_timestamps:
-                processed_timestamps[timestamp] = {}
-            processed_timestamps[timestamp][result_freq["tipo"]] = result_freq
-
-            timeout_per_block = 2
-            end_time = time.time() + timeout_per_block
-            while len(processed_timestamps[timestamp]) < 3 and time.time() < end_time:
-                try:
-                    result = freq_q.get_nowait()
-                    processed_timestamps[timestamp][result["tipo"]] = result
-                except queue.Empty:
-                    pass
-                try:
-                    result = pres_q.get_nowait()
-                    processed_timestamps[timestamp][result["tipo"]] = result
-                except queue.Empty:
-                    pass
-                try:
-                    result = oxy_q.get_nowait()
-                    processed_timestamps[timestamp][result["tipo"]] = result
-                except queue.Empty:
-                    pass
-                time.sleep(0.01)
-            
-            if len(processed_timestamps[timestamp]) == 3:
-                all_results = processed_timestamps.pop(timestamp)
-                
+            try:
+                # Bloquea hasta que llegue un resultado (sin sondeo activo)
+                result = result_q.get(timeout=0.1)
+                timestamp = result.timestamp
+            except queue.Empty:
+                timestamp = None
+
+            if timestamp is not None:
+                all_results = processed_timestamps.setdefault(timestamp, {})
+                first_seen.setdefault(timestamp, time.monotonic())
+                all_results[result.tipo] = result
+
+            if timestamp is not None and len(all_results) == 3:
+                del processed_timestamps[timestamp]
+                del first_seen[timestamp]
+
                 alert = False
                 freq_data = all_results["frecuencia"]
                 pres_data = all_results["presion"]
                 oxy_data = all_results["oxigeno"]
 
-                if freq_data["media"] >= 200:
+                if freq_data.media >= 200:
                     alert = True
-                    print(f"[{timestamp}] ALERTA: Frecuencia media ({freq_data['media']}) fuera de rango.")
-                if not (90 <= oxy_data["media"] <= 100):
+                    print(f"[{timestamp}] ALERTA: Frecuencia media ({freq_data.media}) fuera de rango.")
+                if not (90 <= oxy_data.media <= 100):
                     alert = True
-                    print(f"[{timestamp}] ALERTA: Oxígeno medio ({oxy_data['media']}) fuera de rango.")
-                if pres_data["media"] >= 200:
+                    print(f"[{timestamp}] ALERTA: Oxígeno medio ({oxy_data.media}) fuera de rango.")
+                if pres_data.media >= 200:
                     alert = True
-                    print(f"[{timestamp}] ALERTA: Presión sistólica media ({pres_data['media']}) fuera de rango.")
+                    print(f"[{timestamp}] ALERTA: Presión sistólica media ({pres_data.media}) fuera de rango.")
 
                 prev_hash = blockchain[-1].hash if blockchain else "0" * 64
-                
+
                 block_data = {
-                    "frecuencia": {"media": freq_data["media"], "desv": freq_data["desv"]},
-                    "presion": {"media": pres_data["media"], "desv": pres_data["desv"]},
-                    "oxigeno": {"media": oxy_data["media"], "desv": oxy_data["desv"]}
+                    "frecuencia": {"media": freq_data.media, "desv": freq_data.desv},
+                    "presion": {"media": pres_data.media, "desv": pres_data.desv},
+                    "oxigeno": {"media": oxy_data.media, "desv": oxy_data.desv}
                 }
-                
+
                 new_block = Block(timestamp, block_data, alert, prev_hash)
-                
+
                 with blockchain_lock:
                     blockchain.append(new_block)
-                    save_blockchain(blockchain)
-                
+                    append_block(chain_file, new_block)
+
                 print(f"\n[Verificador PID: {pid}] Bloque {len(blockchain)-1} encadenado. Hash: {new_block.hash[:10]}... Alerta: {new_block.alert}")
-            elif timestamp in processed_timestamps:
-                missing = [t for t in ["frecuencia", "presion", "oxigeno"] if t not in processed_timestamps[timestamp]]
-                print(f"[Verificador PID: {pid}] ADVERTENCIA: Timeout para timestamp {timestamp}. Faltan resultados para: {missing}. Descartando.")
-                processed_timestamps.pop(timestamp)
-                
-        except queue.Empty:
-            if not stop_event.is_set():
-                time.sleep(0.05)
-            else:
-                pass
+
+            # Descartar timestamps que no se completaron a tiempo
+            now = time.monotonic()
+            expired = [ts for ts, t0 in first_seen.items() if now - t0 > BLOCK_TIMEOUT]
+            for ts in expired:
+                missing = [t for t in ["frecuencia", "presion", "oxigeno"] if t not in processed_timestamps[ts]]
+                print(f"[Verificador PID: {pid}] ADVERTENCIA: Timeout para timestamp {ts}. Faltan resultados para: {missing}. Descartando.")
+                del processed_timestamps[ts]
+                del first_seen[ts]
+
         except Exception as e:
             print(f"[Verificador PID: {pid}] Error en el verificador: {e}")
             break
-    
+
+    chain_file.close()
+    write_checkpoint(blockchain)
     print(f"[Verificador PID: {pid}] Finalizado. Última cadena de bloques guardada.")
 
 
 # --- Función Principal para llamar a funciones ---
-def main_system():
-    if os.path.exists(BLOCKCHAIN_FILE):
-        os.remove(BLOCKCHAIN_FILE)
-        print(f"Limpiado archivo de blockchain: {BLOCKCHAIN_FILE}")
+def main_system(resume=False):
+    """
+    Lanza el generador, los analizadores y el verificador.
+
+    Args:
+        resume: Si es True se conservan blockchain.json y su checkpoint y los
+            bloques nuevos se encadenan a la cadena existente (con un
+            checkpoint válido la carga no recalcula los hashes). Si es False
+            se empieza una cadena nueva.
+    """
+    if resume:
+        print(f"Continuando la cadena de blockchain: {BLOCKCHAIN_FILE}")
+    else:
+        if os.path.exists(BLOCKCHAIN_FILE):
+            os.remove(BLOCKCHAIN_FILE)
+            print(f"Limpiado archivo de blockchain: {BLOCKCHAIN_FILE}")
+        if os.path.exists(CHECKPOINT_FILE):
+            os.remove(CHECKPOINT_FILE)
 
     freq_pipe_r, freq_pipe_w = os.pipe()
     pres_pipe_r, pres_pipe_w = os.pipe()
     oxy_pipe_r, oxy_pipe_w = os.pipe()
 
-    freq_queue = multiprocessing.Queue()
-    pres_queue = multiprocessing.Queue()
-    oxy_queue = multiprocessing.Queue()
+    # Cola compartida: cada resultado lleva su "tipo" para identificar el analizador
+    result_queue = multiprocessing.Queue()
 
     stop_event = multiprocessing.Event()
     blockchain_lock = multiprocessing.Lock()
 
+    # Con al menos una CPU por proceso se fija cada uno a la suya
+    # (generador 0, analizadores 1-3, verificador 4); si no, no se fija ninguno
+    if (os.cpu_count() or 1) >= 5:
+        cpus = {"generador": 0, "frecuencia": 1, "presion": 2, "oxigeno": 3, "verificador": 4}
+    else:
+        cpus = dict.fromkeys(["generador", "frecuencia", "presion", "oxigeno", "verificador"])
+
     processes = []
 
     generator_p = multiprocessing.Process(
         target=data_generator,
-        args=(freq_pipe_w, pres_pipe_w, oxy_pipe_w, stop_event),
+        args=((freq_pipe_w, pres_pipe_w, oxy_pipe_w), stop_event, cpus["generador"]),
         name="GeneratorProcess"
     )
     processes.append(generator_p)
 
     analyzer_freq_p = multiprocessing.Process(
         target=analyzer_process,
-        args=(freq_pipe_r, freq_queue, "frecuencia", stop_event),
+        args=(freq_pipe_r, result_queue, "frecuencia", stop_event, cpus["frecuencia"]),
         name="FreqAnalyzerProcess"
     )
     processes.append(analyzer_freq_p)
 
     analyzer_pres_p = multiprocessing.Process(
         target=analyzer_process,
-        args=(pres_pipe_r, pres_queue, "presion", stop_event),
+        args=(pres_pipe_r, result_queue, "presion", stop_event, cpus["presion"]),
         name="PresAnalyzerProcess"
     )
     processes.append(analyzer_pres_p)
 
     analyzer_oxy_p = multiprocessing.Process(
         target=analyzer_process,
-        args=(oxy_pipe_r, oxy_queue, "oxigeno", stop_event),
+        args=(oxy_pipe_r, result_queue, "oxigeno", stop_event, cpus["oxigeno"]),
         name="OxyAnalyzerProcess"
     )
     processes.append(analyzer_oxy_p)
 
     verifier_p = multiprocessing.Process(
         target=verifier_process,
-        args=(freq_queue, pres_queue, oxy_queue, stop_event, blockchain_lock),
+        args=(result_queue, stop_event, blockchain_lock, cpus["verificador"]),
         name="VerifierProcess"
     )
     processes.append(verifier_p)
@@ -371,5 +602,15 @@ def main_system():
 
     print("[Main] Todos los procesos han terminado o se ha superado el tiempo de espera. Recursos limpiados.")
 
+def main():
+    parser = argparse.ArgumentParser(description="Sistema de análisis biométrico concurrente.")
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Agregar bloques a la cadena existente en lugar de empezar una nueva'
+    )
+    args = parser.parse_args()
+    main_system(resume=args.resume)
+
 if __name__ == "__main__":
-    main_system()
\ No newline at end of file
+    main()
\ No newline at end of file
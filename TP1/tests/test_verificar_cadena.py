@@ -0,0 +1,111 @@
+"""
+Tests para el verificador de la cadena de bloques.
+
+Prueban que los hashes guardados se comparen con la forma exacta que escribe
+main_system.py (hex en minúsculas), para que un hash modificado no pase el
+chequeo de integridad.
+"""
+
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+import verificar_cadena
+
+
+def build_chain(n_blocks):
+    """Arma una cadena válida de n_blocks bloques, como la escribe main_system.py."""
+    chain = []
+    prev_hash = verificar_cadena.GENESIS_PREV_HASH
+    for i in range(n_blocks):
+        block = {
+            "timestamp": f"2025-06-10T12:42:{i:02d}",
+            "datos": {
+                "frecuencia": {"media": 100 + i, "desv": 1.5},
+                "presion": {"media": 120, "desv": 0},
+                "oxigeno": {"media": 95, "desv": 0.25}
+            },
+            "alerta": False,
+            "prev_hash": prev_hash
+        }
+        block["hash"] = verificar_cadena.calculate_hash(block, prev_hash)
+        chain.append(block)
+        prev_hash = block["hash"]
+    return chain
+
+
+class TestStoredDigest(unittest.TestCase):
+    """Tests para stored_digest."""
+
+    def test_lowercase_hex(self):
+        """Un hash en hex minúscula se convierte a sus 32 bytes."""
+        digest = bytes(range(32))
+        self.assertEqual(verificar_cadena.stored_digest(digest.hex()), digest)
+
+    def test_rejects_uppercase(self):
+        """Un hash en mayúsculas no es el que escribe hexdigest."""
+        self.assertIsNone(verificar_cadena.stored_digest(bytes(range(32)).hex().upper()))
+
+    def test_rejects_whitespace(self):
+        """Espacios dentro o alrededor del hash lo invalidan."""
+        hex_hash = bytes(range(32)).hex()
+        self.assertIsNone(verificar_cadena.stored_digest(hex_hash[:32] + " " + hex_hash[32:]))
+        self.assertIsNone(verificar_cadena.stored_digest(" " + hex_hash))
+        self.assertIsNone(verificar_cadena.stored_digest(hex_hash + "\n"))
+
+    def test_rejects_wrong_length_and_type(self):
+        """Largo distinto de 64 o un valor que no es string."""
+        self.assertIsNone(verificar_cadena.stored_digest("ab" * 31))
+        self.assertIsNone(verificar_cadena.stored_digest(None))
+
+
+class TestVerifyBlockchain(unittest.TestCase):
+    """Tests de verify_blockchain sobre una cadena en un directorio temporal."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+        # Redirigir los archivos del verificador al directorio temporal
+        for name, file_name in (("BLOCKCHAIN_FILE", "blockchain.json"),
+                                ("REPORT_FILE", "reporte.txt"),
+                                ("VERIFY_CHECKPOINT_FILE", ".verify_checkpoint.json")):
+            original = getattr(verificar_cadena, name)
+            setattr(verificar_cadena, name, os.path.join(self.tmp_dir.name, file_name))
+            self.addCleanup(setattr, verificar_cadena, name, original)
+
+    def verify(self, chain):
+        """Escribe la cadena, la verifica y devuelve los bloques corruptos del reporte."""
+        with open(verificar_cadena.BLOCKCHAIN_FILE, 'w') as f:
+            json.dump(chain, f, indent=4)
+        with contextlib.redirect_stdout(io.StringIO()):
+            verificar_cadena.verify_blockchain(full=True)
+        with open(verificar_cadena.REPORT_FILE, encoding='utf-8') as f:
+            for line in f:
+                if line.startswith("Número de bloques corruptos detectados:"):
+                    return int(line.rsplit(":", 1)[1])
+        self.fail("El reporte no tiene la cantidad de bloques corruptos")
+
+    def test_valid_chain(self):
+        """Una cadena sin modificar no tiene bloques corruptos."""
+        self.assertEqual(self.verify(build_chain(5)), 0)
+
+    def test_uppercase_hash_is_corrupted(self):
+        """Pasar a mayúsculas el hash del último bloque se detecta."""
+        chain = build_chain(5)
+        chain[-1]["hash"] = chain[-1]["hash"].upper()
+        self.assertEqual(self.verify(chain), 1)
+
+    def test_whitespace_in_hash_is_corrupted(self):
+        """Agregar espacios al hash del último bloque se detecta."""
+        chain = build_chain(5)
+        stored = chain[-1]["hash"]
+        chain[-1]["hash"] = stored[:2] + " " + stored[2:]
+        self.assertEqual(self.verify(chain), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
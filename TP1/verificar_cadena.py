@@ -1,100 +1,592 @@
+import argparse
 import json
 import hashlib
+import mmap
 import os
 import datetime
-import statistics
+import math
+import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, compress, count
+from json.encoder import c_make_encoder, encode_basestring_ascii
+from operator import ne
+from typing import NamedTuple
 
 BLOCKCHAIN_FILE = "blockchain.json"
 REPORT_FILE = "reporte.txt"
+# Altura, último hash y huella del archivo en la última verificación sin
+# corrupción (ver write_verify_checkpoint)
+VERIFY_CHECKPOINT_FILE = ".verify_checkpoint.json"
+# A partir de cuántos bloques se reparte el recálculo de hashes entre procesos.
+# En cadenas chicas cuesta más levantar los procesos y pasarles los bloques.
+PARALLEL_MIN_BLOCKS = 20_000
+# Las cadenas de más de STREAM_MIN_SIZE bytes se recorren de a tramos de
+# STREAM_CHUNK_SIZE (ver iter_chain) en lugar de cargarse enteras como lista
+# de diccionarios, que ocupa varias veces el tamaño del archivo
+STREAM_MIN_SIZE = 64 * 1024 * 1024
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+# orjson es opcional: si está instalado se usa para leer blockchain.json (es
+# varias veces más rápido que json). No se usa para serializar al recalcular
+# los hashes porque no pone los espacios de json.dumps y el JSON canónico
+# cambiaría.
+try:
+    from orjson import loads as _loads
+    _LOADS_BUFFERS = True
+except ImportError:
+    _loads = json.loads
+    # json.loads solo acepta str, bytes o bytearray
+    _LOADS_BUFFERS = False
+
+# Espacios entre elementos del arreglo y decoder reutilizado para leer la
+# cadena en streaming
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_raw_decode = json.JSONDecoder().raw_decode
+
+# Forma exacta de un hash guardado: SHA-256 en hex minúscula
+_HEX_DIGEST = re.compile(r'[0-9a-f]{64}')
+
+# prev_hash del bloque génesis
+GENESIS_PREV_HASH = "0" * 64
+
+# Encoder preconstruido, como en main_system.py: json.dumps(..., sort_keys=True)
+# arma un JSONEncoder nuevo en cada llamada; así se construye una sola vez
+_encode_json_sorted = json.JSONEncoder(sort_keys=True).encode
+
+# Para 'datos' se usa directamente el encoder en C de la librería estándar
+# (módulo _json), construido una sola vez con los mismos parámetros que
+# JSONEncoder(sort_keys=True): JSONEncoder.encode arma uno nuevo por llamada.
+# No se chequean referencias circulares (markers=None) porque los datos vienen
+# de parsear JSON. Si el intérprete no trae el módulo en C se usa el encoder.
+if c_make_encoder is not None:
+    _c_encode_sorted = c_make_encoder(
+        None, json.JSONEncoder().default, encode_basestring_ascii, None,
+        ': ', ', ', True, False, True)
+
+    def _encode_datos(datos):
+        return ''.join(_c_encode_sorted(datos, 0))
+else:
+    _encode_datos = _encode_json_sorted
+
+def _encode_scalar(value):
+    """JSON de alerta, prev_hash o timestamp, sin pasar por JSONEncoder.encode en el caso común."""
+    if value is True:
+        return 'true'
+    if value is False:
+        return 'false'
+    if type(value) is str:
+        return encode_basestring_ascii(value)
+    # Con claves ordenadas, como json.dumps(bloque, sort_keys=True)
+    return _encode_json_sorted(value)
+
+# --- Columnas de la cadena ---
+class ChainColumns(NamedTuple):
+    """Campos de la cadena que usan los chequeos y el reporte, uno por lista."""
+    prev_hashes: list
+    hashes: list
+    digests: list  # Recalculados, solo desde la altura ya verificada
+    alert_blocks: int
+    frecuencias: list
+    presiones: list
+    oxigenos: list
+
+def block_message(block_data, prev_hash):
+    """
+    Devuelve los bytes que se hashean para un bloque: prev_hash seguido del
+    JSON canónico (claves ordenadas) del bloque sin hash.
+    """
+    block_string = _encode_json_sorted(block_data)
+    return (prev_hash + block_string).encode('utf-8')
+
+def stored_block_message(block):
+    """
+    Devuelve los bytes que se hashean para un bloque leído de la cadena.
+
+    Equivale a block_message con el bloque sin el campo 'hash', pero como las
+    claves del bloque son fijas el JSON canónico se arma directamente en orden
+    alfabético: no se construye un diccionario por bloque ni se ordenan sus
+    claves, solo las de 'datos'.
+    """
+    return canonical_message(block["prev_hash"], block["alerta"], block["datos"], block["timestamp"])
+
+def canonical_message(prev_hash, alerta, datos, timestamp):
+    """Arma los bytes de stored_block_message a partir de los campos ya leídos."""
+    # Un solo f-string arma prev_hash + JSON del bloque de una vez, sin los
+    # strings intermedios de encadenar '+' ni el de la concatenación final
+    return (
+        f'{prev_hash}{{"alerta": {_encode_scalar(alerta)}, '
+        f'"datos": {_encode_datos(datos)}, '
+        f'"prev_hash": {_encode_scalar(prev_hash)}, '
+        f'"timestamp": {_encode_scalar(timestamp)}}}'
+    ).encode('utf-8')
 
 def calculate_hash(block_data, prev_hash):
     """
     Recalcula el hash de un bloque dado sus datos y el hash previo.
     Debe ser idéntica a la función calculate_hash en main_system.py
     """
-    block_string = json.dumps(block_data, sort_keys=True)
-    return hashlib.sha256((prev_hash + block_string).encode('utf-8')).hexdigest()
+    return hashlib.sha256(block_message(block_data, prev_hash)).hexdigest()
 
-def verify_blockchain():
-    print(f"--- Verificación de Cadena de Bloques ({BLOCKCHAIN_FILE}) ---")
-    if not os.path.exists(BLOCKCHAIN_FILE):
-        print(f"Error: El archivo '{BLOCKCHAIN_FILE}' no existe.")
-        return
+def hash_blocks(blocks):
+    """Serializa y hashea bloques leídos de la cadena; devuelve sus digests."""
+    # Referencias locales: se evita buscar los globales en cada bloque
+    sha256 = hashlib.sha256
+    message = stored_block_message
+    return [sha256(message(block)).digest() for block in blocks]
 
-    blockchain = []
+def _usable_cpus():
+    """CPUs en las que puede correr el proceso (respeta taskset y cgroups)."""
     try:
-        with open(BLOCKCHAIN_FILE, 'r') as f:
-            blockchain = json.load(f)
-    except json.JSONDecodeError:
-        print(f"Error: El archivo '{BLOCKCHAIN_FILE}' no es un JSON válido o está vacío.")
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        # sched_getaffinity solo existe en Linux
+        return os.cpu_count() or 1
+
+def hash_blocks_parallel(blockchain):
+    """
+    Como hash_blocks, pero repartiendo los bloques en tramos entre procesos:
+    la serialización con json.dumps necesita el GIL y con hilos no escalaría.
+    """
+    # Varios tramos por proceso para repartir mejor la carga
+    chunk_size = -(-len(blockchain) // (HASH_WORKERS * 4))
+    chunks = [blockchain[i:i + chunk_size] for i in range(0, len(blockchain), chunk_size)]
+    with ProcessPoolExecutor(max_workers=HASH_WORKERS) as executor:
+        return list(chain.from_iterable(executor.map(hash_blocks, chunks)))
+
+# Backend para lotes grandes, elegido una sola vez al importar: con una sola
+# CPU disponible repartir entre procesos solo agrega costo
+HASH_WORKERS = _usable_cpus()
+_hash_large_batch = hash_blocks_parallel if HASH_WORKERS > 1 else hash_blocks
+
+def recalculate_digests(blockchain):
+    """
+    Recalcula el digest de cada bloque de la cadena, en orden.
+
+    Cada bloque se hashea por separado, así que las cadenas de al menos
+    PARALLEL_MIN_BLOCKS bloques van al backend elegido al importar.
+    """
+    if len(blockchain) < PARALLEL_MIN_BLOCKS:
+        return hash_blocks(blockchain)
+    return _hash_large_batch(blockchain)
+
+def stored_digest(block_hash):
+    """
+    Convierte un hash guardado en hexadecimal a los 32 bytes del digest.
+
+    Devuelve None si no son exactamente 64 caracteres hexadecimales en
+    minúsculas (lo que escribe hexdigest), así el bloque cuenta como corrupto
+    al compararlo con el digest recalculado. bytes.fromhex solo no alcanza:
+    acepta mayúsculas y espacios, y un hash modificado así pasaría el chequeo.
+    """
+    if type(block_hash) is not str or not _HEX_DIGEST.fullmatch(block_hash):
+        return None
+    return bytes.fromhex(block_hash)
+
+def load_chain(path):
+    """
+    Lee y parsea el archivo de la cadena.
+
+    Con orjson el parser recorre directamente el archivo mapeado en memoria
+    (mmap), sin copiarlo antes a un buffer de Python. Sin orjson, o si no se
+    puede mapear (por ejemplo, un archivo vacío), se lee entero.
+
+    Raises:
+        json.JSONDecodeError: Si el archivo no es un JSON válido o está vacío
+    """
+    with open(path, 'rb') as f:
+        if _LOADS_BUFFERS:
+            try:
+                mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, OSError):
+                mapping = None
+            if mapping is not None:
+                with mapping, memoryview(mapping) as view:
+                    return _loads(view)
+        return _loads(f.read())
+
+def collect_metrics(blockchain):
+    """
+    Cuenta los bloques con alerta y junta las medias de cada señal.
+
+    Se hace fuera del bucle de integridad con comprensiones, que corren sin
+    el trabajo extra de un bucle interpretado por bloque (appends, contadores).
+    Solo si algún bloque no tiene los datos se recorre bloque por bloque para
+    avisar cuál es.
+
+    Returns:
+        (bloques con alerta, frecuencias, presiones sistólicas, oxígenos)
+    """
+    # .get por si el campo falta por alguna razón
+    alert_blocks = sum([1 for block in blockchain if block.get("alerta", False)])
+
+    try:
+        datos = [block["datos"] for block in blockchain]
+        return (
+            alert_blocks,
+            [d["frecuencia"]["media"] for d in datos],
+            [d["presion"]["media"] for d in datos],
+            [d["oxigeno"]["media"] for d in datos],
+        )
+    except KeyError:
+        pass
+
+    all_frecuencias = []
+    all_presiones_sistolicas = []
+    all_oxigenos = []
+    for i, block in enumerate(blockchain):
+        try:
+            frecuencia = block["datos"]["frecuencia"]["media"]
+            presion = block["datos"]["presion"]["media"]
+            oxigeno = block["datos"]["oxigeno"]["media"]
+        except KeyError as e:
+            print(f"Advertencia: Bloque {i} falta campo de datos para promedio: {e}")
+            continue
+        all_frecuencias.append(frecuencia)
+        all_presiones_sistolicas.append(presion)
+        all_oxigenos.append(oxigeno)
+    return alert_blocks, all_frecuencias, all_presiones_sistolicas, all_oxigenos
+
+def file_prefix_sha256(path, size):
+    """
+    Calcula el SHA-256 (hex) de los primeros size bytes de un archivo,
+    leyéndolo de a tramos.
+
+    Returns:
+        El hash, o None si el archivo tiene menos de size bytes
+    """
+    digest = hashlib.sha256()
+    remaining = size
+    with open(path, 'rb') as f:
+        while remaining:
+            chunk = f.read(min(remaining, STREAM_CHUNK_SIZE))
+            if not chunk:
+                return None
+            digest.update(chunk)
+            remaining -= len(chunk)
+    return digest.hexdigest()
+
+def load_verify_checkpoint():
+    """
+    Lee el checkpoint de la última verificación sin corrupción.
+
+    Solo vale si el principio del archivo (hasta el último bloque verificado)
+    no cambió desde entonces. Hashear esos bytes crudos es mucho más barato
+    que serializar y hashear cada bloque, y detecta cualquier cambio en los
+    bloques ya verificados.
+
+    Returns:
+        (altura verificada, hash del último bloque verificado), o (0, None)
+        si no hay checkpoint o ya no coincide con el archivo
+    """
+    try:
+        with open(VERIFY_CHECKPOINT_FILE, 'rb') as f:
+            checkpoint = _loads(f.read())
+        height = checkpoint["height"]
+        tail_hash = checkpoint["tail_hash"]
+        prefix_size = checkpoint["prefix_size"]
+        prefix_hash = checkpoint["prefix_sha256"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return 0, None
+    if not isinstance(height, int) or height <= 0:
+        return 0, None
+    if not isinstance(prefix_size, int) or prefix_size <= 0:
+        return 0, None
+    if file_prefix_sha256(BLOCKCHAIN_FILE, prefix_size) != prefix_hash:
+        return 0, None
+    return height, tail_hash
+
+def write_verify_checkpoint(hashes):
+    """
+    Guarda la altura y el último hash de una cadena recién verificada.
+
+    También guarda el SHA-256 del archivo hasta el cierre del último bloque:
+    main_system.py agrega bloques reescribiendo solo el ']' final, así que
+    esos bytes no cambian mientras la cadena solo crezca.
+    """
+    if not hashes:
+        return
+    with open(BLOCKCHAIN_FILE, 'rb') as f:
+        size = f.seek(0, os.SEEK_END)
+        tail_len = min(size, 64)
+        f.seek(size - tail_len)
+        closing = f.read(tail_len).rfind(b'}')
+    if closing < 0:
         return
+    prefix_size = size - tail_len + closing + 1
+    checkpoint = {
+        "height": len(hashes),
+        "tail_hash": hashes[-1],
+        "prefix_size": prefix_size,
+        "prefix_sha256": file_prefix_sha256(BLOCKCHAIN_FILE, prefix_size)
+    }
+    # Temporal + rename para que sea atómico
+    tmp_path = VERIFY_CHECKPOINT_FILE + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, VERIFY_CHECKPOINT_FILE)
 
-    total_blocks = len(blockchain)
-    corrupted_blocks = 0
-    alert_blocks = 0
+def iter_chain(path, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Recorre el arreglo JSON de la cadena devolviendo los bloques de a uno.
+
+    El archivo se lee de a tramos de chunk_size caracteres y cada bloque se
+    decodifica con JSONDecoder.raw_decode apenas está completo, así en
+    memoria hay a lo sumo un tramo y el bloque actual.
+
+    Raises:
+        json.JSONDecodeError: Si el archivo no es un arreglo JSON válido o
+            está vacío
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer = ''
+        pos = 0
+        eof = False
+
+        def refill():
+            # Descarta lo ya consumido y agrega el tramo siguiente
+            nonlocal buffer, pos, eof
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = 0
+
+        def next_char():
+            # Primer carácter que no es espacio ('' al final del archivo)
+            nonlocal pos
+            while True:
+                pos = _WHITESPACE.match(buffer, pos).end()
+                if pos < len(buffer) or eof:
+                    return buffer[pos:pos + 1]
+                refill()
 
-    # Para el promedio general
+        if next_char() != '[':
+            raise json.JSONDecodeError("Se esperaba un arreglo", buffer, pos)
+        pos += 1
+        if next_char() == ']':
+            pos += 1
+        else:
+            while True:
+                next_char()
+                # Se decodifica solo si el bloque termina antes del final del
+                # buffer: si no, puede estar cortado y hay que leer más
+                while True:
+                    try:
+                        block, end = _raw_decode(buffer, pos)
+                        if end < len(buffer) or eof:
+                            break
+                    except json.JSONDecodeError:
+                        if eof:
+                            raise
+                    refill()
+                pos = end
+                yield block
+
+                separator = next_char()
+                pos += 1
+                if separator == ']':
+                    break
+                if separator != ',':
+                    raise json.JSONDecodeError("Se esperaba ',' o ']'", buffer, pos - 1)
+
+        if next_char():
+            raise json.JSONDecodeError("Datos extra después del arreglo", buffer, pos)
+
+def stream_columns(path, verified_height):
+    """
+    Arma las columnas de la cadena recorriéndola bloque por bloque.
+
+    Para cadenas grandes: cada bloque se hashea y se reparte en las columnas
+    apenas se decodifica, sin mantener la lista de diccionarios en memoria.
+
+    Raises:
+        json.JSONDecodeError: Si el archivo no es un arreglo JSON válido
+    """
+    prev_hashes = []
+    hashes = []
+    digests = []
+    alert_blocks = 0
     all_frecuencias = []
     all_presiones_sistolicas = []
     all_oxigenos = []
 
-    print(f"Total de bloques encontrados: {total_blocks}")
+    # Un solo recorrido por bloque: cada campo se busca una vez y sirve para
+    # el hash, las columnas, la alerta y los promedios. Los append y el hash
+    # se toman como locales para no buscarlos en cada iteración
+    sha256 = hashlib.sha256
+    message = canonical_message
+    add_prev_hash = prev_hashes.append
+    add_hash = hashes.append
+    add_digest = digests.append
+    add_frecuencia = all_frecuencias.append
+    add_presion = all_presiones_sistolicas.append
+    add_oxigeno = all_oxigenos.append
 
-    for i, block in enumerate(blockchain):
-        # 1. Verificar prev_hash
-        expected_prev_hash = blockchain[i-1]["hash"] if i > 0 else "0" * 64
-        if block["prev_hash"] != expected_prev_hash:
-            print(f"Bloque {i}: ¡CORRUPCIÓN DETECTADA! prev_hash incorrecto.")
-            print(f"  Esperado: {expected_prev_hash[:10]}..., Encontrado: {block['prev_hash'][:10]}...")
-            corrupted_blocks += 1
-
-        # 2. Recalcular y verificar hash propio
-        # Crear un diccionario para el cálculo del hash, excluyendo el campo 'hash'
-        block_data_for_hash = {
-            "timestamp": block["timestamp"],
-            "datos": block["datos"],
-            "alerta": block["alerta"],
-            "prev_hash": block["prev_hash"]
-        }
-        recalculated_hash = calculate_hash(block_data_for_hash, block["prev_hash"])
-        
-        if block["hash"] != recalculated_hash:
-            print(f"Bloque {i}: ¡CORRUPCIÓN DETECTADA! Hash recalculado no coincide.")
-            print(f"  Esperado: {block['hash'][:10]}..., Recalculado: {recalculated_hash[:10]}...")
-            corrupted_blocks += 1
+    for i, block in enumerate(iter_chain(path)):
+        prev_hash = block["prev_hash"]
+        add_prev_hash(prev_hash)
+        add_hash(block["hash"])
+        if i >= verified_height:
+            add_digest(sha256(message(prev_hash, block["alerta"], block["datos"],
+                                      block["timestamp"])).digest())
 
-        # 3. Contar alertas
-        if block.get("alerta", False): # Usar .get para manejar si el campo falta por alguna razón
+        if block.get("alerta", False):
             alert_blocks += 1
 
-        # 4. Recopilar datos para promedios
         try:
-            all_frecuencias.append(block["datos"]["frecuencia"]["media"])
-            all_presiones_sistolicas.append(block["datos"]["presion"]["media"])
-            all_oxigenos.append(block["datos"]["oxigeno"]["media"])
+            datos = block["datos"]
+            frecuencia = datos["frecuencia"]["media"]
+            presion = datos["presion"]["media"]
+            oxigeno = datos["oxigeno"]["media"]
         except KeyError as e:
             print(f"Advertencia: Bloque {i} falta campo de datos para promedio: {e}")
+            continue
+        add_frecuencia(frecuencia)
+        add_presion(presion)
+        add_oxigeno(oxigeno)
+
+    return ChainColumns(prev_hashes, hashes, digests, alert_blocks,
+                        all_frecuencias, all_presiones_sistolicas, all_oxigenos)
+
+def read_columns(path, verified_height=0):
+    """
+    Lee la cadena y arma las columnas que usan los chequeos y el reporte.
 
-    # Calcular promedios generales
-    avg_frecuencia = statistics.mean(all_frecuencias) if all_frecuencias else 0
-    avg_presion = statistics.mean(all_presiones_sistolicas) if all_presiones_sistolicas else 0
-    avg_oxigeno = statistics.mean(all_oxigenos) if all_oxigenos else 0
-
-    # Generar reporte final
-    with open(REPORT_FILE, 'w') as f:
-        f.write(f"--- Reporte de Análisis Biométrico ---\n")
-        f.write(f"Fecha del Reporte: {datetime.datetime.now().isoformat(timespec='seconds')}\n")
-        f.write(f"Archivo de Cadena de Bloques: {BLOCKCHAIN_FILE}\n\n")
-        f.write(f"Cantidad total de bloques: {total_blocks}\n")
-        f.write(f"Número de bloques con alertas: {alert_blocks}\n")
-        f.write(f"Número de bloques corruptos detectados: {corrupted_blocks}\n\n")
-        f.write(f"Promedio general de Frecuencia: {avg_frecuencia:.2f}\n")
-        f.write(f"Promedio general de Presión Sistólica: {avg_presion:.2f}\n")
-        f.write(f"Promedio general de Oxígeno: {avg_oxigeno:.2f}\n")
-        f.write(f"----------------------------------------\n")
+    Las cadenas de hasta STREAM_MIN_SIZE bytes se cargan enteras (y el
+    recálculo de hashes puede repartirse entre procesos); las más grandes se
+    recorren en streaming con stream_columns para acotar la memoria.
+
+    Args:
+        path: Archivo de la cadena
+        verified_height: Cantidad de bloques del principio que ya fueron
+            verificados; sus hashes no se recalculan
+
+    Raises:
+        json.JSONDecodeError: Si el archivo no es un JSON válido o está vacío
+    """
+    if os.path.getsize(path) >= STREAM_MIN_SIZE:
+        return stream_columns(path, verified_height)
+
+    blockchain = load_chain(path)
+    return ChainColumns(
+        [block["prev_hash"] for block in blockchain],
+        [block["hash"] for block in blockchain],
+        recalculate_digests(blockchain[verified_height:]),
+        *collect_metrics(blockchain)
+    )
+
+def verify_blockchain(full=False):
+    """
+    Verifica la cadena y genera el reporte.
+
+    Args:
+        full: Si es False y hay un checkpoint de una verificación anterior
+            que sigue coincidiendo con el archivo, solo se recalculan los
+            hashes de los bloques agregados después. Los enlaces prev_hash,
+            las alertas y los promedios siempre cubren toda la cadena.
+    """
+    print(f"--- Verificación de Cadena de Bloques ({BLOCKCHAIN_FILE}) ---")
+    if not os.path.exists(BLOCKCHAIN_FILE):
+        print(f"Error: El archivo '{BLOCKCHAIN_FILE}' no existe.")
+        return
+
+    verified_height, tail_hash = (0, None) if full else load_verify_checkpoint()
+
+    # Primera pasada: columnas con los campos que miran los chequeos (los
+    # bucles recorren listas en lugar de buscar claves en cada bloque) y los
+    # hashes recalculados (excluyendo el campo 'hash') de los bloques sin
+    # verificar. Se comparan los digests de 32 bytes en lugar de los 64
+    # caracteres hex: no hay que codificar a hex cada hash recalculado
+    try:
+        columns = read_columns(BLOCKCHAIN_FILE, verified_height)
+        hashes = columns.hashes
+        if verified_height and (verified_height > len(hashes)
+                                or hashes[verified_height - 1] != tail_hash):
+            # El checkpoint no corresponde a esta cadena: se verifica toda
+            verified_height = 0
+            columns = read_columns(BLOCKCHAIN_FILE)
+    except json.JSONDecodeError:  # orjson.JSONDecodeError hereda de esta
+        print(f"Error: El archivo '{BLOCKCHAIN_FILE}' no es un JSON válido o está vacío.")
+        return
+
+    prev_hashes = columns.prev_hashes
+    hashes = columns.hashes
+    total_blocks = len(hashes)
+
+    print(f"Total de bloques encontrados: {total_blocks}")
+    if verified_height:
+        print(f"Checkpoint: bloques 0-{verified_height - 1} ya verificados "
+              f"(usar --full para recalcular toda la cadena).")
+
+    # Los bloques ya verificados conservan el hash guardado
+    stored_digests = list(map(stored_digest, hashes))
+    recalculated_digests = stored_digests[:verified_height] + columns.digests
+
+    # 1. prev_hash de cada bloque contra el hash del anterior (el génesis
+    # contra ceros) y 2. hash propio contra el recalculado. En una cadena
+    # íntegra (el caso normal) alcanza con una comparación de listas en C;
+    # solo si falla se buscan los índices que no coinciden (map + compress).
+    expected_prev_hashes = [GENESIS_PREV_HASH] + hashes[:-1]
+    bad_prev = set()
+    if prev_hashes != expected_prev_hashes:
+        bad_prev.update(compress(count(), map(ne, prev_hashes, expected_prev_hashes)))
+    bad_hash = set()
+    if stored_digests != recalculated_digests:
+        bad_hash.update(compress(count(), map(ne, stored_digests, recalculated_digests)))
+    corrupted_blocks = len(bad_prev) + len(bad_hash)
+
+    # Solo se recorren los bloques con problemas (normalmente ninguno)
+    for i in sorted(bad_prev | bad_hash):
+        if i in bad_prev:
+            print(f"Bloque {i}: ¡CORRUPCIÓN DETECTADA! prev_hash incorrecto.")
+            print(f"  Esperado: {expected_prev_hashes[i][:10]}..., Encontrado: {prev_hashes[i][:10]}...")
+        if i in bad_hash:
+            print(f"Bloque {i}: ¡CORRUPCIÓN DETECTADA! Hash recalculado no coincide.")
+            print(f"  Esperado: {hashes[i][:10]}..., Recalculado: {recalculated_digests[i].hex()[:10]}...")
+
+    if corrupted_blocks == 0:
+        write_verify_checkpoint(hashes)
+
+    # 3. Alertas y 4. datos para promedios, ya juntados al leer la cadena
+    alert_blocks = columns.alert_blocks
+    all_frecuencias = columns.frecuencias
+    all_presiones_sistolicas = columns.presiones
+    all_oxigenos = columns.oxigenos
+
+    # Calcular promedios generales. math.fsum suma en C sin perder precisión;
+    # statistics.mean da el mismo resultado pero acumula con Fraction en Python
+    avg_frecuencia = math.fsum(all_frecuencias) / len(all_frecuencias) if all_frecuencias else 0
+    avg_presion = math.fsum(all_presiones_sistolicas) / len(all_presiones_sistolicas) if all_presiones_sistolicas else 0
+    avg_oxigeno = math.fsum(all_oxigenos) / len(all_oxigenos) if all_oxigenos else 0
+
+    # Generar reporte final: se arma entero y se escribe con una sola llamada
+    # (sin buffer intermedio)
+    report = (
+        "--- Reporte de Análisis Biométrico ---\n"
+        f"Fecha del Reporte: {datetime.datetime.now().isoformat(timespec='seconds')}\n"
+        f"Archivo de Cadena de Bloques: {BLOCKCHAIN_FILE}\n\n"
+        f"Cantidad total de bloques: {total_blocks}\n"
+        f"Número de bloques con alertas: {alert_blocks}\n"
+        f"Número de bloques corruptos detectados: {corrupted_blocks}\n\n"
+        f"Promedio general de Frecuencia: {avg_frecuencia:.2f}\n"
+        f"Promedio general de Presión Sistólica: {avg_presion:.2f}\n"
+        f"Promedio general de Oxígeno: {avg_oxigeno:.2f}\n"
+        "----------------------------------------\n"
+    )
+    with open(REPORT_FILE, 'wb', buffering=0) as f:
+        f.write(report.encode('utf-8'))
 
     print(f"\nVerificación completada. {corrupted_blocks} bloques corruptos encontrados.")
     print(f"Reporte generado en '{REPORT_FILE}'.")
 
+def main():
+    parser = argparse.ArgumentParser(description="Verifica la cadena de bloques y genera el reporte.")
+    parser.add_argument(
+        '--full',
+        action='store_true',
+        help='Recalcular los hashes de toda la cadena, ignorando el checkpoint'
+    )
+    args = parser.parse_args()
+    verify_blockchain(full=args.full)
+
 if __name__ == "__main__":
-    verify_blockchain()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -14,9 +14,17 @@ import argparse
 import sys
 import json
 import requests
+from requests.adapters import HTTPAdapter
 from datetime import datetime
 from typing import Optional
 
+# orjson es opcional: si está instalado se usa para (de)serializar las respuestas,
+# que pueden traer screenshots en base64 de varios MB
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 class ScrapingClient:
     """Cliente para el servidor de scraping."""
@@ -32,6 +40,13 @@ class ScrapingClient:
         self.server_url = server_url.rstrip('/')
         self.timeout = timeout
 
+        # Sesión persistente: reutiliza la conexión TCP (keep-alive) entre requests
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({'Connection': 'keep-alive'})
+
     def scrape(self, url: str) -> dict:
         """
         Realiza una request de scraping.
@@ -56,7 +71,7 @@ class ScrapingClient:
         try:
             start_time = datetime.now()
 
-            response = requests.get(
+            response = self.session.get(
                 endpoint,
                 params=params,
                 timeout=self.timeout
@@ -73,6 +88,8 @@ class ScrapingClient:
                 print(response.text)
                 raise Exception(f"HTTP {response.status_code}")
 
+            if orjson is not None:
+                return orjson.loads(response.content)
             return response.json()
 
         except requests.Timeout:
@@ -90,7 +107,7 @@ class ScrapingClient:
         endpoint = f"{self.server_url}/health"
 
         try:
-            response = requests.get(endpoint, timeout=5)
+            response = self.session.get(endpoint, timeout=5)
 
             if response.status_code == 200:
                 return response.json()
@@ -100,6 +117,18 @@ class ScrapingClient:
         except Exception as e:
             raise Exception(f"Health check falló: {e}")
 
+    def close(self) -> None:
+        """Cierra la sesión HTTP y sus conexiones."""
+        self.session.close()
+
+    def __enter__(self):
+        """Context manager entry."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit."""
+        self.close()
+
 
 def print_response(data: dict) -> None:
     """
@@ -206,6 +235,21 @@ def print_response(data: dict) -> None:
     print("=" * 80)
 
 
+def dumps_pretty(data: dict) -> bytes:
+    """
+    Serializa la respuesta a JSON indentado en UTF-8.
+
+    Args:
+        data: Diccionario con la respuesta
+
+    Returns:
+        Bytes del JSON (indentado con 2 espacios, sin escapar no-ASCII)
+    """
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+
+
 def save_response(data: dict, filename: str) -> None:
     """
     Guarda la respuesta en un archivo JSON.
@@ -214,8 +258,8 @@ def save_response(data: dict, filename: str) -> None:
         data: Diccionario con la respuesta
         filename: Nombre del archivo
     """
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    with open(filename, 'wb') as f:
+        f.write(dumps_pretty(data))
 
     print(f"Respuesta guardada en: {filename}")
 
@@ -305,7 +349,9 @@ def main():
 
         # Mostrar resultado
         if args.json:
-            print(json.dumps(result, indent=2, ensure_ascii=False))
+            sys.stdout.flush()
+            sys.stdout.buffer.write(dumps_pretty(result) + b'\n')
+            sys.stdout.buffer.flush()
         else:
             print_response(result)
 
@@ -323,6 +369,9 @@ def main():
         print(f"\nERROR: {e}")
         return 1
 
+    finally:
+        client.close()
+
 
 if __name__ == '__main__':
     sys.exit(main())
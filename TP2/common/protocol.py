@@ -8,21 +8,29 @@ Protocolo:
     [4 bytes: longitud del mensaje][N bytes: mensaje serializado]
 
 El protocolo es binario y utiliza network byte order (big-endian) para
-la longitud del mensaje.
+la longitud del mensaje. Al enviar, header y payload se pasan al kernel como
+dos buffers separados (sendmsg / writelines), sin concatenarlos: un mensaje
+de MAX_MESSAGE_SIZE no requiere una copia extra del mismo tamaño.
 """
 
 import struct
 import socket
 import asyncio
-from typing import Optional, Tuple
+from collections import deque
+from functools import lru_cache
+from typing import Deque, List, Optional, Sequence, Tuple, Union
 import logging
 
 logger = logging.getLogger(__name__)
 
 # Constantes del protocolo
-HEADER_SIZE = 4  # 4 bytes para la longitud del mensaje
 HEADER_FORMAT = '!I'  # unsigned int, network byte order
+_HDR = struct.Struct(HEADER_FORMAT)  # formato precompilado para pack/unpack
+HEADER_SIZE = _HDR.size  # 4 bytes para la longitud del mensaje
 MAX_MESSAGE_SIZE = 10 * 1024 * 1024  # 10 MB máximo por mensaje
+PIPELINE_THRESHOLD = 8192  # bytes acumulados a partir de los cuales se escribe sin esperar
+SOCKET_BUFFER_SIZE = 4 * 1024 * 1024  # SO_SNDBUF/SO_RCVBUF (el kernel puede limitarlo)
+_MSG_WAITALL = getattr(socket, 'MSG_WAITALL', 0)  # 0 si la plataforma no lo define
 
 
 class ProtocolError(Exception):
@@ -30,6 +38,59 @@ class ProtocolError(Exception):
     pass
 
 
+class ConnectionClosedError(ProtocolError):
+    """El peer cerró la conexión entre mensajes (cierre limpio)."""
+    pass
+
+
+class IdleTimeoutError(ConnectionClosedError):
+    """Venció el timeout esperando un nuevo mensaje sin recibir ningún byte."""
+    pass
+
+
+def tune_socket(sock: Optional[socket.socket]) -> None:
+    """
+    Ajusta un socket TCP para el protocolo.
+
+    Desactiva Nagle (TCP_NODELAY) para que los requests/responses chicos no
+    esperen a juntarse con otros, y agranda los buffers de envío/recepción
+    para las responses grandes (screenshots, thumbnails).
+
+    Args:
+        sock: Socket TCP conectado (None se ignora)
+    """
+    if sock is None:
+        return
+
+    try:
+        if sock.family in (socket.AF_INET, socket.AF_INET6):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_SIZE)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER_SIZE)
+    except OSError as e:
+        logger.debug(f"No se pudieron ajustar las opciones del socket: {e}")
+
+
+@lru_cache(maxsize=256)
+def encode_header(length: int) -> bytes:
+    """
+    Codifica el header de longitud de un mensaje.
+
+    Args:
+        length: Longitud del payload en bytes
+
+    Returns:
+        Header de HEADER_SIZE bytes
+
+    Raises:
+        ProtocolError: Si el mensaje es demasiado grande
+    """
+    if length > MAX_MESSAGE_SIZE:
+        raise ProtocolError(f"Mensaje demasiado grande: {length} bytes (máximo: {MAX_MESSAGE_SIZE})")
+
+    return _HDR.pack(length)
+
+
 def encode_message(data: bytes) -> bytes:
     """
     Codifica un mensaje con el formato del protocolo.
@@ -43,12 +104,7 @@ def encode_message(data: bytes) -> bytes:
     Raises:
         ProtocolError: Si el mensaje es demasiado grande
     """
-    length = len(data)
-    if length > MAX_MESSAGE_SIZE:
-        raise ProtocolError(f"Mensaje demasiado grande: {length} bytes (máximo: {MAX_MESSAGE_SIZE})")
-
-    header = struct.pack(HEADER_FORMAT, length)
-    return header + data
+    return encode_header(len(data)) + data
 
 
 def decode_header(header: bytes) -> int:
@@ -56,7 +112,8 @@ def decode_header(header: bytes) -> int:
     Decodifica el header para obtener la longitud del mensaje.
 
     Args:
-        header: Header de 4 bytes
+        header: Header de 4 bytes (bytes, bytearray o memoryview; si es más
+            largo se leen los primeros HEADER_SIZE bytes, sin copiar)
 
     Returns:
         Longitud del mensaje
@@ -64,43 +121,86 @@ def decode_header(header: bytes) -> int:
     Raises:
         ProtocolError: Si el header es inválido o la longitud es inválida
     """
-    if len(header) != HEADER_SIZE:
+    if len(header) < HEADER_SIZE:
         raise ProtocolError(f"Header inválido: esperado {HEADER_SIZE} bytes, recibido {len(header)}")
 
-    length = struct.unpack(HEADER_FORMAT, header)[0]
+    length = _HDR.unpack_from(header)[0]
 
+    # Se valida acá, antes de que el receptor reserve 'length' bytes: un
+    # header malicioso (p. ej. 0xFFFFFFFF) no llega a provocar la reserva.
+    # Longitud 0 es válida: encode_message admite mensajes vacíos.
     if length > MAX_MESSAGE_SIZE:
-        raise ProtocolError(f"Longitud de mensaje inválida: {length} bytes")
+        raise ProtocolError(f"Longitud de mensaje inválida: {length} bytes (máximo: {MAX_MESSAGE_SIZE})")
 
     return length
 
 
-def send_message(sock: socket.socket, data: bytes) -> None:
+def send_message(sock: socket.socket, data: Union[bytes, Sequence[Union[bytes, memoryview]]]) -> None:
     """
     Envía un mensaje completo a través de un socket (versión síncrona).
 
     Args:
         sock: Socket conectado
-        data: Datos a enviar
+        data: Datos a enviar, o una lista de partes que forman el payload
+            (p. ej. serialize_pickle_parts); las partes se envían juntas
+            con sendmsg, sin concatenarlas
 
     Raises:
         ProtocolError: Si hay un error al enviar
     """
     try:
-        message = encode_message(data)
-        sock.sendall(message)
-        logger.debug(f"Mensaje enviado: {len(data)} bytes")
+        if isinstance(data, (list, tuple)):
+            parts = [memoryview(part) for part in data]
+        else:
+            parts = [memoryview(data)]
+        length = sum(part.nbytes for part in parts)
+        header = encode_header(length)
+        if hasattr(sock, 'sendmsg'):
+            _sendmsg_all(sock, header, parts)
+        else:
+            # Sin sendmsg (Windows): un sendall por parte, igual sin concatenar
+            sock.sendall(header)
+            for part in parts:
+                sock.sendall(part)
+        logger.debug(f"Mensaje enviado: {length} bytes")
     except socket.error as e:
         raise ProtocolError(f"Error al enviar mensaje: {e}")
 
 
-def receive_message(sock: socket.socket, timeout: Optional[float] = None) -> bytes:
+def _sendmsg_all(sock: socket.socket, header: bytes, parts: List[memoryview]) -> None:
+    """
+    Envía header y payload con sendmsg (scatter/gather) hasta completar.
+
+    Args:
+        sock: Socket conectado
+        header: Header del mensaje
+        parts: Partes del payload (memoryview de bytes)
+    """
+    buffers = [memoryview(header)]
+    buffers.extend(part for part in parts if part.nbytes)
+    while buffers:
+        sent = sock.sendmsg(buffers)
+        # sendmsg puede enviar parcialmente: descartar lo ya enviado
+        while buffers and sent >= len(buffers[0]):
+            sent -= len(buffers[0])
+            buffers.pop(0)
+        if buffers and sent:
+            buffers[0] = buffers[0][sent:]
+
+
+def receive_message(sock: socket.socket, timeout: Optional[float] = None,
+                    buffer: Optional[bytearray] = None) -> Union[bytes, memoryview]:
     """
     Recibe un mensaje completo de un socket (versión síncrona).
 
     Args:
         sock: Socket conectado
         timeout: Timeout en segundos (None para sin timeout)
+        buffer: Buffer reutilizable (opcional). Si se pasa, el payload se
+            recibe directamente sobre él, agrandándolo si no alcanza, y se
+            devuelve un memoryview en lugar de bytes. El memoryview es válido
+            hasta el próximo receive_message con el mismo buffer, y hay que
+            liberarlo (release()) antes de que el buffer tenga que crecer.
 
     Returns:
         Datos recibidos
@@ -114,19 +214,23 @@ def receive_message(sock: socket.socket, timeout: Optional[float] = None) -> byt
             sock.settimeout(timeout)
 
         # Recibir header
-        header = _receive_exact(sock, HEADER_SIZE)
-        if not header:
-            raise ProtocolError("Conexión cerrada por el peer")
+        header = _receive_header(sock)
 
-        # Decodificar longitud
+        # Decodificar longitud (rechaza longitudes fuera de rango antes de
+        # reservar memoria para el payload)
         length = decode_header(header)
 
-        # Recibir mensaje completo
-        data = _receive_exact(sock, length)
-        if len(data) != length:
-            raise ProtocolError(f"Mensaje incompleto: esperado {length} bytes, recibido {len(data)}")
+        # Recibir mensaje completo (_receive_into lanza ProtocolError si el
+        # peer cierra antes de completarlo)
+        if buffer is None:
+            data = _receive_exact(sock, length)
+        else:
+            if len(buffer) < length:
+                buffer.extend(bytes(length - len(buffer)))
+            data = memoryview(buffer)[:length]
+            _receive_into(sock, data)
 
-        logger.debug(f"Mensaje recibido: {len(data)} bytes")
+        logger.debug(f"Mensaje recibido: {length} bytes")
         return data
 
     except socket.timeout:
@@ -138,6 +242,72 @@ def receive_message(sock: socket.socket, timeout: Optional[float] = None) -> byt
             sock.settimeout(old_timeout)
 
 
+def _receive_header(sock: socket.socket) -> bytes:
+    """
+    Recibe el header de un mensaje.
+
+    Con MSG_WAITALL el kernel espera los HEADER_SIZE bytes en una sola
+    llamada a recv; si devuelve menos (socket con timeout, que internamente
+    es no bloqueante, o una señal) se completa con _receive_into.
+
+    Args:
+        sock: Socket conectado
+
+    Returns:
+        Header de HEADER_SIZE bytes
+
+    Raises:
+        ConnectionClosedError: Si el peer cierra la conexión antes del primer byte
+        IdleTimeoutError: Si vence el timeout antes del primer byte
+        ProtocolError: Si el peer cierra la conexión con el header a medias
+    """
+    try:
+        try:
+            header = sock.recv(HEADER_SIZE, _MSG_WAITALL)
+        except socket.timeout:
+            raise
+        except OSError:
+            if not _MSG_WAITALL:
+                raise
+            # Plataforma/socket que no acepta el flag: recv sin flags
+            header = sock.recv(HEADER_SIZE)
+    except socket.timeout:
+        # No llegó ningún byte del próximo mensaje: el cliente está inactivo
+        raise IdleTimeoutError("Timeout esperando un nuevo mensaje")
+
+    if len(header) == HEADER_SIZE:
+        return header
+    if not header:
+        raise ConnectionClosedError("Conexión cerrada por el peer")
+
+    buf = bytearray(HEADER_SIZE)
+    buf[:len(header)] = header
+    with memoryview(buf) as view, view[len(header):] as rest:
+        _receive_into(sock, rest)
+    return bytes(buf)
+
+
+def _receive_into(sock: socket.socket, view: memoryview) -> None:
+    """
+    Llena 'view' con datos del socket usando recv_into.
+
+    Args:
+        sock: Socket conectado
+        view: memoryview escribible a llenar
+
+    Raises:
+        ProtocolError: Si el peer cierra la conexión antes de llenarlo (el
+            mensaje ya empezó, así que no es un cierre limpio)
+    """
+    size = len(view)
+    offset = 0
+    while offset < size:
+        n = sock.recv_into(view[offset:])
+        if not n:
+            raise ProtocolError(f"Mensaje incompleto: esperado {size} bytes, recibido {offset}")
+        offset += n
+
+
 def _receive_exact(sock: socket.socket, size: int) -> bytes:
     """
     Recibe exactamente 'size' bytes de un socket.
@@ -148,14 +318,16 @@ def _receive_exact(sock: socket.socket, size: int) -> bytes:
 
     Returns:
         Datos recibidos
+
+    Raises:
+        ProtocolError: Si el peer cierra la conexión antes de completarlos
     """
-    data = bytearray()
-    while len(data) < size:
-        chunk = sock.recv(size - len(data))
-        if not chunk:
-            break
-        data.extend(chunk)
-    return bytes(data)
+    # Buffer preasignado: recv_into escribe directo sobre él, sin ir
+    # agrandando un bytearray ni crear un bytes intermedio por cada chunk
+    buf = bytearray(size)
+    with memoryview(buf) as view:
+        _receive_into(sock, view)
+    return bytes(buf)
 
 
 async def send_message_async(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, data: bytes) -> None:
@@ -171,8 +343,7 @@ async def send_message_async(reader: asyncio.StreamReader, writer: asyncio.Strea
         ProtocolError: Si hay un error al enviar
     """
     try:
-        message = encode_message(data)
-        writer.write(message)
+        writer.writelines((encode_header(len(data)), data))
         await writer.drain()
         logger.debug(f"Mensaje enviado (async): {len(data)} bytes")
     except Exception as e:
@@ -223,6 +394,274 @@ async def receive_message_async(reader: asyncio.StreamReader, timeout: Optional[
         raise ProtocolError(f"Error al recibir mensaje (async): {e}")
 
 
+class PipelinedWriter:
+    """
+    Acumula los mensajes enviados en un mismo tick del event loop y los
+    escribe al transporte con un único writer.write().
+
+    Si el buffer supera PIPELINE_THRESHOLD se escribe en el momento; si no,
+    la escritura queda programada con loop.call_soon() para el próximo tick.
+    Los payloads de PIPELINE_THRESHOLD bytes o más no se acumulan: se escribe
+    lo pendiente y después header y payload con writelines(), sin copiarlos.
+    """
+
+    def __init__(self, writer: asyncio.StreamWriter, threshold: int = PIPELINE_THRESHOLD):
+        """
+        Inicializa el writer.
+
+        Args:
+            writer: StreamWriter de la conexión (o cualquier objeto con
+                write(), writelines() y drain(), como FramedProtocol)
+            threshold: Bytes acumulados a partir de los cuales se escribe inmediatamente
+        """
+        self.writer = writer
+        self.threshold = threshold
+        self._buffer = bytearray()
+        self._flush_handle: Optional[asyncio.Handle] = None
+
+    def write(self, data: bytes) -> None:
+        """
+        Encola un mensaje (ya con su header) para el próximo flush.
+
+        Args:
+            data: Datos a enviar
+
+        Raises:
+            ProtocolError: Si el mensaje es demasiado grande
+        """
+        header = encode_header(len(data))
+
+        if len(data) >= self.threshold:
+            # Payload grande: respetando el orden, se escribe lo pendiente y
+            # después el mensaje tal cual, sin pasar por el buffer
+            self._write_buffer()
+            self.writer.writelines((header, data))
+            return
+
+        self._buffer += header
+        self._buffer += data
+
+        if len(self._buffer) >= self.threshold:
+            self._write_buffer()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_soon(self._write_buffer)
+
+    def _write_buffer(self) -> None:
+        """Pasa al transporte todo lo acumulado en una sola escritura."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        if self._buffer:
+            # Se entrega el bytearray sin copiarlo y se empieza uno nuevo (el
+            # transporte puede quedarse con él si no lo envía entero)
+            buffer, self._buffer = self._buffer, bytearray()
+            self.writer.write(buffer)
+
+    async def drain(self) -> None:
+        """Espera a que el transporte tenga lugar (control de flujo)."""
+        await self.writer.drain()
+
+    async def flush(self) -> None:
+        """Escribe lo pendiente sin esperar al próximo tick y hace drain."""
+        self._write_buffer()
+        await self.writer.drain()
+
+
+class FramedProtocol(asyncio.BufferedProtocol):
+    """
+    Protocolo asyncio del lado cliente que arma los mensajes recibidos.
+
+    Con BufferedProtocol el event loop hace recv_into directamente sobre los
+    buffers de este objeto, sin crear un bytes por cada recv. Los mensajes
+    chicos se leen de a bloques en un buffer intermedio reutilizable; cuando
+    un mensaje no entra completo, se reserva un bytearray de su tamaño exacto
+    y el resto del payload se recibe directo ahí, sin copias de reensamblado.
+
+    También expone write()/drain() con control de flujo, para usarse como
+    destino de un PipelinedWriter.
+    """
+
+    def __init__(self, staging_size: int = 65536):
+        """
+        Inicializa el protocolo.
+
+        Args:
+            staging_size: Tamaño del buffer intermedio de lectura
+        """
+        self._staging = bytearray(staging_size)
+        self._staged = 0
+        # Mensaje grande en curso: se recibe directo en su propio buffer
+        self._payload: Optional[bytearray] = None
+        self._payload_pos = 0
+        self._frames: Deque[Union[bytes, bytearray]] = deque()
+        self._waiter: Optional[asyncio.Future] = None
+        self._transport: Optional[asyncio.Transport] = None
+        self._exception: Optional[ProtocolError] = None
+        self._closed: Optional[asyncio.Future] = None
+        self._paused = False
+        self._drain_waiter: Optional[asyncio.Future] = None
+
+    def connection_made(self, transport: asyncio.Transport) -> None:
+        """Guarda el transporte y ajusta el socket."""
+        self._transport = transport
+        self._closed = asyncio.get_running_loop().create_future()
+        tune_socket(transport.get_extra_info('socket'))
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        """Devuelve dónde debe escribir el próximo recv_into."""
+        if self._payload is not None:
+            return memoryview(self._payload)[self._payload_pos:]
+        return memoryview(self._staging)[self._staged:]
+
+    def buffer_updated(self, nbytes: int) -> None:
+        """Procesa los nbytes recién recibidos."""
+        if self._payload is not None:
+            self._payload_pos += nbytes
+            if self._payload_pos == len(self._payload):
+                self._push(self._payload)
+                self._payload = None
+            return
+
+        self._staged += nbytes
+        try:
+            self._split_staging()
+        except ProtocolError as e:
+            self._fail(e)
+            self._transport.close()
+
+    def _split_staging(self) -> None:
+        """
+        Separa los mensajes completos del buffer intermedio.
+
+        Un mensaje incompleto pasa a su propio buffer, así en el intermedio
+        sólo puede quedar un header parcial y nunca se llena.
+
+        Raises:
+            ProtocolError: Si un header es inválido
+        """
+        end = self._staged
+        pos = 0
+        with memoryview(self._staging) as view:
+            while end - pos >= HEADER_SIZE:
+                length = decode_header(view[pos:pos + HEADER_SIZE])
+                start = pos + HEADER_SIZE
+                available = end - start
+                if available >= length:
+                    self._push(bytes(view[start:start + length]))
+                    pos = start + length
+                else:
+                    payload = bytearray(length)
+                    payload[:available] = view[start:end]
+                    self._payload = payload
+                    self._payload_pos = available
+                    pos = end
+
+        leftover = end - pos
+        if leftover:
+            self._staging[:leftover] = self._staging[pos:end]
+        self._staged = leftover
+
+    def _push(self, frame: Union[bytes, bytearray]) -> None:
+        """Encola un mensaje completo y despierta al lector."""
+        self._frames.append(frame)
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    def _fail(self, exc: ProtocolError) -> None:
+        """Registra el error de la conexión y despierta a quien espere."""
+        if self._exception is None:
+            self._exception = exc
+        for waiter in (self._waiter, self._drain_waiter):
+            if waiter is not None and not waiter.done():
+                waiter.set_result(None)
+
+    def eof_received(self) -> bool:
+        """El peer cerró su lado: se cierra la conexión."""
+        return False
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        """Marca la conexión como cerrada, con el error que corresponda."""
+        if exc is not None:
+            self._fail(ProtocolError(f"Conexión perdida: {exc}"))
+        elif self._payload is not None or self._staged:
+            pending = self._payload_pos if self._payload is not None else self._staged
+            self._fail(ProtocolError(f"Mensaje incompleto: {pending} bytes pendientes"))
+        else:
+            self._fail(ConnectionClosedError("Conexión cerrada por el peer"))
+        if not self._closed.done():
+            self._closed.set_result(None)
+
+    def pause_writing(self) -> None:
+        """El buffer de envío del transporte está lleno."""
+        self._paused = True
+
+    def resume_writing(self) -> None:
+        """El transporte volvió a tener lugar para enviar."""
+        self._paused = False
+        if self._drain_waiter is not None and not self._drain_waiter.done():
+            self._drain_waiter.set_result(None)
+
+    @property
+    def is_open(self) -> bool:
+        """Indica si la conexión sigue abierta y sin errores."""
+        return (self._transport is not None
+                and not self._transport.is_closing()
+                and self._exception is None)
+
+    def write(self, data: bytes) -> None:
+        """Pasa datos al transporte."""
+        self._transport.write(data)
+
+    def writelines(self, list_of_data) -> None:
+        """Pasa varios buffers al transporte, sin concatenarlos."""
+        self._transport.writelines(list_of_data)
+
+    async def drain(self) -> None:
+        """
+        Espera a que el transporte tenga lugar (control de flujo).
+
+        Raises:
+            ProtocolError: Si la conexión se cerró
+        """
+        if self._exception is not None:
+            raise self._exception
+        while self._paused:
+            self._drain_waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self._drain_waiter
+            finally:
+                self._drain_waiter = None
+            if self._exception is not None:
+                raise self._exception
+
+    async def read_frame(self) -> Union[bytes, bytearray]:
+        """
+        Devuelve el próximo mensaje completo.
+
+        Returns:
+            Payload del mensaje (los grandes se devuelven en el bytearray
+            donde se recibieron, sin copiarlos)
+
+        Raises:
+            ProtocolError: Si el peer cierra la conexión o el header es inválido
+        """
+        while not self._frames:
+            if self._exception is not None:
+                raise self._exception
+            self._waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+        return self._frames.popleft()
+
+    async def wait_closed(self) -> None:
+        """Espera a que el transporte termine de cerrarse."""
+        if self._closed is not None:
+            await self._closed
+
+
 class ProtocolClient:
     """Cliente del protocolo para comunicación con el servidor de procesamiento."""
 
@@ -236,8 +675,9 @@ class ProtocolClient:
         """
         self.host = host
         self.port = port
-        self.reader: Optional[asyncio.StreamReader] = None
-        self.writer: Optional[asyncio.StreamWriter] = None
+        self._transport: Optional[asyncio.Transport] = None
+        self._protocol: Optional[FramedProtocol] = None
+        self._pipeline: Optional[PipelinedWriter] = None
 
     async def connect(self, timeout: float = 5.0) -> None:
         """
@@ -250,27 +690,50 @@ class ProtocolClient:
             ProtocolError: Si no puede conectar
         """
         try:
-            self.reader, self.writer = await asyncio.wait_for(
-                asyncio.open_connection(self.host, self.port),
+            loop = asyncio.get_running_loop()
+            self._transport, self._protocol = await asyncio.wait_for(
+                loop.create_connection(FramedProtocol, self.host, self.port),
                 timeout=timeout
             )
+            self._pipeline = PipelinedWriter(self._protocol)
             logger.info(f"Conectado a {self.host}:{self.port}")
         except asyncio.TimeoutError:
             raise ProtocolError(f"Timeout al conectar a {self.host}:{self.port}")
         except Exception as e:
             raise ProtocolError(f"Error al conectar a {self.host}:{self.port}: {e}")
 
+    @property
+    def is_connected(self) -> bool:
+        """
+        Indica si la conexión sigue abierta y se puede reutilizar.
+
+        El servidor cierra las conexiones ociosas; en ese caso el protocolo
+        ya registró el cierre aunque todavía no se haya intentado leer.
+        """
+        return self._protocol is not None and self._protocol.is_open
+
     async def send(self, data: bytes, timeout: Optional[float] = None) -> None:
         """
         Envía datos al servidor.
 
+        Los envíos hechos en el mismo tick del event loop (por ejemplo, desde
+        varias tareas lanzadas con asyncio.gather) se agrupan en una sola
+        escritura al socket.
+
         Args:
             data: Datos a enviar
             timeout: Timeout en segundos
         """
-        if not self.writer:
+        if not self._protocol:
             raise ProtocolError("Cliente no conectado")
-        await send_message_async(self.reader, self.writer, data)
+        try:
+            self._pipeline.write(data)
+            await self._pipeline.drain()
+            logger.debug(f"Mensaje encolado: {len(data)} bytes")
+        except ProtocolError:
+            raise
+        except Exception as e:
+            raise ProtocolError(f"Error al enviar mensaje (async): {e}")
 
     async def receive(self, timeout: Optional[float] = None) -> bytes:
         """
@@ -280,11 +743,27 @@ class ProtocolClient:
             timeout: Timeout en segundos
 
         Returns:
-            Datos recibidos
+            Datos recibidos (un mensaje grande llega en el bytearray donde
+            se recibió, sin copiarlo a un bytes)
         """
-        if not self.reader:
+        if not self._protocol:
             raise ProtocolError("Cliente no conectado")
-        return await receive_message_async(self.reader, timeout)
+        await self._pipeline.flush()
+
+        try:
+            if timeout:
+                data = await asyncio.wait_for(self._protocol.read_frame(), timeout=timeout)
+            else:
+                data = await self._protocol.read_frame()
+        except asyncio.TimeoutError:
+            raise ProtocolError("Timeout al recibir mensaje (async)")
+        except ProtocolError:
+            raise
+        except Exception as e:
+            raise ProtocolError(f"Error al recibir mensaje (async): {e}")
+
+        logger.debug(f"Mensaje recibido (async): {len(data)} bytes")
+        return data
 
     async def send_and_receive(self, data: bytes, timeout: Optional[float] = 30.0) -> bytes:
         """
@@ -300,14 +779,81 @@ class ProtocolClient:
         await self.send(data, timeout=timeout)
         return await self.receive(timeout=timeout)
 
+    async def send_and_receive_many(self, payloads: List[bytes], concurrency: int = 32,
+                                    timeout: Optional[float] = 30.0) -> List[bytes]:
+        """
+        Envía varios requests por la misma conexión sin esperar cada respuesta.
+
+        Se mantienen hasta 'concurrency' requests en vuelo: los envíos salen
+        agrupados por el PipelinedWriter y las respuestas se leen en orden,
+        ya que el servidor responde por la misma conexión TCP en orden FIFO.
+
+        Args:
+            payloads: Requests a enviar
+            concurrency: Máximo de requests enviados sin respuesta
+            timeout: Timeout en segundos para cada respuesta
+
+        Returns:
+            Respuestas, en el mismo orden que los requests
+
+        Raises:
+            ProtocolError: Si falla un envío (se propaga enseguida, sin esperar
+                el timeout de la respuesta) o una recepción
+        """
+        window = asyncio.Semaphore(concurrency)
+
+        async def send_all():
+            for payload in payloads:
+                await window.acquire()
+                await self.send(payload, timeout=timeout)
+
+        # Un solo lector: dos receive() concurrentes sobre el mismo stream
+        # se mezclarían las respuestas
+        sender = asyncio.ensure_future(send_all())
+        receiving = None
+        responses = []
+        try:
+            for _ in payloads:
+                if sender.done():
+                    # Todo enviado (o el envío falló: result() lo propaga)
+                    sender.result()
+                    responses.append(await self.receive(timeout=timeout))
+                else:
+                    # Mientras se envía, la respuesta se espera junto con el
+                    # sender: si éste falla sin cerrar la conexión (p. ej.
+                    # mensaje demasiado grande) no llegaría ninguna respuesta
+                    receiving = asyncio.ensure_future(self.receive(timeout=timeout))
+                    await asyncio.wait((receiving, sender), return_when=asyncio.FIRST_COMPLETED)
+                    if sender.done():
+                        sender.result()
+                    responses.append(await receiving)
+                    receiving = None
+                window.release()
+            await sender
+        finally:
+            pending = [task for task in (receiving, sender) if task is not None]
+            for task in pending:
+                if not task.done():
+                    task.cancel()
+            # Recupera el resultado de las tareas para que ningún error quede
+            # sin leer ("Task exception was never retrieved")
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        return responses
+
     async def close(self) -> None:
         """Cierra la conexión."""
-        if self.writer:
-            self.writer.close()
-            await self.writer.wait_closed()
+        if self._transport:
+            try:
+                await self._pipeline.flush()
+            except Exception:
+                pass
+            self._transport.close()
+            await self._protocol.wait_closed()
             logger.info("Conexión cerrada")
-        self.reader = None
-        self.writer = None
+        self._transport = None
+        self._protocol = None
+        self._pipeline = None
 
     async def __aenter__(self):
         """Context manager entry."""
@@ -317,3 +863,82 @@ class ProtocolClient:
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Context manager exit."""
         await self.close()
+
+
+class ProtocolClientPool:
+    """
+    Pool de conexiones persistentes al servidor de procesamiento.
+
+    El servidor atiende varios requests por conexión, así que las conexiones
+    se reutilizan entre requests en lugar de abrir una por cada uno. Cada
+    conexión la usa un solo request a la vez (las respuestas se leen en
+    orden y no se pueden mezclar).
+    """
+
+    def __init__(self, host: str, port: int, max_size: int = 8):
+        """
+        Inicializa el pool (las conexiones se abren a medida que se piden).
+
+        Args:
+            host: Dirección del servidor
+            port: Puerto del servidor
+            max_size: Máximo de conexiones en uso a la vez
+        """
+        self.host = host
+        self.port = port
+        self.max_size = max_size
+        self._slots = asyncio.Semaphore(max_size)
+        self._idle: List[ProtocolClient] = []
+
+    async def acquire(self) -> ProtocolClient:
+        """
+        Obtiene una conexión del pool.
+
+        Espera si ya hay max_size conexiones en uso. Reutiliza una ociosa si
+        sigue abierta; si no hay ninguna, abre una nueva. La espera no tiene
+        timeout propio: quien llama la acota junto con el request (p. ej.
+        con asyncio.wait_for), y si se cancela el lugar no queda tomado.
+
+        Returns:
+            ProtocolClient conectado
+
+        Raises:
+            ProtocolError: Si no puede conectar
+        """
+        await self._slots.acquire()
+        try:
+            while self._idle:
+                client = self._idle.pop()
+                if client.is_connected:
+                    return client
+                # El servidor la cerró mientras estaba ociosa
+                await client.close()
+
+            client = ProtocolClient(self.host, self.port)
+            await client.connect()
+            return client
+        except BaseException:
+            self._slots.release()
+            raise
+
+    async def release(self, client: ProtocolClient, reusable: bool = True) -> None:
+        """
+        Devuelve una conexión al pool.
+
+        Args:
+            client: Conexión obtenida con acquire
+            reusable: False si hubo un error a mitad de un request (el stream
+                puede tener una respuesta sin leer y se descarta)
+        """
+        try:
+            if reusable and client.is_connected:
+                self._idle.append(client)
+            else:
+                await client.close()
+        finally:
+            self._slots.release()
+
+    async def close(self) -> None:
+        """Cierra las conexiones ociosas."""
+        while self._idle:
+            await self._idle.pop().close()
@@ -2,26 +2,55 @@
 Serialización y deserialización de datos.
 
 Este módulo proporciona funciones para serializar y deserializar datos
-que se intercambian entre los servidores. Soporta JSON y pickle.
+que se intercambian entre los servidores. Soporta JSON, pickle y msgpack.
 
 JSON se usa para datos simples y compatibilidad.
 Pickle se usa para objetos Python complejos (con precaución).
+MessagePack (opcional) es binario y compacto, y transporta bytes sin base64.
 """
 
 import json
 import pickle
 import base64
-from typing import Any, Dict
+import binascii
+import struct
+from typing import Any, Dict, List, Union
 from enum import Enum
 import logging
 
+# orjson es opcional: si está instalado se usa para JSON (devuelve bytes
+# directamente y acepta bytes al parsear); si no, se usa json de la stdlib
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# pybase64 es opcional: codifica/decodifica base64 con SIMD (SSSE3/AVX2);
+# sin él se usa binascii, que evita el overhead de base64.b64encode
+try:
+    import pybase64
+except ImportError:
+    pybase64 = None
+
+# msgpack es opcional: sólo se necesita para SerializationFormat.MSGPACK
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
 logger = logging.getLogger(__name__)
 
+# Sub-header de los mensajes pickle: cantidad de buffers out-of-band seguida
+# de la longitud de cada uno (los buffers van, en orden, después del stream)
+_PICKLE_COUNT = struct.Struct('!I')
+_PICKLE_BUFFER_LEN = struct.Struct('!Q')
+
 
 class SerializationFormat(Enum):
     """Formatos de serialización disponibles."""
     JSON = 'json'
     PICKLE = 'pickle'
+    MSGPACK = 'msgpack'
 
 
 class SerializationError(Exception):
@@ -43,6 +72,8 @@ def serialize_json(data: Any) -> bytes:
         SerializationError: Si los datos no son serializables a JSON
     """
     try:
+        if orjson is not None:
+            return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
         json_str = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
         return json_str.encode('utf-8')
     except (TypeError, ValueError) as e:
@@ -54,7 +85,7 @@ def deserialize_json(data: bytes) -> Any:
     Deserializa datos desde JSON.
 
     Args:
-        data: Bytes del JSON
+        data: Bytes del JSON (bytes, bytearray o memoryview)
 
     Returns:
         Datos deserializados
@@ -63,7 +94,9 @@ def deserialize_json(data: bytes) -> Any:
         SerializationError: Si los datos no son JSON válido
     """
     try:
-        json_str = data.decode('utf-8')
+        if orjson is not None:
+            return orjson.loads(data)
+        json_str = str(data, 'utf-8')
         return json.loads(json_str)
     except (UnicodeDecodeError, json.JSONDecodeError) as e:
         raise SerializationError(f"Error al deserializar JSON: {e}")
@@ -71,29 +104,65 @@ def deserialize_json(data: bytes) -> Any:
 
 def serialize_pickle(data: Any) -> bytes:
     """
-    Serializa datos usando pickle.
+    Serializa datos usando pickle (protocolo 5 con buffers out-of-band).
+
+    Devuelve el mensaje en un solo bytes, lo que copia los buffers
+    out-of-band una vez; para enviarlo por socket sin esa copia usar
+    serialize_pickle_parts con send_message.
+
+    Formato:
+        [4 bytes: N][N x 8 bytes: longitud de cada buffer][pickle][buffers]
+
+    Args:
+        data: Datos a serializar
+
+    Returns:
+        Bytes del pickle con sus buffers out-of-band
+
+    Raises:
+        SerializationError: Si los datos no son serializables con pickle
+    """
+    return b''.join(serialize_pickle_parts(data))
+
+
+def serialize_pickle_parts(data: Any) -> List[Union[bytes, memoryview]]:
+    """
+    Serializa datos con pickle y devuelve el mensaje en partes, sin unirlas.
+
+    Los objetos que exponen sus datos como PickleBuffer (pickle.PickleBuffer,
+    arrays de numpy) no se copian dentro del stream: van como memoryview sobre el objeto original, y send_message los pasa
+    al kernel con sendmsg (scatter/gather) sin armar un bytes intermedio.
+    Concatenadas, las partes tienen el formato de serialize_pickle.
 
     Args:
         data: Datos a serializar
 
     Returns:
-        Bytes del pickle
+        Lista de partes: header de longitudes, stream de pickle y buffers
 
     Raises:
         SerializationError: Si los datos no son serializables con pickle
     """
     try:
-        return pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
-    except pickle.PicklingError as e:
+        buffers = []
+        stream = pickle.dumps(data, protocol=5, buffer_callback=buffers.append)
+    except (pickle.PicklingError, TypeError, AttributeError) as e:
         raise SerializationError(f"Error al serializar con pickle: {e}")
 
+    raws = [b.raw() for b in buffers]
+    parts = [_PICKLE_COUNT.pack(len(raws))]
+    parts.extend(_PICKLE_BUFFER_LEN.pack(r.nbytes) for r in raws)
+    parts.append(stream)
+    parts.extend(raws)
+    return parts
+
 
 def deserialize_pickle(data: bytes) -> Any:
     """
-    Deserializa datos desde pickle.
+    Deserializa datos desde pickle (formato de serialize_pickle).
 
     Args:
-        data: Bytes del pickle
+        data: Bytes del pickle con sus buffers out-of-band
 
     Returns:
         Datos deserializados
@@ -102,11 +171,87 @@ def deserialize_pickle(data: bytes) -> Any:
         SerializationError: Si los datos no son pickle válido
     """
     try:
-        return pickle.loads(data)
-    except pickle.UnpicklingError as e:
+        view = memoryview(data)
+        (count,) = _PICKLE_COUNT.unpack_from(view, 0)
+        offset = _PICKLE_COUNT.size
+
+        lengths = []
+        for _ in range(count):
+            lengths.append(_PICKLE_BUFFER_LEN.unpack_from(view, offset)[0])
+            offset += _PICKLE_BUFFER_LEN.size
+
+        # Los buffers están al final; el stream ocupa lo que queda en el medio
+        end = len(view) - sum(lengths)
+        if end < offset:
+            raise SerializationError("Mensaje pickle truncado")
+        stream = view[offset:end]
+
+        buffers = []
+        for length in lengths:
+            buffers.append(view[end:end + length])
+            end += length
+
+        return pickle.loads(stream, buffers=buffers)
+    except (pickle.UnpicklingError, struct.error, EOFError, ValueError) as e:
         raise SerializationError(f"Error al deserializar pickle: {e}")
 
 
+def serialize_msgpack(data: Any) -> bytes:
+    """
+    Serializa datos usando MessagePack.
+
+    Args:
+        data: Datos a serializar (bytes se codifican como tipo bin)
+
+    Returns:
+        Bytes del mensaje MessagePack
+
+    Raises:
+        SerializationError: Si msgpack no está instalado o los datos no son serializables
+    """
+    if msgpack is None:
+        raise SerializationError("msgpack no está instalado")
+    try:
+        return msgpack.packb(data, use_bin_type=True)
+    except (TypeError, ValueError, OverflowError) as e:
+        raise SerializationError(f"Error al serializar con msgpack: {e}")
+
+
+def deserialize_msgpack(data: bytes) -> Any:
+    """
+    Deserializa datos desde MessagePack.
+
+    Args:
+        data: Bytes del mensaje MessagePack
+
+    Returns:
+        Datos deserializados
+
+    Raises:
+        SerializationError: Si msgpack no está instalado o los datos no son válidos
+    """
+    if msgpack is None:
+        raise SerializationError("msgpack no está instalado")
+    try:
+        return msgpack.unpackb(data, raw=False)
+    except (msgpack.UnpackException, ValueError, TypeError) as e:
+        raise SerializationError(f"Error al deserializar msgpack: {e}")
+
+
+# Tablas de dispatch por formato (una búsqueda en lugar de una cadena if/elif)
+_SERIALIZERS = {
+    SerializationFormat.JSON: serialize_json,
+    SerializationFormat.PICKLE: serialize_pickle,
+    SerializationFormat.MSGPACK: serialize_msgpack,
+}
+
+_DESERIALIZERS = {
+    SerializationFormat.JSON: deserialize_json,
+    SerializationFormat.PICKLE: deserialize_pickle,
+    SerializationFormat.MSGPACK: deserialize_msgpack,
+}
+
+
 def serialize(data: Any, format: SerializationFormat = SerializationFormat.JSON) -> bytes:
     """
     Serializa datos usando el formato especificado.
@@ -121,12 +266,11 @@ def serialize(data: Any, format: SerializationFormat = SerializationFormat.JSON)
     Raises:
         SerializationError: Si hay un error al serializar
     """
-    if format == SerializationFormat.JSON:
-        return serialize_json(data)
-    elif format == SerializationFormat.PICKLE:
-        return serialize_pickle(data)
-    else:
+    try:
+        serializer = _SERIALIZERS[format]
+    except (KeyError, TypeError):
         raise SerializationError(f"Formato de serialización no soportado: {format}")
+    return serializer(data)
 
 
 def deserialize(data: bytes, format: SerializationFormat = SerializationFormat.JSON) -> Any:
@@ -143,12 +287,11 @@ def deserialize(data: bytes, format: SerializationFormat = SerializationFormat.J
     Raises:
         SerializationError: Si hay un error al deserializar
     """
-    if format == SerializationFormat.JSON:
-        return deserialize_json(data)
-    elif format == SerializationFormat.PICKLE:
-        return deserialize_pickle(data)
-    else:
+    try:
+        deserializer = _DESERIALIZERS[format]
+    except (KeyError, TypeError):
         raise SerializationError(f"Formato de serialización no soportado: {format}")
+    return deserializer(data)
 
 
 def encode_binary_to_base64(data: bytes) -> str:
@@ -161,7 +304,9 @@ def encode_binary_to_base64(data: bytes) -> str:
     Returns:
         String base64
     """
-    return base64.b64encode(data).decode('ascii')
+    if pybase64 is not None:
+        return pybase64.b64encode(data).decode('ascii')
+    return binascii.b2a_base64(data, newline=False).decode('ascii')
 
 
 def decode_base64_to_binary(data: str) -> bytes:
@@ -178,6 +323,8 @@ def decode_base64_to_binary(data: str) -> bytes:
         SerializationError: Si el base64 es inválido
     """
     try:
+        if pybase64 is not None:
+            return pybase64.b64decode(data)
         return base64.b64decode(data)
     except Exception as e:
         raise SerializationError(f"Error al decodificar base64: {e}")
@@ -6,19 +6,114 @@ generando thumbnails optimizados.
 """
 
 import logging
-import base64
-from typing import List, Dict, Optional
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Dict, Optional, Tuple
 from io import BytesIO
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+
+from common.serialization import encode_binary_to_base64
+
+# Pillow se importa una sola vez; si no está instalado las funciones que lo
+# necesitan lanzan ImageProcessorError
+try:
+    from PIL import Image
+    _LANCZOS = Image.Resampling.LANCZOS
+except ImportError:
+    Image = None
+    _LANCZOS = None
 
 logger = logging.getLogger(__name__)
 
+# Formato de los thumbnails: JPEG es mucho más barato de codificar que PNG
+# con optimize=True (deflate al máximo esfuerzo) y pesa menos para fotos
+THUMBNAIL_FORMAT = 'JPEG'
+THUMBNAIL_JPEG_QUALITY = 85
+
+# Una requests.Session por thread (Session no es thread-safe): las descargas
+# de un mismo host reutilizan la conexión TCP/TLS en lugar de abrir una nueva
+_session_local = threading.local()
+
+# Tamaño de cada lectura al descargar imágenes
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Tamaño inicial de los buffers de descarga reutilizables
+DOWNLOAD_BUFFER_SIZE = 1 << 20
+
+# Máximo de imágenes procesadas en paralelo dentro de un mismo worker
+MAX_IMAGE_THREADS = 8
+
 
 class ImageProcessorError(Exception):
     """Excepción para errores de procesamiento de imágenes."""
     pass
 
 
+class BufferPool:
+    """
+    Pool de buffers reutilizables (bytearray, BytesIO, ...).
+
+    Evita crear y liberar un buffer nuevo por cada imagen en workers que
+    viven mucho tiempo. append/pop de deque son atómicos, así que el pool
+    se puede compartir entre los threads del ThreadPoolExecutor.
+    """
+
+    def __init__(self, factory: Callable[[], object], capacity: int = MAX_IMAGE_THREADS):
+        """
+        Inicializa el pool.
+
+        Args:
+            factory: Función que crea un buffer nuevo cuando el pool está vacío
+            capacity: Cantidad máxima de buffers libres que se conservan
+        """
+        self.factory = factory
+        self.capacity = capacity
+        self._free = deque()
+
+    @contextmanager
+    def acquire(self) -> Iterator:
+        """
+        Presta un buffer del pool y lo devuelve al salir del bloque with.
+
+        Yields:
+            Buffer (reutilizado o recién creado)
+        """
+        try:
+            buf = self._free.pop()
+        except IndexError:
+            buf = self.factory()
+        try:
+            yield buf
+        finally:
+            if len(self._free) < self.capacity:
+                self._free.append(buf)
+
+
+# Buffers para el body de las descargas y para la salida de los thumbnails
+_download_buffers = BufferPool(lambda: bytearray(DOWNLOAD_BUFFER_SIZE))
+_output_buffers = BufferPool(BytesIO)
+
+
+def _session() -> requests.Session:
+    """
+    Devuelve la sesión HTTP del thread actual (la crea la primera vez).
+
+    Returns:
+        Sesión con pool de conexiones keep-alive
+    """
+    session = getattr(_session_local, 'session', None)
+    if session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=0)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        _session_local.session = session
+    return session
+
+
 def download_image(url: str, timeout: int = 10) -> bytes:
     """
     Descarga una imagen desde una URL.
@@ -34,7 +129,7 @@ def download_image(url: str, timeout: int = 10) -> bytes:
         ImageProcessorError: Si hay un error al descargar
     """
     try:
-        response = requests.get(url, timeout=timeout, stream=True)
+        response = _session().get(url, timeout=timeout, stream=True)
 
         if response.status_code != 200:
             raise ImageProcessorError(f"HTTP {response.status_code}")
@@ -44,12 +139,28 @@ def download_image(url: str, timeout: int = 10) -> bytes:
         if not content_type.startswith('image/'):
             raise ImageProcessorError(f"Content-Type no es imagen: {content_type}")
 
-        # Limitar tamaño máximo
+        # Limitar tamaño máximo: se lee en chunks y se corta apenas se pasa,
+        # sin bajar el resto del body
         max_size = 10 * 1024 * 1024  # 10 MB
-        content = response.content
 
-        if len(content) > max_size:
-            raise ImageProcessorError(f"Imagen demasiado grande: {len(content)} bytes")
+        with _download_buffers.acquire() as buffer:
+            total = 0
+
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                end = total + len(chunk)
+                if end > max_size:
+                    response.close()
+                    raise ImageProcessorError(f"Imagen demasiado grande: más de {max_size} bytes")
+                # Escribe sobre el buffer reutilizado (crece si no alcanza)
+                buffer[total:end] = chunk
+                total = end
+
+            with memoryview(buffer) as view, view[:total] as body:
+                content = bytes(body)
+
+            # No retener buffers que crecieron mucho por una imagen grande
+            if len(buffer) > 4 * DOWNLOAD_BUFFER_SIZE:
+                del buffer[DOWNLOAD_BUFFER_SIZE:]
 
         logger.debug(f"Imagen descargada: {len(content)} bytes")
         return content
@@ -69,38 +180,59 @@ def create_thumbnail(image_bytes: bytes, max_size: tuple = (200, 200)) -> bytes:
         max_size: Tamaño máximo (ancho, alto)
 
     Returns:
-        Bytes del thumbnail en formato PNG
+        Bytes del thumbnail en formato THUMBNAIL_FORMAT
 
     Raises:
         ImageProcessorError: Si hay un error al procesar
     """
-    try:
-        from PIL import Image
+    if Image is None:
+        raise ImageProcessorError("Pillow no está instalado")
 
+    try:
         # Cargar imagen
         img = Image.open(BytesIO(image_bytes))
-
-        # Convertir a RGB si es necesario (para PNG con transparencia, etc.)
-        if img.mode not in ('RGB', 'L'):
-            img = img.convert('RGB')
-
-        # Crear thumbnail
-        img.thumbnail(max_size, Image.Resampling.LANCZOS)
-
-        # Guardar como PNG optimizado
-        output = BytesIO()
-        img.save(output, format='PNG', optimize=True)
-        thumbnail_bytes = output.getvalue()
+        thumbnail_bytes = _encode_thumbnail(img, max_size)
 
         logger.debug(f"Thumbnail creado: {len(image_bytes)} -> {len(thumbnail_bytes)} bytes")
         return thumbnail_bytes
 
-    except ImportError:
-        raise ImageProcessorError("Pillow no está instalado")
     except Exception as e:
         raise ImageProcessorError(f"Error al crear thumbnail: {e}")
 
 
+def _encode_thumbnail(img: 'Image.Image', max_size: tuple) -> bytes:
+    """
+    Reduce una imagen ya abierta y la codifica en THUMBNAIL_FORMAT.
+
+    Args:
+        img: Imagen de Pillow (se modifica en el lugar)
+        max_size: Tamaño máximo (ancho, alto)
+
+    Returns:
+        Bytes del thumbnail
+    """
+    # Convertir a RGB si es necesario (para PNG con transparencia, etc.)
+    if img.mode not in ('RGB', 'L'):
+        img = img.convert('RGB')
+
+    # Crear thumbnail (con pillow-simd instalado en lugar de Pillow, el
+    # resize LANCZOS usa sus kernels SSE4/AVX2 sin cambiar este código)
+    img.thumbnail(max_size, _LANCZOS)
+
+    with _output_buffers.acquire() as output:
+        # El BytesIO se reutiliza: se escribe desde el inicio y se copia
+        # sólo lo escrito en esta vuelta
+        output.seek(0)
+        if THUMBNAIL_FORMAT == 'JPEG':
+            img.save(output, format='JPEG', quality=THUMBNAIL_JPEG_QUALITY, progressive=False)
+        else:
+            img.save(output, format=THUMBNAIL_FORMAT, optimize=True)
+        written = output.tell()
+
+        with output.getbuffer() as view, view[:written] as data:
+            return bytes(data)
+
+
 def image_to_base64(image_bytes: bytes) -> str:
     """
     Convierte bytes de imagen a string base64.
@@ -111,7 +243,7 @@ def image_to_base64(image_bytes: bytes) -> str:
     Returns:
         String base64
     """
-    return base64.b64encode(image_bytes).decode('ascii')
+    return encode_binary_to_base64(image_bytes)
 
 
 def get_image_info(image_bytes: bytes) -> Dict:
@@ -125,7 +257,8 @@ def get_image_info(image_bytes: bytes) -> Dict:
         Diccionario con información de la imagen
     """
     try:
-        from PIL import Image
+        if Image is None:
+            raise ImageProcessorError("Pillow no está instalado")
 
         img = Image.open(BytesIO(image_bytes))
 
@@ -144,44 +277,103 @@ def get_image_info(image_bytes: bytes) -> Dict:
         }
 
 
-def process_images(image_urls: List[str], max_images: int = 5) -> List[Dict]:
+# Pool de threads del proceso, creado la primera vez que se usa; se mantiene
+# vivo entre llamadas para que cada thread conserve su sesión HTTP
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _image_executor() -> ThreadPoolExecutor:
+    """
+    Devuelve el pool de threads del proceso actual (lo crea la primera vez).
+
+    Returns:
+        ThreadPoolExecutor con MAX_IMAGE_THREADS threads
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=MAX_IMAGE_THREADS)
+    return _executor
+
+
+def _process_one(url: str) -> Tuple[Dict, bytes]:
+    """
+    Descarga una imagen y genera su thumbnail.
+
+    Args:
+        url: URL de la imagen
+
+    Returns:
+        Tupla (metadata, bytes del thumbnail)
+
+    Raises:
+        ImageProcessorError: Si falla la descarga o el procesamiento
+    """
+    # Descargar imagen
+    image_bytes = download_image(url, timeout=10)
+
+    if Image is None:
+        raise ImageProcessorError("Pillow no está instalado")
+
+    # Se abre una sola vez: la misma imagen da la info y el thumbnail
+    try:
+        img = Image.open(BytesIO(image_bytes))
+        result = {
+            'url': url,
+            'original_size_bytes': len(image_bytes),
+            'width': img.width,
+            'height': img.height,
+            'format': img.format
+        }
+
+        thumbnail_bytes = _encode_thumbnail(img, (200, 200))
+    except Exception as e:
+        raise ImageProcessorError(f"Error al crear thumbnail: {e}")
+
+    result['thumbnail_size_bytes'] = len(thumbnail_bytes)
+    return result, thumbnail_bytes
+
+
+def process_images(image_urls: List[str], max_images: int = 5,
+                   blobs: Optional[List[bytes]] = None) -> List[Dict]:
     """
     Procesa múltiples imágenes: descarga y genera thumbnails.
 
+    Las imágenes se procesan en paralelo con un pool de threads: las descargas
+    se superponen y Pillow libera el GIL durante el decode/resize/encode.
+    No se usa un pool de procesos porque esta función corre dentro de un
+    worker del Pool del servidor, que es daemon y no puede tener hijos.
+
     Args:
         image_urls: Lista de URLs de imágenes
         max_images: Número máximo de imágenes a procesar
+        blobs: Si se pasa una lista, los thumbnails se agregan ahí como bytes
+            crudos y cada resultado lleva 'thumbnail_ref' (índice en la lista)
+            en lugar de 'thumbnail' en base64
 
     Returns:
-        Lista de diccionarios con thumbnails y metadata
+        Lista de diccionarios con thumbnails y metadata (en el orden de las URLs)
     """
-    results = []
+    urls = image_urls[:max_images]
+    if not urls:
+        return []
 
-    for i, url in enumerate(image_urls[:max_images]):
-        try:
-            logger.debug(f"Procesando imagen {i+1}/{min(len(image_urls), max_images)}: {url}")
+    results = []
 
-            # Descargar imagen
-            image_bytes = download_image(url, timeout=10)
+    futures = [_image_executor().submit(_process_one, url) for url in urls]
 
-            # Obtener info
-            info = get_image_info(image_bytes)
+    for url, future in zip(urls, futures):
+        try:
+            result, thumbnail_bytes = future.result()
 
-            # Crear thumbnail
-            thumbnail_bytes = create_thumbnail(image_bytes, max_size=(200, 200))
+            if blobs is not None:
+                # Transporte binario: el thumbnail viaja como frame aparte
+                result['thumbnail_ref'] = len(blobs)
+                blobs.append(thumbnail_bytes)
+            else:
+                # Convertir a base64
+                result['thumbnail'] = image_to_base64(thumbnail_bytes)
 
-            # Convertir a base64
-            thumbnail_b64 = image_to_base64(thumbnail_bytes)
-
-            results.append({
-                'url': url,
-                'thumbnail': thumbnail_b64,
-                'original_size_bytes': info.get('size_bytes', 0),
-                'thumbnail_size_bytes': len(thumbnail_bytes),
-                'width': info.get('width'),
-                'height': info.get('height'),
-                'format': info.get('format')
-            })
+            results.append(result)
 
             logger.info(f"Imagen procesada: {url}")
 
@@ -196,7 +388,7 @@ def process_images(image_urls: List[str], max_images: int = 5) -> List[Dict]:
 
 
 # Función principal que se ejecutará en un proceso separado
-def process_images_task(image_urls: List[str], max_images: int = 5) -> Dict:
+def process_images_task(image_urls: List[str], max_images: int = 5, raw: bool = False) -> Dict:
     """
     Función principal para procesamiento de imágenes.
 
@@ -206,6 +398,9 @@ def process_images_task(image_urls: List[str], max_images: int = 5) -> Dict:
     Args:
         image_urls: Lista de URLs de imágenes
         max_images: Número máximo de imágenes a procesar
+        raw: Si es True, los thumbnails no se codifican en base64: se
+            devuelven como bytes en '_blobs' y cada entrada los referencia
+            con 'thumbnail_ref'
 
     Returns:
         Diccionario con resultados del procesamiento
@@ -218,18 +413,24 @@ def process_images_task(image_urls: List[str], max_images: int = 5) -> Dict:
                 'processed_count': 0
             }
 
-        thumbnails = process_images(image_urls, max_images)
+        blobs = [] if raw else None
+        thumbnails = process_images(image_urls, max_images, blobs=blobs)
 
         # Contar cuántas se procesaron exitosamente
-        successful = sum(1 for t in thumbnails if 'thumbnail' in t)
+        successful = sum(1 for t in thumbnails if 'thumbnail' in t or 'thumbnail_ref' in t)
 
-        return {
+        result = {
             'success': True,
             'thumbnails': thumbnails,
             'processed_count': successful,
             'total_images': len(image_urls)
         }
 
+        if raw:
+            result['_blobs'] = blobs
+
+        return result
+
     except Exception as e:
         logger.error(f"Error al procesar imágenes: {e}")
         return {
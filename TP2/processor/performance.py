@@ -5,15 +5,68 @@ Este módulo analiza el rendimiento de páginas web:
 tiempo de carga, tamaño de recursos, número de requests, etc.
 """
 
+import asyncio
 import logging
 import time
-from typing import Dict, List, Tuple
+from bisect import bisect_left
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 from urllib.parse import urljoin, urlparse
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 
+from scraper.async_http import AsyncHTTPClient, HTTPError
+
+# lxml es opcional: si está instalado los recursos se extraen con XPath
+# compiladas (todo el recorrido en libxml2) y BeautifulSoup lo usa como parser;
+# si no, el parser puro de Python
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+    _BS4_PARSER = 'lxml'
+except ImportError:
+    etree = None
+    lxml_html = None
+    _BS4_PARSER = 'html.parser'
+
+if etree is not None:
+    # Compiladas una sola vez; devuelven directamente los valores de atributo
+    _XPATH_CSS = etree.XPath(
+        "//link[contains(concat(' ', normalize-space(@rel), ' '), ' stylesheet ')]/@href"
+    )
+    _XPATH_JS = etree.XPath('//script/@src')
+    _XPATH_IMAGES = etree.XPath('//img/@src')
+
+# selectolax es opcional: su parser Lexbor extrae los recursos con selectores
+# CSS sin construir el árbol de BeautifulSoup
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
 logger = logging.getLogger(__name__)
 
+# Recursos a los que se les consulta el tamaño (HEAD) y cuántos en paralelo
+MAX_PROBED_RESOURCES = 20
+HEAD_WORKERS = 16
+# Resultados de consultas de tamaño guardados por URL (ver _probe_size)
+PROBE_CACHE_SIZE = 4096
+# Header para pedir sólo el primer byte cuando HEAD no sirve
+_RANGE_FIRST_BYTE = {'Range': 'bytes=0-0'}
+
+# Cache del proceso de _probe_size_async: url -> (tamaño, tiempo) o None
+_async_probe_cache: 'OrderedDict[str, Optional[Tuple[int, int]]]' = OrderedDict()
+
+# Sesión compartida por todo el módulo: keep-alive y reutilización de TLS
+# entre la página, sus recursos y los análisis siguientes del mismo worker
+_SESSION = requests.Session()
+_SESSION_ADAPTER = HTTPAdapter(pool_connections=32, pool_maxsize=64)
+_SESSION.mount('http://', _SESSION_ADAPTER)
+_SESSION.mount('https://', _SESSION_ADAPTER)
+
 
 class PerformanceError(Exception):
     """Excepción para errores de análisis de rendimiento."""
@@ -39,7 +92,7 @@ def analyze_page_performance(url: str, timeout: int = 30) -> Dict:
 
         # Medir tiempo de carga de la página principal
         start_time = time.time()
-        response = requests.get(url, timeout=timeout)
+        response = _SESSION.get(url, timeout=timeout)
         load_time_ms = int((time.time() - start_time) * 1000)
 
         if response.status_code != 200:
@@ -48,49 +101,32 @@ def analyze_page_performance(url: str, timeout: int = 30) -> Dict:
         html = response.text
         html_size = len(html.encode('utf-8'))
 
-        # Parsear HTML para encontrar recursos
-        soup = BeautifulSoup(html, 'html.parser')
-
-        # Encontrar todos los recursos
-        resources = _extract_resources(soup, url)
-
-        # Calcular estadísticas
-        total_size_kb = html_size / 1024
-        num_requests = 1  # La página HTML principal
-
-        resource_details = []
-
-        for resource_url, resource_type in resources[:20]:  # Limitar a 20 recursos para no tardar mucho
-            try:
-                res_start = time.time()
-                res_response = requests.head(resource_url, timeout=5, allow_redirects=True)
-                res_time = int((time.time() - res_start) * 1000)
-
-                if res_response.status_code == 200:
-                    content_length = int(res_response.headers.get('Content-Length', 0))
-                    total_size_kb += content_length / 1024
-                    num_requests += 1
-
-                    resource_details.append({
-                        'url': resource_url,
-                        'type': resource_type,
-                        'size_kb': round(content_length / 1024, 2),
-                        'load_time_ms': res_time
-                    })
-            except Exception as e:
-                logger.debug(f"No se pudo obtener info de {resource_url}: {e}")
-                continue
-
-        logger.info(f"Análisis de rendimiento completado: {num_requests} requests, {total_size_kb:.2f} KB")
-
-        return {
-            'success': True,
-            'load_time_ms': load_time_ms,
-            'total_size_kb': round(total_size_kb, 2),
-            'num_requests': num_requests,
-            'html_size_kb': round(html_size / 1024, 2),
-            'resources': resource_details[:10]  # Primeros 10 recursos
-        }
+        # Parsear HTML y encontrar todos los recursos
+        resources = _find_resources(html, url)
+
+        # Las consultas de tamaño son I/O puro: se lanzan en paralelo sobre una
+        # sesión con keep-alive, así el costo total es ~1 RTT en lugar de uno
+        # por recurso
+        probed = resources[:MAX_PROBED_RESOURCES]
+        probes = []
+        with ThreadPoolExecutor(max_workers=HEAD_WORKERS) as executor:
+            futures = [
+                executor.submit(_probe_size, resource_url)
+                for resource_url, _ in probed
+            ]
+
+            for (resource_url, resource_type), future in zip(probed, futures):
+                try:
+                    probe = future.result()
+                except Exception as e:
+                    logger.debug(f"No se pudo obtener info de {resource_url}: {e}")
+                    continue
+
+                if probe is not None:
+                    size_bytes, res_time = probe
+                    probes.append((resource_url, resource_type, size_bytes, res_time))
+
+        return _summarize_performance(load_time_ms, html_size, probes)
 
     except requests.Timeout:
         raise PerformanceError(f"Timeout al analizar {url}")
@@ -100,41 +136,411 @@ def analyze_page_performance(url: str, timeout: int = 30) -> Dict:
         raise PerformanceError(f"Error inesperado: {e}")
 
 
-def _extract_resources(soup: BeautifulSoup, base_url: str) -> List[Tuple[str, str]]:
+async def analyze_page_performance_async(url: str, timeout: int = 30) -> Dict:
     """
-    Extrae URLs de recursos de un HTML.
+    Analiza el rendimiento de una página web (versión asíncrona).
+
+    Usa AsyncHTTPClient: el GET de la página y todos los HEAD de los recursos
+    comparten una sesión aiohttp y los HEAD se lanzan juntos con gather.
 
     Args:
-        soup: BeautifulSoup object
+        url: URL de la página a analizar
+        timeout: Timeout en segundos
+
+    Returns:
+        Diccionario con métricas de rendimiento (mismo formato que
+        analyze_page_performance)
+
+    Raises:
+        PerformanceError: Si hay un error al analizar
+    """
+    try:
+        logger.debug(f"Analizando rendimiento de {url} (async)")
+
+        async with AsyncHTTPClient(timeout=timeout) as client:
+            # Medir tiempo de carga de la página principal
+            start_time = time.time()
+            # Sin cache: una revalidación 304 mediría otra cosa y el tamaño
+            # saldría de memoria
+            html, status, _, html_size = await client.get_full(url, use_cache=False)
+            load_time_ms = int((time.time() - start_time) * 1000)
+
+            if status != 200:
+                raise PerformanceError(f"HTTP {status}")
+
+            # Parsear HTML y encontrar todos los recursos
+            resources = _find_resources(html, url)
+            probed = resources[:MAX_PROBED_RESOURCES]
+
+            results = await asyncio.gather(
+                *(_probe_size_async(client, resource_url) for resource_url, _ in probed),
+                return_exceptions=True
+            )
+
+        probes = []
+        for (resource_url, resource_type), result in zip(probed, results):
+            if isinstance(result, Exception):
+                logger.debug(f"No se pudo obtener info de {resource_url}: {result}")
+                continue
+            if result is not None:
+                size_bytes, res_time = result
+                probes.append((resource_url, resource_type, size_bytes, res_time))
+
+        return _summarize_performance(load_time_ms, html_size, probes)
+
+    except HTTPError as e:
+        raise PerformanceError(f"Error de request: {e}")
+    except Exception as e:
+        raise PerformanceError(f"Error inesperado: {e}")
+
+
+def analyze_page_performance_aio(url: str, timeout: int = 30) -> Dict:
+    """
+    Wrapper síncrono de analyze_page_performance_async.
+
+    Pensado para los workers del pool de procesos, que no tienen un event
+    loop propio corriendo.
+
+    Args:
+        url: URL de la página a analizar
+        timeout: Timeout en segundos
+
+    Returns:
+        Diccionario con métricas de rendimiento
+    """
+    return asyncio.run(analyze_page_performance_async(url, timeout=timeout))
+
+
+def _summarize_performance(load_time_ms: int, html_size: int, probes: List[Tuple]) -> Dict:
+    """
+    Arma el resultado del análisis a partir de los recursos consultados.
+
+    Args:
+        load_time_ms: Tiempo de carga de la página principal
+        html_size: Tamaño del HTML en bytes
+        probes: Lista de tuplas (url, tipo, tamaño en bytes, tiempo en ms) de
+            los recursos que respondieron
+
+    Returns:
+        Diccionario con métricas de rendimiento
+    """
+    # Calcular estadísticas
+    total_size_kb = html_size / 1024
+    num_requests = 1  # La página HTML principal
+
+    resource_details = []
+
+    for resource_url, resource_type, content_length, res_time in probes:
+        total_size_kb += content_length / 1024
+        num_requests += 1
+
+        resource_details.append({
+            'url': resource_url,
+            'type': resource_type,
+            'size_kb': round(content_length / 1024, 2),
+            'load_time_ms': res_time
+        })
+
+    logger.info(f"Análisis de rendimiento completado: {num_requests} requests, {total_size_kb:.2f} KB")
+
+    return {
+        'success': True,
+        'load_time_ms': load_time_ms,
+        'total_size_kb': round(total_size_kb, 2),
+        'num_requests': num_requests,
+        'html_size_kb': round(html_size / 1024, 2),
+        'resources': resource_details[:10]  # Primeros 10 recursos
+    }
+
+
+@lru_cache(maxsize=PROBE_CACHE_SIZE)
+def _probe_size(resource_url: str) -> Optional[Tuple[int, int]]:
+    """
+    Obtiene el tamaño de un recurso sin descargarlo.
+
+    Primero hace HEAD; si el servidor no lo acepta (muchos CDN responden
+    403/405) o no informa Content-Length, pide sólo el primer byte con un
+    GET con Range y toma el total de Content-Range. El resultado se cachea
+    por URL: los recursos compartidos entre páginas (analytics, librerías)
+    no se vuelven a consultar.
+
+    Args:
+        resource_url: URL del recurso
+
+    Returns:
+        Tupla (tamaño en bytes, tiempo en ms), o None si el recurso no
+        respondió correctamente. Si respondió pero no informa su tamaño,
+        el tamaño es 0.
+    """
+    res_start = time.time()
+
+    response = _SESSION.head(resource_url, timeout=5, allow_redirects=True)
+    reachable, size_bytes = _size_from_head(response.status_code, response.headers)
+
+    if size_bytes is None:
+        response = _SESSION.get(resource_url, headers=_RANGE_FIRST_BYTE,
+                                timeout=5, stream=True, allow_redirects=True)
+        try:
+            # Si el servidor ignora el Range no se lee el body
+            range_reachable, size_bytes = _size_from_range(response.status_code, response.headers)
+            reachable = reachable or range_reachable
+        finally:
+            response.close()
+
+    if not reachable:
+        return None
+
+    return size_bytes or 0, int((time.time() - res_start) * 1000)
+
+
+async def _probe_size_async(client: AsyncHTTPClient, resource_url: str) -> Optional[Tuple[int, int]]:
+    """
+    Versión asíncrona de _probe_size, con la misma lógica y el mismo cache
+    por URL (un LRU del proceso en lugar de lru_cache).
+
+    Args:
+        client: Cliente HTTP con la sesión del análisis
+        resource_url: URL del recurso
+
+    Returns:
+        Lo mismo que _probe_size
+
+    Raises:
+        HTTPError: Si falla el request HEAD o el GET con Range
+    """
+    if resource_url in _async_probe_cache:
+        _async_probe_cache.move_to_end(resource_url)
+        return _async_probe_cache[resource_url]
+
+    res_start = time.time()
+
+    status, headers = await client.head(resource_url, timeout=5)
+    reachable, size_bytes = _size_from_head(status, headers)
+
+    if size_bytes is None:
+        status, headers = await client.get_headers(resource_url, headers=_RANGE_FIRST_BYTE, timeout=5)
+        range_reachable, size_bytes = _size_from_range(status, headers)
+        reachable = reachable or range_reachable
+
+    result = None
+    if reachable:
+        result = size_bytes or 0, int((time.time() - res_start) * 1000)
+
+    _async_probe_cache[resource_url] = result
+    if len(_async_probe_cache) > PROBE_CACHE_SIZE:
+        _async_probe_cache.popitem(last=False)
+    return result
+
+
+def _header(headers, name: str) -> Optional[str]:
+    """
+    Busca un header sin distinguir mayúsculas.
+
+    Los headers de requests ya son case-insensitive; los de AsyncHTTPClient
+    llegan como dict con los nombres tal como los mandó el servidor.
+    """
+    value = headers.get(name)
+    if value is None:
+        lowered = name.lower()
+        for key, candidate in headers.items():
+            if key.lower() == lowered:
+                return candidate
+    return value
+
+
+def _content_length(headers) -> Optional[int]:
+    """Content-Length como entero, o None si falta o no es un número."""
+    value = _header(headers, 'Content-Length')
+    if value is not None and value.strip().isdigit():
+        return int(value)
+    return None
+
+
+def _size_from_head(status: int, headers) -> Tuple[bool, Optional[int]]:
+    """
+    Interpreta la respuesta a un HEAD.
+
+    Returns:
+        Tupla (el recurso respondió, tamaño en bytes o None si no lo informa)
+    """
+    if status in (200, 204):
+        return True, _content_length(headers)
+    # Muchos CDN responden 403/405 a HEAD: se reintenta con GET y Range
+    return False, None
+
+
+def _size_from_range(status: int, headers) -> Tuple[bool, Optional[int]]:
+    """
+    Interpreta la respuesta a un GET con 'Range: bytes=0-0'.
+
+    Returns:
+        Tupla (el recurso respondió, tamaño en bytes o None si no lo informa)
+    """
+    if status == 206:
+        # Content-Range: bytes 0-0/<total>  ('*' si es desconocido)
+        total = (_header(headers, 'Content-Range') or '').rpartition('/')[2]
+        return True, int(total) if total.isdigit() else None
+    if status == 200:
+        # El servidor ignoró el Range
+        return True, _content_length(headers)
+    return False, None
+
+
+@lru_cache(maxsize=8192)
+def _join(base_url: str, ref: str) -> str:
+    """
+    Resuelve una URL relativa contra la base, cacheando el resultado.
+
+    urljoin es Python puro y vuelve a parsear la base en cada llamada; las
+    páginas repiten muchas veces los mismos prefijos y un worker analiza
+    varias páginas del mismo sitio.
+
+    Args:
+        base_url: URL base
+        ref: URL (relativa o absoluta) encontrada en el HTML
+
+    Returns:
+        URL absoluta
+    """
+    return urljoin(base_url, ref)
+
+
+def _find_resources(html: str, base_url: str) -> List[Tuple[str, str]]:
+    """
+    Extrae URLs de recursos de un HTML con el parser más rápido disponible.
+
+    Args:
+        html: Contenido HTML
+        base_url: URL base para resolver URLs relativas
+
+    Returns:
+        Lista de tuplas (url, tipo)
+    """
+    if LexborHTMLParser is not None:
+        return _extract_resources_fast(html, base_url)
+    if etree is not None:
+        try:
+            return _extract_resources_xpath(html, base_url)
+        except (etree.ParserError, ValueError) as e:
+            # Documento vacío o con declaración de encoding en un str
+            logger.debug(f"lxml no pudo parsear el HTML: {e}")
+    return _extract_resources(BeautifulSoup(html, _BS4_PARSER), base_url)
+
+
+def _extract_resources_fast(html: str, base_url: str) -> List[Tuple[str, str]]:
+    """
+    Extrae URLs de recursos usando selectolax (Lexbor).
+
+    Devuelve lo mismo que _extract_resources, en el mismo orden.
+
+    Args:
+        html: Contenido HTML
         base_url: URL base para resolver URLs relativas
 
     Returns:
         Lista de tuplas (url, tipo)
     """
+    tree = LexborHTMLParser(html)
     resources = []
 
     # CSS
-    for link in soup.find_all('link', rel='stylesheet'):
-        href = link.get('href')
+    for node in tree.css('link[rel~="stylesheet"][href]'):
+        href = node.attributes.get('href')
         if href:
-            resources.append((urljoin(base_url, href), 'css'))
+            resources.append((_join(base_url, href), 'css'))
 
     # JavaScript
-    for script in soup.find_all('script', src=True):
-        src = script.get('src')
+    for node in tree.css('script[src]'):
+        src = node.attributes.get('src')
         if src:
-            resources.append((urljoin(base_url, src), 'js'))
+            resources.append((_join(base_url, src), 'js'))
 
     # Imágenes
-    for img in soup.find_all('img', src=True):
-        src = img.get('src')
+    for node in tree.css('img[src]'):
+        src = node.attributes.get('src')
         if src:
-            resources.append((urljoin(base_url, src), 'image'))
+            resources.append((_join(base_url, src), 'image'))
 
     logger.debug(f"Encontrados {len(resources)} recursos")
     return resources
 
 
+def _extract_resources_xpath(html: str, base_url: str) -> List[Tuple[str, str]]:
+    """
+    Extrae URLs de recursos usando las XPath compiladas de lxml.
+
+    Devuelve lo mismo que _extract_resources, en el mismo orden.
+
+    Args:
+        html: Contenido HTML
+        base_url: URL base para resolver URLs relativas
+
+    Returns:
+        Lista de tuplas (url, tipo)
+
+    Raises:
+        etree.ParserError: Si el documento está vacío
+        ValueError: Si el str trae una declaración de encoding
+    """
+    doc = lxml_html.document_fromstring(html)
+
+    resources = [(_join(base_url, href), 'css') for href in _XPATH_CSS(doc) if href]
+    resources.extend((_join(base_url, src), 'js') for src in _XPATH_JS(doc) if src)
+    resources.extend((_join(base_url, src), 'image') for src in _XPATH_IMAGES(doc) if src)
+
+    logger.debug(f"Encontrados {len(resources)} recursos")
+    return resources
+
+
+def _extract_resources(soup: BeautifulSoup, base_url: str) -> List[Tuple[str, str]]:
+    """
+    Extrae URLs de recursos de un HTML.
+
+    Args:
+        soup: BeautifulSoup object
+        base_url: URL base para resolver URLs relativas
+
+    Returns:
+        Lista de tuplas (url, tipo)
+    """
+    css = []
+    js = []
+    images = []
+
+    # Un solo recorrido del árbol para los tres tipos de tag (en lugar de un
+    # find_all por tipo); se agrupan igual que antes: CSS, JS, imágenes
+    for tag in soup.find_all(('link', 'script', 'img')):
+        name = tag.name
+
+        if name == 'link':
+            # rel es multivaluado: 'stylesheet' puede venir junto a otros valores
+            href = tag.get('href')
+            if href and 'stylesheet' in (tag.get('rel') or ()):
+                css.append((_join(base_url, href), 'css'))
+        else:
+            src = tag.get('src')
+            if src:
+                if name == 'script':
+                    js.append((_join(base_url, src), 'js'))
+                else:
+                    images.append((_join(base_url, src), 'image'))
+
+    resources = css + js + images
+
+    logger.debug(f"Encontrados {len(resources)} recursos")
+    return resources
+
+
+# Umbrales (en orden creciente) y penalización por tramo: un valor por encima
+# del i-ésimo umbral (y no del siguiente) resta PENALTIES[i + 1]
+LOAD_TIME_THRESHOLDS = (1000, 1500, 3000)
+LOAD_TIME_PENALTIES = (0, 5, 15, 30)
+TOTAL_SIZE_THRESHOLDS = (1000, 2000, 5000)
+TOTAL_SIZE_PENALTIES = (0, 5, 10, 20)
+NUM_REQUESTS_THRESHOLDS = (30, 50, 100)
+NUM_REQUESTS_PENALTIES = (0, 5, 10, 20)
+
+
 def calculate_performance_score(metrics: Dict) -> int:
     """
     Calcula un score de rendimiento basado en las métricas.
@@ -145,34 +551,12 @@ def calculate_performance_score(metrics: Dict) -> int:
     Returns:
         Score de 0 a 100
     """
+    # bisect_left cuenta los umbrales estrictamente menores al valor, es decir
+    # cuántos umbrales supera (un valor igual al umbral no penaliza)
     score = 100
-
-    # Penalizar por tiempo de carga
-    load_time = metrics.get('load_time_ms', 0)
-    if load_time > 3000:
-        score -= 30
-    elif load_time > 1500:
-        score -= 15
-    elif load_time > 1000:
-        score -= 5
-
-    # Penalizar por tamaño total
-    total_size = metrics.get('total_size_kb', 0)
-    if total_size > 5000:
-        score -= 20
-    elif total_size > 2000:
-        score -= 10
-    elif total_size > 1000:
-        score -= 5
-
-    # Penalizar por número de requests
-    num_requests = metrics.get('num_requests', 0)
-    if num_requests > 100:
-        score -= 20
-    elif num_requests > 50:
-        score -= 10
-    elif num_requests > 30:
-        score -= 5
+    score -= LOAD_TIME_PENALTIES[bisect_left(LOAD_TIME_THRESHOLDS, metrics.get('load_time_ms', 0))]
+    score -= TOTAL_SIZE_PENALTIES[bisect_left(TOTAL_SIZE_THRESHOLDS, metrics.get('total_size_kb', 0))]
+    score -= NUM_REQUESTS_PENALTIES[bisect_left(NUM_REQUESTS_THRESHOLDS, metrics.get('num_requests', 0))]
 
     return max(0, score)
 
@@ -189,18 +573,18 @@ def analyze_performance_simple(url: str, html: str) -> Dict:
         Diccionario con métricas básicas
     """
     try:
-        soup = BeautifulSoup(html, 'html.parser')
-        resources = _extract_resources(soup, url)
+        resources = _find_resources(html, url)
 
         html_size_kb = len(html.encode('utf-8')) / 1024
 
         # Estimaciones
         estimated_size_kb = html_size_kb
 
-        # Estimar tamaño de recursos
-        num_css = sum(1 for _, t in resources if t == 'css')
-        num_js = sum(1 for _, t in resources if t == 'js')
-        num_images = sum(1 for _, t in resources if t == 'image')
+        # Estimar tamaño de recursos (una sola pasada para contar por tipo)
+        counts = Counter(resource_type for _, resource_type in resources)
+        num_css = counts['css']
+        num_js = counts['js']
+        num_images = counts['image']
 
         # Estimaciones aproximadas
         estimated_size_kb += num_css * 50  # ~50 KB por CSS
@@ -248,8 +632,8 @@ def process_performance(url: str, html: str = None) -> Dict:
             # Usar análisis simple si ya tenemos el HTML
             result = analyze_performance_simple(url, html)
         else:
-            # Hacer análisis completo
-            result = analyze_page_performance(url, timeout=30)
+            # Hacer análisis completo (GET + HEADs concurrentes con aiohttp)
+            result = analyze_page_performance_aio(url, timeout=30)
 
         # Calcular score si el análisis fue exitoso
         if result.get('success'):
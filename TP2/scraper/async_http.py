@@ -7,15 +7,46 @@ de forma asíncrona usando aiohttp.
 
 import asyncio
 import aiohttp
+from collections import OrderedDict
 from typing import Optional, Dict, Tuple
 import logging
-from datetime import datetime
+import time
+
+# Brotli es opcional: aiohttp sólo descomprime 'br' si está instalado, así que
+# sólo se anuncia en Accept-Encoding cuando se puede decodificar
+try:
+    import brotli  # noqa: F401
+    _ACCEPT_ENCODING = 'br, gzip, deflate'
+except ImportError:
+    _ACCEPT_ENCODING = 'gzip, deflate'
+
+# aiodns es opcional: con él aiohttp resuelve DNS con c-ares, sin pasar por
+# el pool de threads de getaddrinfo
+try:
+    import aiodns  # noqa: F401
+    _HAS_AIODNS = True
+except ImportError:
+    _HAS_AIODNS = False
 
 logger = logging.getLogger(__name__)
 
 # Configuración por defecto
 DEFAULT_TIMEOUT = 30.0
 DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+BINARY_CHUNK_SIZE = 64 * 1024
+RESPONSE_CACHE_SIZE = 1024
+# Cada entrada guarda el body completo: además de la cantidad de entradas se
+# limita el total de bytes, y no se cachean bodies de más de 1/16 del total
+RESPONSE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+RESPONSE_CACHE_MAX_ENTRY = RESPONSE_CACHE_MAX_BYTES // 16
+DNS_CACHE_TTL = 600
+
+# Cache LRU del proceso para GETs condicionales, compartido entre clientes
+# (el análisis de rendimiento crea su propio AsyncHTTPClient):
+# url -> (etag, last_modified, contenido, status, headers, tamaño)
+_response_cache: 'OrderedDict[str, Tuple]' = OrderedDict()
+# Suma de los tamaños de los bodies cacheados
+_response_cache_bytes = 0
 
 
 class HTTPError(Exception):
@@ -62,11 +93,26 @@ class AsyncHTTPClient:
     async def start(self) -> None:
         """Inicia la sesión HTTP."""
         if self.session is None:
-            connector = aiohttp.TCPConnector(limit=100, limit_per_host=30)
+            # Cache de DNS por 10 minutos: evita una resolución por cada URL
+            # nueva del mismo host (con los nameservers del sistema). Las
+            # conexiones ociosas quedan abiertas 75 s para reutilizarlas
+            # (keep-alive) si la sesión es de larga vida
+            connector = aiohttp.TCPConnector(
+                limit=200,
+                limit_per_host=32,
+                use_dns_cache=True,
+                ttl_dns_cache=DNS_CACHE_TTL,
+                keepalive_timeout=75,
+                resolver=aiohttp.AsyncResolver() if _HAS_AIODNS else None
+            )
             self.session = aiohttp.ClientSession(
                 connector=connector,
                 timeout=self.timeout,
-                headers={'User-Agent': self.user_agent}
+                headers={
+                    'User-Agent': self.user_agent,
+                    'Accept-Encoding': _ACCEPT_ENCODING
+                },
+                auto_decompress=True
             )
             logger.info("Sesión HTTP iniciada")
 
@@ -94,6 +140,42 @@ class AsyncHTTPClient:
         Returns:
             Tupla (contenido_html, status_code, headers_response)
 
+        Raises:
+            HTTPError: Si hay un error en el request
+        """
+        content, status, response_headers, _ = await self.get_full(url, headers, timeout)
+        return content, status, response_headers
+
+    async def get_full(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        use_cache: bool = True
+    ) -> Tuple[str, int, Dict[str, str], int]:
+        """
+        Realiza un GET HTTP asíncrono y retorna también el tamaño del body.
+
+        El body se lee como bytes y se decodifica una sola vez con el charset
+        del Content-Type (utf-8 si no lo informa), sin la detección de
+        encoding de response.text().
+
+        Las respuestas con ETag o Last-Modified se cachean: al repetir la URL
+        se envía un GET condicional y, si el servidor responde 304, se
+        devuelve la respuesta cacheada. Sólo aplica sin headers adicionales
+        y con use_cache.
+
+        Args:
+            url: URL a solicitar
+            headers: Headers adicionales (opcional)
+            timeout: Timeout específico para este request (opcional)
+            use_cache: Si es False no se lee ni se escribe el cache: la
+                respuesta siempre viene completa del servidor (por ejemplo,
+                para medir tiempos de carga)
+
+        Returns:
+            Tupla (contenido_html, status_code, headers_response, tamaño_bytes)
+
         Raises:
             HTTPError: Si hay un error en el request
         """
@@ -104,21 +186,48 @@ class AsyncHTTPClient:
             custom_timeout = aiohttp.ClientTimeout(total=timeout) if timeout else None
 
             logger.debug(f"GET {url}")
-            start_time = datetime.now()
+            start_time = time.perf_counter()
+
+            cacheable = use_cache and headers is None
+            cached = _response_cache.get(url) if cacheable else None
+            request_headers = headers
+            if cached is not None:
+                etag, last_modified = cached[0], cached[1]
+                request_headers = {}
+                if etag:
+                    request_headers['If-None-Match'] = etag
+                if last_modified:
+                    request_headers['If-Modified-Since'] = last_modified
 
             async with self.session.get(
                 url,
-                headers=headers,
+                headers=request_headers,
                 timeout=custom_timeout,
                 max_redirects=self.max_redirects,
                 allow_redirects=True
             ) as response:
-                content = await response.text()
-                elapsed = (datetime.now() - start_time).total_seconds()
+                if response.status == 304 and cached is not None:
+                    _response_cache.move_to_end(url)
+                    logger.info(f"GET {url} - Status: 304 (cache) - Size: {cached[5]} bytes")
+                    return cached[2:]
 
-                logger.info(f"GET {url} - Status: {response.status} - Time: {elapsed:.2f}s - Size: {len(content)} bytes")
+                raw = await response.read()
+                size = len(raw)
 
-                return content, response.status, dict(response.headers)
+                # Inline: bytes.decode no libera el GIL, así que pasarlo a un
+                # thread no deja correr al event loop mientras decodifica
+                content = _decode_body(raw, response.charset)
+
+                elapsed = time.perf_counter() - start_time
+
+                logger.info(f"GET {url} - Status: {response.status} - Time: {elapsed:.2f}s - Size: {size} bytes")
+
+                response_headers = dict(response.headers)
+
+                if cacheable and response.status == 200:
+                    _cache_response(url, content, response.status, response_headers, size)
+
+                return content, response.status, response_headers, size
 
         except asyncio.TimeoutError:
             raise HTTPError(f"Timeout al solicitar {url}")
@@ -136,6 +245,9 @@ class AsyncHTTPClient:
         """
         Realiza un GET HTTP asíncrono y retorna contenido binario.
 
+        El body se lee por chunks a un bytearray reservado de antemano según
+        el Content-Length, sin reallocs a medida que llegan los datos.
+
         Args:
             url: URL a solicitar
             headers: Headers adicionales (opcional)
@@ -154,7 +266,7 @@ class AsyncHTTPClient:
             custom_timeout = aiohttp.ClientTimeout(total=timeout) if timeout else None
 
             logger.debug(f"GET (binary) {url}")
-            start_time = datetime.now()
+            start_time = time.perf_counter()
 
             async with self.session.get(
                 url,
@@ -163,8 +275,26 @@ class AsyncHTTPClient:
                 max_redirects=self.max_redirects,
                 allow_redirects=True
             ) as response:
-                content = await response.read()
-                elapsed = (datetime.now() - start_time).total_seconds()
+                # Con Content-Encoding el Content-Length es el tamaño
+                # comprimido: no sirve para reservar el buffer
+                length = response.content_length
+                if length and 'Content-Encoding' not in response.headers:
+                    buffer = bytearray(length)
+                else:
+                    buffer = bytearray()
+
+                pos = 0
+                async for chunk in response.content.iter_chunked(BINARY_CHUNK_SIZE):
+                    end = pos + len(chunk)
+                    # Si el body supera lo reservado, la asignación extiende el buffer
+                    buffer[pos:end] = chunk
+                    pos = end
+
+                # El body pudo ser más corto que el Content-Length
+                del buffer[pos:]
+                content = bytes(buffer)
+
+                elapsed = time.perf_counter() - start_time
 
                 logger.info(f"GET (binary) {url} - Status: {response.status} - Time: {elapsed:.2f}s - Size: {len(content)} bytes")
 
@@ -177,6 +307,62 @@ class AsyncHTTPClient:
         except Exception as e:
             raise HTTPError(f"Error inesperado al solicitar {url}: {e}")
 
+    async def get_headers(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None
+    ) -> Tuple[int, Dict[str, str]]:
+        """
+        Realiza un GET HTTP asíncrono sin leer el body.
+
+        Sirve para pedir un rango (header Range) y mirar sólo Content-Range:
+        si el servidor ignora el Range y responde 200, la conexión se cierra
+        sin descargar el recurso completo.
+
+        Args:
+            url: URL a solicitar
+            headers: Headers adicionales (opcional)
+            timeout: Timeout específico para este request (opcional)
+
+        Returns:
+            Tupla (status_code, headers_response)
+
+        Raises:
+            HTTPError: Si hay un error en el request
+        """
+        if not self.session:
+            raise HTTPError("Sesión HTTP no iniciada")
+
+        try:
+            custom_timeout = aiohttp.ClientTimeout(total=timeout) if timeout else None
+
+            logger.debug(f"GET (headers) {url}")
+
+            async with self.session.get(
+                url,
+                headers=headers,
+                timeout=custom_timeout,
+                max_redirects=self.max_redirects,
+                allow_redirects=True
+            ) as response:
+                logger.info(f"GET (headers) {url} - Status: {response.status}")
+                response_headers = dict(response.headers)
+                if response.status == 206:
+                    # Body de un rango chico: leerlo deja la conexión en el pool
+                    await response.read()
+                else:
+                    # Body completo sin leer: se cierra la conexión
+                    response.close()
+                return response.status, response_headers
+
+        except asyncio.TimeoutError:
+            raise HTTPError(f"Timeout al solicitar {url}")
+        except aiohttp.ClientError as e:
+            raise HTTPError(f"Error HTTP al solicitar {url}: {e}")
+        except Exception as e:
+            raise HTTPError(f"Error inesperado al solicitar {url}: {e}")
+
     async def head(
         self,
         url: str,
@@ -223,6 +409,59 @@ class AsyncHTTPClient:
             raise HTTPError(f"Error inesperado al solicitar {url}: {e}")
 
 
+def _decode_body(raw: bytes, charset: Optional[str]) -> str:
+    """
+    Decodifica un body con el charset del Content-Type (utf-8 si no hay).
+
+    Args:
+        raw: Body en bytes
+        charset: Charset informado por el servidor (o None)
+
+    Returns:
+        Contenido decodificado (los bytes inválidos se reemplazan)
+    """
+    try:
+        return raw.decode(charset or 'utf-8', errors='replace')
+    except LookupError:
+        # Charset desconocido en el Content-Type
+        return raw.decode('utf-8', errors='replace')
+
+
+def _cache_response(url: str, content: str, status: int,
+                    headers: Dict[str, str], size: int) -> None:
+    """
+    Guarda una respuesta en el cache LRU si se puede revalidar.
+
+    Args:
+        url: URL solicitada
+        content: Contenido decodificado
+        status: Status code
+        headers: Headers de la respuesta
+        size: Tamaño del body en bytes
+    """
+    global _response_cache_bytes
+
+    previous = _response_cache.pop(url, None)
+    if previous is not None:
+        _response_cache_bytes -= previous[5]
+
+    etag = headers.get('ETag')
+    last_modified = headers.get('Last-Modified')
+    if not etag and not last_modified:
+        # Sin validadores no hay GET condicional posible
+        return
+    if size > RESPONSE_CACHE_MAX_ENTRY:
+        # Una sola página desplazaría a muchas otras
+        return
+
+    _response_cache[url] = (etag, last_modified, content, status, headers, size)
+    _response_cache_bytes += size
+    while (len(_response_cache) > RESPONSE_CACHE_SIZE
+           or _response_cache_bytes > RESPONSE_CACHE_MAX_BYTES):
+        _, evicted = _response_cache.popitem(last=False)
+        _response_cache_bytes -= evicted[5]
+
+
 async def fetch_url(url: str, timeout: float = DEFAULT_TIMEOUT) -> str:
     """
     Función de conveniencia para hacer un GET HTTP simple.
@@ -260,17 +499,18 @@ async def fetch_url_with_stats(url: str, timeout: float = DEFAULT_TIMEOUT) -> Di
     Raises:
         HTTPError: Si hay un error en el request
     """
-    start_time = datetime.now()
+    start_time = time.perf_counter()
 
     async with AsyncHTTPClient(timeout=timeout) as client:
-        content, status, headers = await client.get(url)
+        # Sin cache: el tiempo medido tiene que ser el de la descarga completa
+        content, status, headers, size_bytes = await client.get_full(url, use_cache=False)
 
-    load_time_ms = int((datetime.now() - start_time).total_seconds() * 1000)
+    load_time_ms = int((time.perf_counter() - start_time) * 1000)
 
     return {
         'content': content,
         'status': status,
         'headers': headers,
         'load_time_ms': load_time_ms,
-        'size_bytes': len(content.encode('utf-8'))
+        'size_bytes': size_bytes
     }
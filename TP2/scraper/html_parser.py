@@ -6,12 +6,106 @@ y extraer información estructurada.
 """
 
 from bs4 import BeautifulSoup
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+import json
 import logging
+import re
+import threading
+from functools import lru_cache
 from urllib.parse import urljoin, urlparse
 
+from scraper.metadata_extractor import extract_relevant_metadata
+
+# lxml es opcional: si está instalado BeautifulSoup lo usa como parser (en C,
+# mucho más rápido en páginas grandes); si no, el parser puro de Python
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+    _BS4_PARSER = 'lxml'
+except ImportError:
+    etree = None
+    lxml_html = None
+    _BS4_PARSER = 'html.parser'
+
+if etree is not None:
+    # Compiladas una sola vez: links e imágenes se recorren en libxml2
+    _XPATH_LINKS = etree.XPath('//a/@href')
+    _XPATH_IMAGES = etree.XPath('//img')
+
+# Un parser de lxml por thread (no son thread-safe, pero sí reutilizables entre
+# documentos): no se crea uno nuevo por página
+_parser_local = threading.local()
+
+
+def _lxml_parser():
+    """
+    Devuelve el parser HTML de lxml del thread actual (lo crea la primera vez).
+
+    Descarta comentarios e instrucciones de procesamiento al parsear, así no
+    se crean nodos que nunca se consultan.
+
+    Returns:
+        lxml.html.HTMLParser
+    """
+    parser = getattr(_parser_local, 'parser', None)
+    if parser is None:
+        parser = lxml_html.HTMLParser(remove_comments=True, remove_pis=True)
+        _parser_local.parser = parser
+    return parser
+
+
+# orjson es opcional: decodifica el JSON-LD más rápido que json de la stdlib
+# (orjson.JSONDecodeError hereda de ValueError, igual que el de json)
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 logger = logging.getLogger(__name__)
 
+_HEADER_TAGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+# Tags que necesita el extractor de metadatos
+_METADATA_TAGS = frozenset(('meta', 'link', 'script'))
+_WHITESPACE_RE = re.compile(r'\s+')
+# Links que se descartan: anclas y javascript:
+_SKIP_LINK_PREFIXES = ('#', 'javascript:')
+
+
+@lru_cache(maxsize=8192)
+def _join(base_url: str, ref: str) -> str:
+    """
+    Resuelve una URL relativa contra la base, cacheando el resultado.
+
+    urljoin vuelve a parsear la base en cada llamada; los links e imágenes de
+    una página comparten base y suelen repetir prefijos.
+
+    Args:
+        base_url: URL base
+        ref: URL (relativa o absoluta) encontrada en el HTML
+
+    Returns:
+        URL absoluta
+    """
+    return urljoin(base_url, ref)
+
+
+def _attr_value(tag, key: str) -> Optional[str]:
+    """
+    Lee un atributo sin espacios alrededor.
+
+    Args:
+        tag: Tag (o diccionario de atributos) con método get
+        key: Nombre del atributo
+
+    Returns:
+        Valor del atributo, o None si falta o queda vacío
+    """
+    value = tag.get(key)
+    if value:
+        return value.strip() or None
+    return None
+
 
 class HTMLParseError(Exception):
     """Excepción para errores de parsing HTML."""
@@ -36,12 +130,34 @@ class HTMLParser:
         Raises:
             HTMLParseError: Si el HTML no puede ser parseado
         """
-        try:
-            self.soup = BeautifulSoup(html, 'html.parser')
-            self.base_url = base_url
-            logger.debug(f"HTML parseado exitosamente ({len(html)} bytes)")
-        except Exception as e:
-            raise HTMLParseError(f"Error al parsear HTML: {e}")
+        self.base_url = base_url
+        # Los dos árboles se parsean en el primer uso: con lxml instalado,
+        # parse_all y los links/imágenes no necesitan el de BeautifulSoup
+        self._html = html
+        self._soup: Optional[BeautifulSoup] = None
+        self._lxml_doc = None
+        self._lxml_parsed = False
+        # JSON-LD, se busca y decodifica una sola vez (ver find_schema_org)
+        self._ld_json_raw: Optional[List[str]] = None
+        self._ld_json_parsed: Optional[List[Dict]] = None
+        # get_text quita scripts y styles del árbol la primera vez
+        self._scripts_removed = False
+
+    @property
+    def soup(self) -> BeautifulSoup:
+        """
+        Documento de BeautifulSoup (se parsea la primera vez que se usa).
+
+        Raises:
+            HTMLParseError: Si el HTML no puede ser parseado
+        """
+        if self._soup is None:
+            try:
+                self._soup = BeautifulSoup(self._html, _BS4_PARSER)
+            except Exception as e:
+                raise HTMLParseError(f"Error al parsear HTML: {e}")
+            logger.debug(f"HTML parseado exitosamente ({len(self._html)} bytes)")
+        return self._soup
 
     def get_title(self) -> Optional[str]:
         """
@@ -65,15 +181,24 @@ class HTMLParser:
         Returns:
             Lista de URLs encontradas
         """
+        doc = self._lxml_document()
+        if doc is not None:
+            hrefs = _XPATH_LINKS(doc)
+        else:
+            hrefs = (a_tag['href'] for a_tag in self.soup.find_all('a', href=True))
+
+        # Se decide una vez si se resuelven las URLs, no en cada link
+        base_url = self.base_url if absolute else None
+
         links = []
-        for a_tag in self.soup.find_all('a', href=True):
-            href = a_tag['href'].strip()
+        for href in hrefs:
+            href = href.strip()
 
-            if not href or href.startswith('#') or href.startswith('javascript:'):
+            if not href or href.startswith(_SKIP_LINK_PREFIXES):
                 continue
 
-            if absolute and self.base_url:
-                href = urljoin(self.base_url, href)
+            if base_url:
+                href = _join(base_url, href)
 
             links.append(href)
 
@@ -90,15 +215,19 @@ class HTMLParser:
         Returns:
             Lista de diccionarios con información de cada imagen
         """
+        doc = self._lxml_document()
+        # Los elementos de lxml y los Tag de BeautifulSoup tienen el mismo get()
+        img_tags = _XPATH_IMAGES(doc) if doc is not None else self.soup.find_all('img')
+
         images = []
-        for img_tag in self.soup.find_all('img'):
+        for img_tag in img_tags:
             src = img_tag.get('src', '').strip()
 
             if not src:
                 continue
 
             if absolute and self.base_url:
-                src = urljoin(self.base_url, src)
+                src = _join(self.base_url, src)
 
             images.append({
                 'src': src,
@@ -109,6 +238,127 @@ class HTMLParser:
         logger.debug(f"Encontradas {len(images)} imágenes")
         return images
 
+    def get_image_srcs(self, limit: int, absolute: bool = True) -> Tuple[List[str], int]:
+        """
+        Obtiene las URLs de las primeras imágenes y el total de imágenes.
+
+        A diferencia de get_images no arma un diccionario por imagen, y sólo
+        resuelve a absoluta la URL de las primeras 'limit'; del resto sólo se
+        cuenta que tengan src.
+
+        Args:
+            limit: Cantidad máxima de URLs a devolver
+            absolute: Si es True, convierte URLs relativas a absolutas
+
+        Returns:
+            Tupla (primeras URLs, cantidad de imágenes con src)
+        """
+        doc = self._lxml_document()
+        img_tags = _XPATH_IMAGES(doc) if doc is not None else self.soup.find_all('img')
+        base_url = self.base_url if absolute else None
+
+        srcs = []
+        count = 0
+        for img_tag in img_tags:
+            src = img_tag.get('src', '').strip()
+            if not src:
+                continue
+
+            count += 1
+            if count <= limit:
+                srcs.append(_join(base_url, src) if base_url else src)
+
+        return srcs, count
+
+    def _lxml_document(self):
+        """
+        Devuelve el documento parseado con lxml (lo parsea la primera vez).
+
+        Returns:
+            Documento de lxml.html, o None si lxml no está instalado o no
+            pudo parsear el HTML (se usa BeautifulSoup en su lugar)
+        """
+        if not self._lxml_parsed:
+            self._lxml_parsed = True
+            if lxml_html is not None:
+                try:
+                    self._lxml_doc = lxml_html.document_fromstring(self._html, parser=_lxml_parser())
+                except (etree.ParserError, ValueError) as e:
+                    # Documento vacío o con declaración de encoding en un str
+                    logger.debug(f"lxml no pudo parsear el HTML: {e}")
+        return self._lxml_doc
+
+    def parse_all(self, image_limit: int = 10) -> Dict:
+        """
+        Extrae título, links, imágenes, metadatos y headers en un recorrido.
+
+        Con lxml se recorre el documento una sola vez en orden y cada
+        elemento se despacha según su tag; los meta/link/script se le pasan
+        al extractor de metadatos sin volver a recorrer. Sin lxml se usan
+        los métodos individuales sobre BeautifulSoup.
+
+        Args:
+            image_limit: Cantidad máxima de URLs de imágenes a devolver
+
+        Returns:
+            Diccionario con 'title', 'links', 'images_urls', 'images_count',
+            'meta_tags' y 'structure'
+        """
+        doc = self._lxml_document()
+        if doc is None:
+            image_srcs, images_count = self.get_image_srcs(image_limit)
+            return {
+                'title': self.get_title(),
+                'links': self.get_links(),
+                'images_urls': image_srcs,
+                'images_count': images_count,
+                'meta_tags': extract_relevant_metadata(soup=self.soup),
+                'structure': self.get_headers_structure()
+            }
+
+        base_url = self.base_url
+        title = None
+        links = []
+        image_srcs = []
+        images_count = 0
+        structure = dict.fromkeys(_HEADER_TAGS, 0)
+        metadata_elements = []
+
+        for element in doc.iter():
+            tag = element.tag
+
+            if tag == 'a':
+                href = element.get('href')
+                if href:
+                    href = href.strip()
+                    if href and not href.startswith(_SKIP_LINK_PREFIXES):
+                        links.append(_join(base_url, href) if base_url else href)
+
+            elif tag == 'img':
+                src = element.get('src', '').strip()
+                if src:
+                    images_count += 1
+                    if images_count <= image_limit:
+                        image_srcs.append(_join(base_url, src) if base_url else src)
+
+            elif tag in structure:
+                structure[tag] += 1
+
+            elif tag in _METADATA_TAGS:
+                metadata_elements.append(element)
+
+            elif tag == 'title' and title is None and element.text:
+                title = element.text.strip()
+
+        return {
+            'title': title,
+            'links': links,
+            'images_urls': image_srcs,
+            'images_count': images_count,
+            'meta_tags': extract_relevant_metadata(elements=metadata_elements),
+            'structure': structure
+        }
+
     def get_meta_tags(self) -> Dict[str, str]:
         """
         Obtiene todos los meta tags de la página.
@@ -119,19 +369,19 @@ class HTMLParser:
         meta_tags = {}
 
         for meta_tag in self.soup.find_all('meta'):
+            content = _attr_value(meta_tag, 'content')
+            if not content:
+                continue
+
             # Meta tags con atributo 'name'
-            name = meta_tag.get('name', '').strip()
+            name = _attr_value(meta_tag, 'name')
             if name:
-                content = meta_tag.get('content', '').strip()
-                if content:
-                    meta_tags[name] = content
+                meta_tags[name] = content
 
             # Meta tags con atributo 'property' (Open Graph, etc.)
-            prop = meta_tag.get('property', '').strip()
+            prop = _attr_value(meta_tag, 'property')
             if prop:
-                content = meta_tag.get('content', '').strip()
-                if content:
-                    meta_tags[prop] = content
+                meta_tags[prop] = content
 
         logger.debug(f"Encontrados {len(meta_tags)} meta tags")
         return meta_tags
@@ -143,14 +393,11 @@ class HTMLParser:
         Returns:
             Diccionario con el conteo de cada tipo de header
         """
-        structure = {
-            'h1': len(self.soup.find_all('h1')),
-            'h2': len(self.soup.find_all('h2')),
-            'h3': len(self.soup.find_all('h3')),
-            'h4': len(self.soup.find_all('h4')),
-            'h5': len(self.soup.find_all('h5')),
-            'h6': len(self.soup.find_all('h6'))
-        }
+        structure = dict.fromkeys(_HEADER_TAGS, 0)
+
+        # Un solo recorrido del árbol para los seis niveles
+        for tag in self.soup.find_all(_HEADER_TAGS):
+            structure[tag.name] += 1
 
         total = sum(structure.values())
         logger.debug(f"Estructura de headers: {total} headers totales")
@@ -167,17 +414,14 @@ class HTMLParser:
         Returns:
             Texto extraído
         """
-        # Remover scripts y styles
-        for script in self.soup(['script', 'style']):
-            script.decompose()
-
-        text = self.soup.get_text(separator=separator)
-        # Limpiar espacios múltiples
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        text = ' '.join(chunk for chunk in chunks if chunk)
+        # Remover scripts y styles (una sola vez por documento)
+        if not self._scripts_removed:
+            for script in self.soup(['script', 'style']):
+                script.decompose()
+            self._scripts_removed = True
 
-        return text
+        # Limpiar espacios múltiples en una sola pasada
+        return _WHITESPACE_RE.sub(' ', self.soup.get_text(separator=separator)).strip()
 
     def count_elements(self, tag: str) -> int:
         """
@@ -195,21 +439,43 @@ class HTMLParser:
         """
         Busca y extrae schema.org JSON-LD.
 
+        El resultado se cachea: las llamadas siguientes no vuelven a
+        recorrer ni decodificar.
+
         Returns:
             Lista de diccionarios con los schemas encontrados
         """
-        import json
-
-        schemas = []
-        for script in self.soup.find_all('script', type='application/ld+json'):
-            try:
-                schema = json.loads(script.string)
-                schemas.append(schema)
-            except (json.JSONDecodeError, AttributeError):
-                continue
+        if self._ld_json_parsed is None:
+            schemas = []
+            for text in self.get_ld_json():
+                try:
+                    schemas.append(_json_loads(text))
+                except ValueError:
+                    continue
+            self._ld_json_parsed = schemas
+            logger.debug(f"Encontrados {len(schemas)} schemas JSON-LD")
+
+        return list(self._ld_json_parsed)
+
+    def get_ld_json(self) -> List[str]:
+        """
+        Obtiene el texto de los bloques JSON-LD, sin decodificar.
 
-        logger.debug(f"Encontrados {len(schemas)} schemas JSON-LD")
-        return schemas
+        Returns:
+            Lista de strings (sin espacios ni BOM al inicio/final)
+        """
+        if self._ld_json_raw is None:
+            raw = []
+            for script in self.soup.find_all('script', type='application/ld+json'):
+                # Los scripts vacíos se descartan sin intentar decodificarlos
+                text = script.string
+                if text:
+                    text = text.strip().lstrip('\ufeff')
+                    if text:
+                        raw.append(text)
+            self._ld_json_raw = raw
+
+        return list(self._ld_json_raw)
 
     def get_forms(self) -> List[Dict[str, any]]:
         """
@@ -274,11 +540,14 @@ def extract_all_info(html: str, base_url: Optional[str] = None) -> Dict:
     """
     parser = HTMLParser(html, base_url)
 
+    # get_images recorre todo el árbol: se llama una sola vez
+    images = parser.get_images()
+
     return {
         'title': parser.get_title(),
         'links': parser.get_links(),
-        'images': parser.get_images(),
-        'images_count': len(parser.get_images()),
+        'images': images,
+        'images_count': len(images),
         'meta_tags': parser.get_meta_tags(),
         'structure': parser.get_headers_structure(),
         'forms_count': len(parser.get_forms()),
@@ -5,12 +5,55 @@ Este módulo proporciona funcionalidades especializadas para extraer
 metadatos específicos de páginas web (SEO, Open Graph, Twitter Cards, etc.).
 """
 
+from io import BytesIO
 from typing import Dict, Optional, List
 from bs4 import BeautifulSoup
 import logging
 
+# lxml es opcional: si está instalado se usa iterparse para recorrer el HTML en
+# streaming y BeautifulSoup lo usa como parser; si no, el parser puro de Python
+try:
+    from lxml import etree
+    _BS4_PARSER = 'lxml'
+except ImportError:
+    etree = None
+    _BS4_PARSER = 'html.parser'
+
+# selectolax es opcional: su parser Lexbor (en C) resuelve los selectores de
+# meta/link/script sin construir el árbol de BeautifulSoup
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
 logger = logging.getLogger(__name__)
 
+_BASIC_META_NAMES = ('description', 'keywords', 'author', 'robots', 'viewport')
+_SCANNED_TAGS = ('meta', 'link', 'script')
+_MISSING = object()
+
+# Prefijos de Open Graph y Twitter Card: se comparan con str.startswith dentro
+# del barrido único (sin callbacks por atributo como los lambdas de find_all)
+_OG_PREFIX = 'og:'
+_TWITTER_PREFIX = 'twitter:'
+
+
+def _attr_value(attrs, key: str) -> Optional[str]:
+    """
+    Lee un atributo sin espacios alrededor.
+
+    Args:
+        attrs: Diccionario de atributos (o nodo con método get)
+        key: Nombre del atributo
+
+    Returns:
+        Valor del atributo, o None si falta o queda vacío
+    """
+    value = attrs.get(key)
+    if value:
+        return value.strip() or None
+    return None
+
 
 class MetadataExtractor:
     """
@@ -19,14 +62,58 @@ class MetadataExtractor:
     Extrae metadatos comunes de páginas web: SEO, Open Graph, Twitter Cards, etc.
     """
 
-    def __init__(self, html: str):
+    def __init__(self, html: Optional[str] = None, soup: Optional[BeautifulSoup] = None,
+                 elements: Optional[List] = None):
         """
-        Inicializa el extractor con HTML.
+        Inicializa el extractor con HTML o con un documento ya parseado.
 
         Args:
-            html: Contenido HTML
+            html: Contenido HTML (se ignora si se pasa soup o elements)
+            soup: Documento ya parseado, por ejemplo el de un HTMLParser,
+                para no volver a parsear la misma página (opcional)
+            elements: Elementos meta, link y script de un documento de lxml,
+                en orden de documento, ya juntados en otro recorrido
+                (opcional, ver HTMLParser.parse_all)
+
+        Raises:
+            ValueError: Si no se pasa ni html, ni soup, ni elements
+        """
+        # Queda definido uno solo: los elementos de lxml ya juntados, el árbol
+        # de selectolax, el HTML a recorrer en streaming con lxml, o el árbol
+        # de BeautifulSoup
+        self.tree = None
+        self.soup = None
+        self._stream_html = None
+        self._elements = None
+
+        # Caches que llena _scan_head en el primer acceso
+        self._scanned = False
+
+        if elements is not None:
+            self._elements = elements
+        elif soup is not None:
+            self.soup = soup
+        elif html is None:
+            raise ValueError("Se requiere html, soup o elements")
+        elif LexborHTMLParser is not None:
+            self.tree = LexborHTMLParser(html)
+        elif etree is not None:
+            self._stream_html = html
+        else:
+            self.soup = BeautifulSoup(html, _BS4_PARSER)
+
+    @classmethod
+    def from_soup(cls, soup: BeautifulSoup) -> 'MetadataExtractor':
         """
-        self.soup = BeautifulSoup(html, 'html.parser')
+        Crea un extractor sobre un documento ya parseado.
+
+        Args:
+            soup: Documento BeautifulSoup
+
+        Returns:
+            Instancia de MetadataExtractor que comparte el documento
+        """
+        return cls(soup=soup)
 
     def extract_basic_metadata(self) -> Dict[str, Optional[str]]:
         """
@@ -35,14 +122,10 @@ class MetadataExtractor:
         Returns:
             Diccionario con metadatos básicos
         """
-        metadata = {
-            'description': self._get_meta_content('description'),
-            'keywords': self._get_meta_content('keywords'),
-            'author': self._get_meta_content('author'),
-            'robots': self._get_meta_content('robots'),
-            'viewport': self._get_meta_content('viewport'),
-            'canonical': self._get_canonical_url()
-        }
+        self._scan_head()
+
+        metadata = {name: self._meta_by_name.get(name) for name in _BASIC_META_NAMES}
+        metadata['canonical'] = self._canonical
 
         return {k: v for k, v in metadata.items() if v is not None}
 
@@ -53,17 +136,10 @@ class MetadataExtractor:
         Returns:
             Diccionario con metadatos de Open Graph
         """
-        og_metadata = {}
-
-        for meta_tag in self.soup.find_all('meta', property=lambda x: x and x.startswith('og:')):
-            prop = meta_tag.get('property', '')
-            content = meta_tag.get('content', '')
-
-            if prop and content:
-                og_metadata[prop] = content
+        self._scan_head()
 
-        logger.debug(f"Extraídos {len(og_metadata)} metadatos Open Graph")
-        return og_metadata
+        logger.debug(f"Extraídos {len(self._open_graph)} metadatos Open Graph")
+        return dict(self._open_graph)
 
     def extract_twitter_card(self) -> Dict[str, str]:
         """
@@ -72,17 +148,10 @@ class MetadataExtractor:
         Returns:
             Diccionario con metadatos de Twitter Card
         """
-        twitter_metadata = {}
-
-        for meta_tag in self.soup.find_all('meta', attrs={'name': lambda x: x and x.startswith('twitter:')}):
-            name = meta_tag.get('name', '')
-            content = meta_tag.get('content', '')
-
-            if name and content:
-                twitter_metadata[name] = content
+        self._scan_head()
 
-        logger.debug(f"Extraídos {len(twitter_metadata)} metadatos Twitter Card")
-        return twitter_metadata
+        logger.debug(f"Extraídos {len(self._twitter_card)} metadatos Twitter Card")
+        return dict(self._twitter_card)
 
     def extract_structured_data(self) -> List[str]:
         """
@@ -91,15 +160,10 @@ class MetadataExtractor:
         Returns:
             Lista de strings con los datos estructurados
         """
-        structured_data = []
-
-        # JSON-LD
-        for script in self.soup.find_all('script', type='application/ld+json'):
-            if script.string:
-                structured_data.append(script.string.strip())
+        self._scan_head()
 
-        logger.debug(f"Extraídos {len(structured_data)} bloques de datos estructurados")
-        return structured_data
+        logger.debug(f"Extraídos {len(self._structured_data)} bloques de datos estructurados")
+        return list(self._structured_data)
 
     def extract_all_metadata(self) -> Dict:
         """
@@ -115,35 +179,140 @@ class MetadataExtractor:
             'structured_data': self.extract_structured_data()
         }
 
-    def _get_meta_content(self, name: str) -> Optional[str]:
+    def _scan_head(self) -> None:
         """
-        Obtiene el contenido de un meta tag por nombre.
+        Recorre una sola vez los tags meta, link y script del documento.
 
-        Args:
-            name: Nombre del meta tag
+        Reparte lo encontrado en los caches que usan los métodos públicos
+        (meta por name, Open Graph, Twitter Card, URL canónica y JSON-LD).
+        Las llamadas siguientes no vuelven a recorrer el documento.
+        """
+        if self._scanned:
+            return
+
+        if self._stream_html is not None:
+            try:
+                self._collect()
+            except etree.LxmlError as e:
+                # Por ejemplo, un documento vacío: se reintenta con BeautifulSoup
+                logger.debug(f"lxml no pudo recorrer el HTML: {e}")
+                self.soup = BeautifulSoup(self._stream_html, _BS4_PARSER)
+                self._stream_html = None
+                self._collect()
+            self._stream_html = None
+        else:
+            self._collect()
+
+        self._scanned = True
+
+    def _collect(self) -> None:
+        """Recorre los nodos y llena los caches de _scan_head."""
+        meta_by_name = {}
+        open_graph = {}
+        twitter_card = {}
+        canonical = _MISSING
+        structured_data = []
 
-        Returns:
-            Contenido del meta tag o None si no existe
+        for tag_name, attrs, node in self._iter_nodes():
+            if tag_name == 'meta':
+                name = attrs.get('name')
+                prop = attrs.get('property')
+                content = attrs.get('content')
+
+                if name:
+                    # Como find(): vale el primer meta con ese name
+                    if name not in meta_by_name:
+                        meta_by_name[name] = _attr_value(attrs, 'content')
+                    if content and name.startswith(_TWITTER_PREFIX):
+                        twitter_card[name] = content
+
+                if prop and content and prop.startswith(_OG_PREFIX):
+                    open_graph[prop] = content
+
+            elif tag_name == 'link':
+                if canonical is _MISSING:
+                    rel = attrs.get('rel') or ()
+                    if isinstance(rel, str):
+                        rel = rel.split()
+                    if 'canonical' in rel:
+                        canonical = _attr_value(attrs, 'href')
+
+            elif attrs.get('type') == 'application/ld+json':
+                text = self._node_text(node)
+                if text:
+                    structured_data.append(text.strip())
+
+        self._meta_by_name = meta_by_name
+        self._open_graph = open_graph
+        self._twitter_card = twitter_card
+        self._canonical = None if canonical is _MISSING else canonical
+        self._structured_data = structured_data
+
+    def _iter_nodes(self):
         """
-        meta_tag = self.soup.find('meta', attrs={'name': name})
-        if meta_tag:
-            return meta_tag.get('content', '').strip() or None
-        return None
+        Itera los tags meta, link y script en orden de documento.
 
-    def _get_canonical_url(self) -> Optional[str]:
+        Yields:
+            Tuplas (nombre del tag, atributos, nodo)
+        """
+        if self._elements is not None:
+            for element in self._elements:
+                yield element.tag, element.attrib, element
+        elif self.tree is not None:
+            for node in self.tree.css('meta, link, script'):
+                yield node.tag, node.attributes, node
+        elif self.soup is not None:
+            for tag in self.soup.find_all(_SCANNED_TAGS):
+                yield tag.name, tag.attrs, tag
+        else:
+            yield from self._iter_stream()
+
+    def _iter_stream(self):
         """
-        Obtiene la URL canónica de la página.
+        Recorre el HTML en streaming con lxml.etree.iterparse.
+
+        Cada elemento se libera apenas se procesa, así la memoria no crece
+        con el tamaño de la página. No se corta en <body> porque el JSON-LD
+        suele estar dentro del body.
+
+        Yields:
+            Tuplas (nombre del tag, atributos, elemento)
+        """
+        source = BytesIO(self._stream_html.encode('utf-8'))
+
+        for _, element in etree.iterparse(source, events=('end',), html=True,
+                                          encoding='utf-8', recover=True,
+                                          remove_comments=True, remove_pis=True):
+            if element.tag in _SCANNED_TAGS:
+                yield element.tag, element.attrib, element
+
+            # Liberar el elemento y los hermanos anteriores ya procesados
+            element.clear(keep_tail=True)
+            parent = element.getparent()
+            if parent is not None:
+                while element.getprevious() is not None:
+                    del parent[0]
+
+    def _node_text(self, node) -> Optional[str]:
+        """
+        Obtiene el texto de un nodo script.
+
+        Args:
+            node: Nodo de selectolax, Tag de BeautifulSoup o elemento de lxml
 
         Returns:
-            URL canónica o None si no existe
+            Texto del script o None si no tiene
         """
-        link_tag = self.soup.find('link', rel='canonical')
-        if link_tag:
-            return link_tag.get('href', '').strip() or None
-        return None
+        if self.tree is not None:
+            return node.text(deep=True)
+        if self.soup is not None:
+            return node.string
+        return node.text
 
 
-def extract_relevant_metadata(html: str) -> Dict[str, str]:
+def extract_relevant_metadata(html: Optional[str] = None,
+                              soup: Optional[BeautifulSoup] = None,
+                              elements: Optional[List] = None) -> Dict[str, str]:
     """
     Función de conveniencia para extraer metadatos relevantes.
 
@@ -151,12 +320,14 @@ def extract_relevant_metadata(html: str) -> Dict[str, str]:
     para la respuesta del servidor.
 
     Args:
-        html: Contenido HTML
+        html: Contenido HTML (se ignora si se pasa soup o elements)
+        soup: Documento ya parseado (opcional, evita parsear de nuevo)
+        elements: Elementos meta, link y script de lxml ya juntados (opcional)
 
     Returns:
         Diccionario con metadatos relevantes
     """
-    extractor = MetadataExtractor(html)
+    extractor = MetadataExtractor(html, soup=soup, elements=elements)
 
     basic = extractor.extract_basic_metadata()
     og = extractor.extract_open_graph()
@@ -18,19 +18,25 @@ Uso:
 
 import argparse
 import logging
+import os
+import pickle
 import socketserver
 import signal
 import sys
-from multiprocessing import Pool, cpu_count
-from typing import Optional
+from multiprocessing import Pool, Value, cpu_count, resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Optional, Tuple
 
-from common.protocol import receive_message, send_message, ProtocolError
+from common.protocol import (
+    receive_message, send_message, tune_socket,
+    ProtocolError, ConnectionClosedError
+)
 from common.serialization import (
-    deserialize_json, serialize_json,
+    deserialize_json, serialize_json, serialize_pickle_parts,
     validate_request, create_response
 )
 from processor.screenshot import process_screenshot
-from processor.performance import process_performance
+from processor.performance import process_performance, analyze_performance_simple
 from processor.image_processor import process_images_task
 
 # Configuración de logging
@@ -53,17 +59,54 @@ class ProcessingRequestHandler(socketserver.BaseRequestHandler):
     y devuelve las respuestas.
     """
 
+    def setup(self):
+        """Ajusta el socket aceptado (TCP_NODELAY y tamaño de buffers)."""
+        tune_socket(self.request)
+
     def handle(self):
-        """Maneja una conexión entrante."""
+        """
+        Maneja una conexión entrante.
+
+        Atiende requests en la misma conexión hasta que el cliente la cierra
+        (o pasa 60 s sin enviar otro), respondiendo en orden; así un cliente puede enviar varios requests
+        seguidos sin esperar cada respuesta (ProtocolClient.send_and_receive_many).
+        """
         client_address = self.client_address
-        logger.info(f"Nueva conexión desde {client_address}")
+        logger.info("Nueva conexión desde %s", client_address)
+
+        # Nombres del loop ligados a locales: se evita el lookup por request
+        sock = self.request
+        receive = receive_message
+        handle_request = self.handle_request
+
+        try:
+            while True:
+                # Recibir request
+                handle_request(receive(sock, timeout=60.0))
+
+        except ConnectionClosedError as e:
+            # EOF o timeout esperando el próximo header: el cliente terminó o
+            # quedó inactivo en un pool. Es un cierre normal, sin respuesta.
+            logger.debug("Conexión inactiva con %s: %s", client_address, e)
+
+        except ProtocolError as e:
+            logger.error(f"Error de protocolo: {e}")
+            self._send_error(f"Protocol error: {e}")
+
+        finally:
+            logger.info("Conexión cerrada con %s", client_address)
 
+    def handle_request(self, request_data: bytes) -> None:
+        """
+        Procesa un request recibido y envía su response.
+
+        Args:
+            request_data: Request serializado
+        """
         try:
-            # Recibir request
-            request_data = receive_message(self.request, timeout=60.0)
             request = deserialize_json(request_data)
 
-            logger.debug(f"Request recibido: {request.get('operation', 'unknown')}")
+            logger.debug("Request recibido: %s", request.get('operation', 'unknown'))
 
             # Validar request
             validate_request(request)
@@ -71,23 +114,20 @@ class ProcessingRequestHandler(socketserver.BaseRequestHandler):
             # Procesar request
             response = self.process_request(request)
 
-            # Enviar response
-            response_data = serialize_json(response)
-            send_message(self.request, response_data)
+            # Enviar response: con 'binary' se responde en pickle y los
+            # thumbnails viajan como bytes crudos (buffers out-of-band)
+            serialize = serialize_pickle_parts if request['params'].get('binary') else serialize_json
+            send_message(self.request, serialize(response))
 
-            logger.info(f"Response enviado a {client_address}")
+            logger.info("Response enviado a %s", self.client_address)
 
-        except ProtocolError as e:
-            logger.error(f"Error de protocolo: {e}")
-            self._send_error(f"Protocol error: {e}")
+        except ProtocolError:
+            raise
 
         except Exception as e:
             logger.error(f"Error al procesar request: {e}", exc_info=True)
             self._send_error(f"Internal error: {e}")
 
-        finally:
-            logger.info(f"Conexión cerrada con {client_address}")
-
     def process_request(self, request: dict) -> dict:
         """
         Procesa un request ejecutando la operación correspondiente.
@@ -130,18 +170,22 @@ class ProcessingRequestHandler(socketserver.BaseRequestHandler):
 
         max_width = params.get('max_width', 1280)
         max_height = params.get('max_height', 720)
+        binary = bool(params.get('binary'))
+        # PNG salvo que el request pida WebP ('format': 'webp')
+        image_format = params.get('format')
 
-        logger.info(f"Procesando screenshot: {url}")
+        logger.info("Procesando screenshot: %s", url)
 
         # Ejecutar en el pool de procesos
         result = process_pool.apply_async(
             process_screenshot,
-            args=(url, max_width, max_height)
+            args=(url, max_width, max_height),
+            kwds={'binary': binary, 'image_format': image_format}
         )
 
         # Esperar resultado (con timeout)
         try:
-            return result.get(timeout=60)
+            return _out_of_band_blobs(result.get(timeout=60))
         except Exception as e:
             logger.error(f"Error al obtener resultado de screenshot: {e}")
             return {'success': False, 'error': str(e)}
@@ -154,13 +198,11 @@ class ProcessingRequestHandler(socketserver.BaseRequestHandler):
         if not url:
             return {'success': False, 'error': 'URL requerida'}
 
-        logger.info(f"Procesando rendimiento: {url}")
+        logger.info("Procesando rendimiento: %s", url)
 
-        # Ejecutar en el pool de procesos
-        result = process_pool.apply_async(
-            process_performance,
-            args=(url, html)
-        )
+        # Ejecutar en el pool de procesos (el HTML grande va por memoria compartida)
+        task, shm = _performance_task(url, html)
+        result = process_pool.apply_async(_dispatch, task)
 
         # Esperar resultado
         try:
@@ -168,26 +210,29 @@ class ProcessingRequestHandler(socketserver.BaseRequestHandler):
         except Exception as e:
             logger.error(f"Error al obtener resultado de performance: {e}")
             return {'success': False, 'error': str(e)}
+        finally:
+            _release_shared(shm)
 
     def _process_images(self, params: dict) -> dict:
         """Procesa una request de procesamiento de imágenes."""
         image_urls = params.get('image_urls', [])
         max_images = params.get('max_images', 5)
+        binary = bool(params.get('binary'))
 
         if not image_urls:
             return {'success': True, 'thumbnails': [], 'processed_count': 0}
 
-        logger.info(f"Procesando {len(image_urls)} imágenes (max {max_images})")
+        logger.info("Procesando %d imágenes (max %s)", len(image_urls), max_images)
 
         # Ejecutar en el pool de procesos
         result = process_pool.apply_async(
             process_images_task,
-            args=(image_urls, max_images)
+            args=(image_urls, max_images, binary)
         )
 
         # Esperar resultado
         try:
-            return result.get(timeout=60)
+            return _out_of_band_blobs(result.get(timeout=60))
         except Exception as e:
             logger.error(f"Error al obtener resultado de images: {e}")
             return {'success': False, 'error': str(e)}
@@ -205,33 +250,31 @@ class ProcessingRequestHandler(socketserver.BaseRequestHandler):
         url = params.get('url')
         html = params.get('html')
         image_urls = params.get('image_urls', [])
+        binary = bool(params.get('binary'))
 
         if not url:
             return {'success': False, 'error': 'URL requerida'}
 
-        logger.info(f"Procesando todas las operaciones para {url}")
-
-        # Ejecutar todas las operaciones en paralelo
-        screenshot_result = process_pool.apply_async(
-            process_screenshot,
-            args=(url, 1280, 720)
-        )
-
-        performance_result = process_pool.apply_async(
-            process_performance,
-            args=(url, html)
-        )
-
-        images_result = process_pool.apply_async(
-            process_images_task,
-            args=(image_urls, 5)
+        logger.info("Procesando todas las operaciones para %s", url)
+
+        # Ejecutar todas las operaciones en paralelo, en un solo envío al pool
+        # (chunksize=1: cada operación va a un worker distinto)
+        performance_task, shm = _performance_task(url, html)
+        results = process_pool.starmap_async(
+            _dispatch,
+            [
+                ('screenshot', (url, 1280, 720, True, binary)),
+                performance_task,
+                ('images', (image_urls, 5, binary)),
+            ],
+            chunksize=1
         )
 
         # Esperar todos los resultados
         try:
-            screenshot_data = screenshot_result.get(timeout=60)
-            performance_data = performance_result.get(timeout=60)
-            images_data = images_result.get(timeout=60)
+            screenshot_data, performance_data, images_data = results.get(timeout=60)
+            screenshot_data = _out_of_band_blobs(screenshot_data)
+            images_data = _out_of_band_blobs(images_data)
 
             return {
                 'success': True,
@@ -244,6 +287,9 @@ class ProcessingRequestHandler(socketserver.BaseRequestHandler):
             logger.error(f"Error al obtener resultados: {e}")
             return {'success': False, 'error': str(e)}
 
+        finally:
+            _release_shared(shm)
+
     def _send_error(self, error_message: str):
         """Envía un mensaje de error al cliente."""
         try:
@@ -254,6 +300,145 @@ class ProcessingRequestHandler(socketserver.BaseRequestHandler):
             logger.error(f"Error al enviar mensaje de error: {e}")
 
 
+# HTML a partir del cual conviene pasarlo por memoria compartida en lugar de
+# picklearlo por el pipe del pool (por debajo, el costo de crear el segmento
+# supera al de la copia)
+SHARED_HTML_THRESHOLD = 64 * 1024
+
+
+def _attach_shared(shm_name: str) -> SharedMemory:
+    """
+    Abre un segmento creado por el proceso padre sin hacerse dueño de él.
+
+    Antes de Python 3.13 abrir un SharedMemory existente lo registra en el
+    resource_tracker como si el worker fuera dueño, y un tracker propio lo
+    borraría (o avisaría "leaked") al terminar el worker. Se quita ese
+    registro: el único dueño es el padre, que lo borra en _release_shared.
+
+    Args:
+        shm_name: Nombre del segmento
+
+    Returns:
+        El segmento abierto
+    """
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=shm_name, track=False)
+
+    shm = SharedMemory(name=shm_name)
+    if os.name == 'posix':
+        # Sólo en POSIX SharedMemory se registra en el resource_tracker
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    return shm
+
+
+def _performance_from_shared(url: str, shm_name: str, size: int) -> dict:
+    """
+    Analiza el rendimiento con el HTML leído de memoria compartida.
+
+    Corre en un worker del pool: sólo recibe el nombre del segmento, no el
+    HTML serializado.
+
+    Args:
+        url: URL de la página
+        shm_name: Nombre del segmento de SharedMemory con el HTML en UTF-8
+        size: Bytes válidos del segmento (el sistema puede redondearlo)
+
+    Returns:
+        Resultado de process_performance
+    """
+    shm = _attach_shared(shm_name)
+    try:
+        html = bytes(shm.buf[:size]).decode('utf-8')
+    finally:
+        shm.close()
+    return process_performance(url, html)
+
+
+# Operaciones que _dispatch puede ejecutar en los workers del pool
+_TASKS = {
+    'screenshot': process_screenshot,
+    'performance': process_performance,
+    'performance_shared': _performance_from_shared,
+    'images': process_images_task,
+}
+
+
+def _performance_task(url: str, html: Optional[str]) -> Tuple[tuple, Optional[SharedMemory]]:
+    """
+    Arma la tarea de rendimiento para _dispatch.
+
+    Si el HTML es grande se copia una vez a un segmento de memoria
+    compartida y al worker sólo viaja su nombre.
+
+    Args:
+        url: URL de la página
+        html: HTML ya descargado (o None)
+
+    Returns:
+        Tupla (task_name, args) y el segmento creado (o None); quien llama
+        lo libera con _release_shared al terminar la tarea
+    """
+    if not html or len(html) < SHARED_HTML_THRESHOLD:
+        return ('performance', (url, html)), None
+
+    data = html.encode('utf-8')
+    shm = SharedMemory(create=True, size=len(data))
+    shm.buf[:len(data)] = data
+    return ('performance_shared', (url, shm.name, len(data))), shm
+
+
+def _release_shared(shm: Optional[SharedMemory]) -> None:
+    """
+    Cierra y elimina un segmento creado por _performance_task.
+
+    Lo elimina el proceso que lo creó (no el worker), así no queda un
+    segmento huérfano si el worker falla o la tarea vence por timeout.
+
+    Args:
+        shm: Segmento a liberar (None no hace nada)
+    """
+    if shm is not None:
+        shm.close()
+        # El worker quitó el registro del resource_tracker (compartido con el
+        # padre); se vuelve a registrar para que unlink() lo dé de baja una
+        # sola vez. Registrar dos veces el mismo nombre no tiene efecto.
+        if os.name == 'posix':
+            resource_tracker.register(shm._name, 'shared_memory')
+        shm.unlink()
+
+
+def _dispatch(task_name: str, args: tuple) -> dict:
+    """
+    Ejecuta una operación por nombre (corre en un worker del pool).
+
+    Args:
+        task_name: Clave de _TASKS
+        args: Argumentos posicionales de la operación
+
+    Returns:
+        Resultado de la operación
+    """
+    return _TASKS[task_name](*args)
+
+
+def _out_of_band_blobs(result: dict) -> dict:
+    """
+    Envuelve las imágenes crudas de un resultado en PickleBuffer.
+
+    Así serialize_pickle_parts los envía como buffers out-of-band, sin
+    copiarlos dentro del stream de pickle ni al armar el mensaje.
+
+    Args:
+        result: Resultado de process_images_task o process_screenshot
+
+    Returns:
+        El mismo resultado, con '_blobs' envuelto (si lo tiene)
+    """
+    if result.get('_blobs'):
+        result['_blobs'] = [pickle.PickleBuffer(blob) for blob in result['_blobs']]
+    return result
+
+
 class ThreadedTCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
     """
     Servidor TCP que maneja cada conexión en un thread separado.
@@ -264,12 +449,51 @@ class ThreadedTCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
     daemon_threads = True
 
 
-def init_process_pool(num_processes: int) -> None:
+def _worker_init(next_worker: Optional[Value]) -> None:
+    """
+    Inicializa cada worker del pool al arrancar.
+
+    Parsea un documento mínimo para que la primera tarea real no pague la
+    carga de los módulos en C del parser (selectolax/lxml/BeautifulSoup).
+    Si se pide, fija el worker a un core.
+
+    Args:
+        next_worker: Contador compartido para repartir los cores entre los
+            workers (None para no fijarlos)
+    """
+    # analyze_performance_simple no hace requests ni lanza excepciones
+    analyze_performance_simple(
+        'http://localhost/',
+        '<html><head><link rel="stylesheet" href="a.css"></head>'
+        '<body><img src="a.png"></body></html>'
+    )
+
+    # sched_setaffinity sólo existe en Linux
+    if next_worker is None or not hasattr(os, 'sched_setaffinity'):
+        return
+
+    # Los initargs son iguales para todos los workers: el índice de cada uno
+    # sale del contador compartido
+    with next_worker.get_lock():
+        index = next_worker.value
+        next_worker.value += 1
+
+    cores = sorted(os.sched_getaffinity(0))
+    core = cores[index % len(cores)]
+    try:
+        os.sched_setaffinity(0, {core})
+        logger.debug("Worker %d fijado al core %d", os.getpid(), core)
+    except OSError as e:
+        logger.debug("No se pudo fijar el worker al core %d: %s", core, e)
+
+
+def init_process_pool(num_processes: int, pin_workers: bool = False) -> None:
     """
     Inicializa el pool de procesos.
 
     Args:
         num_processes: Número de procesos en el pool
+        pin_workers: Si es True, fija cada worker a un core distinto
     """
     global process_pool
 
@@ -278,7 +502,12 @@ def init_process_pool(num_processes: int) -> None:
         return
 
     logger.info(f"Inicializando pool de procesos con {num_processes} workers")
-    process_pool = Pool(processes=num_processes)
+    next_worker = Value('i', 0) if pin_workers else None
+    process_pool = Pool(
+        processes=num_processes,
+        initializer=_worker_init,
+        initargs=(next_worker,)
+    )
 
 
 def cleanup_process_pool() -> None:
@@ -337,6 +566,12 @@ Ejemplos:
         help=f'Número de procesos en el pool (default: {cpu_count()})'
     )
 
+    parser.add_argument(
+        '--pin-workers',
+        action='store_true',
+        help='Fijar cada proceso del pool a un core (sólo Linux)'
+    )
+
     parser.add_argument(
         '--debug',
         action='store_true',
@@ -360,7 +595,7 @@ def main():
     signal.signal(signal.SIGTERM, signal_handler)
 
     # Inicializar pool de procesos
-    init_process_pool(args.processes)
+    init_process_pool(args.processes, pin_workers=args.pin_workers)
 
     # Crear servidor
     try:
@@ -19,23 +19,39 @@ Uso:
 
 import argparse
 import asyncio
+import gzip
+import hashlib
+import ipaddress
 import logging
+import os
+import re
 import signal
+import socket
 import sys
-from datetime import datetime
-from typing import Optional
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from multiprocessing import Process
+from typing import Optional, Tuple
 from urllib.parse import urlparse
 
 from aiohttp import web
 import aiohttp
 
+# uvloop es opcional (no existe en Windows): event loop sobre libuv, con
+# menos overhead por callback y por operación de socket que el de asyncio
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 from scraper.async_http import AsyncHTTPClient
 from scraper.html_parser import HTMLParser
-from scraper.metadata_extractor import extract_relevant_metadata
-from common.protocol import ProtocolClient, ProtocolError
+from common.protocol import ProtocolClientPool, ProtocolError
 from common.serialization import (
-    serialize_json, deserialize_json,
-    create_request, validate_response
+    serialize_json, deserialize_json, deserialize_pickle,
+    create_request, validate_response,
+    encode_binary_to_base64, SerializationError
 )
 
 # Configuración de logging
@@ -45,11 +61,257 @@ logging.basicConfig(
     datefmt='%Y-%m-%d %H:%M:%S'
 )
 logger = logging.getLogger(__name__)
+# El formato no usa thread ni proceso: no se calculan en cada registro
+logging.logThreads = False
+logging.logProcesses = False
 
 # Variables globales para configuración
 processing_server_host: Optional[str] = None
 processing_server_port: Optional[int] = None
 
+# URL scrapeable: esquema http(s) y un host no vacío (validación en C, sin
+# armar un ParseResult por request)
+_URL_RE = re.compile(r'^https?://[^/?#\s]{1,253}(?:[/?#]|$)', re.IGNORECASE)
+
+# Cache de respuestas de /scrape por URL. Los errores se guardan menos tiempo:
+# evitan repetir enseguida un scraping que falla, sin fijar un error transitorio
+SCRAPE_CACHE_SIZE = 10_000
+SCRAPE_CACHE_TTL = 300
+SCRAPE_ERROR_TTL = 30
+
+# Máximo de scrapings en curso por proceso (--max-concurrent) y cuánto espera
+# un request por un lugar antes de recibir 503
+max_concurrent_scrapes = 100
+SCRAPE_QUEUE_TIMEOUT = 0.5
+
+# Requests al servidor de procesamiento por scraping (screenshot, rendimiento
+# e imágenes, en paralelo): el pool de conexiones se dimensiona con esto
+PROCESSING_REQUESTS_PER_SCRAPE = 3
+# Tiempo máximo de un request de procesamiento, incluida la espera por una
+# conexión libre del pool
+PROCESSING_TIMEOUT = 90.0
+
+# Procesos para parsear HTML fuera del event loop (por worker de --workers)
+parse_processes = os.cpu_count() or 1
+
+# Límite de requests a /scrape por IP de cliente (--rate-limit, 0 desactiva,
+# default): token bucket con ráfagas de hasta RATE_LIMIT_BURST requests
+rate_limit = 0.0
+RATE_LIMIT_BURST = 20
+RATE_LIMIT_CLIENTS = 10_000
+
+# Si es True se rechazan las URLs a hosts locales o privados (--block-private)
+block_private_hosts = False
+
+
+# Timestamps: la parte hasta los segundos se formatea una vez por segundo
+_ts_second: Optional[int] = None
+_ts_prefix = ''
+# Body de /health, armado una vez por segundo (sólo cambia el timestamp)
+_health_second: Optional[int] = None
+_health_body = b''
+
+
+def _utc_timestamp() -> str:
+    """
+    Devuelve la hora UTC actual en ISO 8601 con microsegundos y sufijo 'Z'.
+
+    Mismo formato que datetime.utcnow().isoformat() + 'Z', pero sin crear un
+    datetime por request: strftime sólo se llama al cambiar el segundo.
+
+    Returns:
+        Timestamp, por ejemplo '2024-01-01T12:00:00.123456Z'
+    """
+    global _ts_second, _ts_prefix
+
+    now = time.time()
+    second = int(now)
+    if second != _ts_second:
+        _ts_prefix = time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(second))
+        _ts_second = second
+    return f"{_ts_prefix}.{int((now - second) * 1_000_000):06d}Z"
+
+
+def _cache_key(url: str) -> str:
+    """
+    Normaliza una URL para usarla como clave de cache.
+
+    Esquema y host no distinguen mayúsculas, y el fragmento no llega al
+    servidor: variantes que sólo difieren en eso comparten entrada.
+
+    Args:
+        url: URL pedida
+
+    Returns:
+        URL normalizada
+    """
+    parsed = urlparse(url)
+    return parsed._replace(
+        scheme=parsed.scheme.lower(),
+        netloc=parsed.netloc.lower(),
+        fragment=''
+    ).geturl()
+
+
+def _get_cached(cache: OrderedDict, key: str) -> Optional[Tuple]:
+    """
+    Busca una respuesta vigente en la cache.
+
+    Args:
+        cache: Cache de la aplicación (app['scrape_cache'])
+        key: Clave de _cache_key
+
+    Returns:
+        Tupla (vencimiento, ttl, status, body, etag, public), o None si no
+        está o venció
+    """
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    if entry[0] <= time.monotonic():
+        del cache[key]
+        return None
+    cache.move_to_end(key)
+    return entry
+
+
+def _store_cached(cache: OrderedDict, key: str, status: int, body: bytes, ttl: int,
+                  public: bool = True) -> Tuple:
+    """
+    Guarda una respuesta serializada, descartando la menos usada si se llena.
+
+    Args:
+        cache: Cache de la aplicación (app['scrape_cache'])
+        key: Clave de _cache_key
+        status: Status HTTP de la respuesta
+        body: Body JSON ya serializado
+        ttl: Segundos de vigencia
+        public: Si clientes y proxies pueden cachearla; False para errores y
+            resultados parciales, que sólo se guardan acá hasta reintentar
+
+    Returns:
+        La entrada guardada (mismo formato que _get_cached)
+    """
+    # ETag débil: la misma entrada se envía con y sin gzip según el cliente
+    # (compression_middleware), y un ETag fuerte no puede repetirse entre
+    # codificaciones distintas del mismo recurso
+    etag = 'W/"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+    entry = (time.monotonic() + ttl, ttl, status, body, etag, public)
+    cache[key] = entry
+    cache.move_to_end(key)
+    if len(cache) > SCRAPE_CACHE_SIZE:
+        cache.popitem(last=False)
+    return entry
+
+
+def _cached_response(request: web.Request, entry: Tuple) -> web.Response:
+    """
+    Arma la respuesta HTTP de una entrada de cache.
+
+    Las entradas públicas llevan ETag y Cache-Control para que clientes y
+    proxies también puedan cachearlas, y se responde 304 si el cliente ya
+    tiene esa versión. Los errores van con 'no-store'. Vary: Accept-Encoding
+    porque compression_middleware puede enviar el body comprimido.
+
+    Args:
+        request: Request recibido
+        entry: Entrada de _get_cached/_store_cached
+
+    Returns:
+        Respuesta con el JSON cacheado (o 304 sin body)
+    """
+    _, ttl, status, body, etag, public = entry
+    if not public:
+        return web.Response(body=body, status=status, content_type='application/json',
+                            headers={'Cache-Control': 'no-store'})
+
+    headers = {'ETag': etag, 'Cache-Control': f'public, max-age={ttl}',
+               'Vary': 'Accept-Encoding'}
+
+    if request.headers.get('If-None-Match') == etag:
+        return web.Response(status=304, headers=headers)
+
+    return web.Response(body=body, status=status, content_type='application/json',
+                        headers=headers)
+
+
+def _json_response(data: dict, status: int = 200) -> web.Response:
+    """
+    Arma una respuesta JSON con serialize_json.
+
+    serialize_json usa orjson si está disponible y ya devuelve bytes;
+    web.json_response pasaría por json.dumps y un encode extra.
+
+    Args:
+        data: Datos a responder
+        status: Status HTTP
+
+    Returns:
+        Respuesta con Content-Type application/json
+    """
+    return web.Response(body=serialize_json(data), status=status, content_type='application/json')
+
+
+async def init_http_client(app: web.Application) -> None:
+    """
+    Crea la sesión HTTP de la aplicación al arrancar.
+
+    Una sola sesión para todos los /scrape: su pool de conexiones mantiene
+    vivas las conexiones TCP/TLS y los requests al mismo host las reutilizan.
+    """
+    client = AsyncHTTPClient(timeout=30.0)
+    await client.start()
+    app['http_client'] = client
+
+
+async def close_http_client(app: web.Application) -> None:
+    """Cierra la sesión HTTP de la aplicación al apagarla."""
+    await app['http_client'].close()
+
+
+async def init_processing_pool(app: web.Application) -> None:
+    """
+    Crea el pool de conexiones al servidor de procesamiento al arrancar.
+
+    Las conexiones se abren en el primer uso y se reutilizan entre requests.
+    Alcanzan para que los --max-concurrent scrapings en curso tengan sus
+    requests de procesamiento en vuelo a la vez.
+    """
+    app['proc_pool'] = ProtocolClientPool(
+        processing_server_host, processing_server_port,
+        max_size=PROCESSING_REQUESTS_PER_SCRAPE * max_concurrent_scrapes
+    )
+
+
+async def close_processing_pool(app: web.Application) -> None:
+    """Cierra las conexiones ociosas al apagar la aplicación."""
+    await app['proc_pool'].close()
+
+
+async def init_scrape_cache(app: web.Application) -> None:
+    """Crea la cache de respuestas de /scrape (LRU con vencimiento)."""
+    app['scrape_cache'] = OrderedDict()
+
+
+async def init_parse_pool(app: web.Application) -> None:
+    """
+    Crea el pool de procesos para el parsing de HTML.
+
+    Los procesos se crean en el primer uso. Con --workers > 1 cada worker
+    tiene su propio pool, así que los cores se reparten entre ellos.
+    """
+    app['parse_pool'] = ProcessPoolExecutor(max_workers=parse_processes)
+
+
+async def close_parse_pool(app: web.Application) -> None:
+    """Cierra el pool de parsing al apagar la aplicación."""
+    app['parse_pool'].shutdown(cancel_futures=True)
+
+
+async def init_scrape_semaphore(app: web.Application) -> None:
+    """Crea el semáforo que limita los scrapings en curso."""
+    app['scrape_semaphore'] = asyncio.Semaphore(max_concurrent_scrapes)
+
 
 async def handle_scrape(request: web.Request) -> web.Response:
     """
@@ -66,189 +328,328 @@ async def handle_scrape(request: web.Request) -> web.Response:
         url = request.query.get('url')
 
         if not url:
-            return web.json_response(
+            return _json_response(
                 {'status': 'error', 'error': 'Parámetro "url" requerido'},
                 status=400
             )
 
         # Validar URL
-        try:
-            parsed = urlparse(url)
-            if not parsed.scheme or not parsed.netloc:
-                raise ValueError("URL inválida")
-        except Exception:
-            return web.json_response(
+        if not _URL_RE.match(url):
+            return _json_response(
                 {'status': 'error', 'error': 'URL inválida'},
                 status=400
             )
 
-        logger.info(f"Scraping request: {url}")
+        # Una URL repetida dentro del TTL no vuelve a pasar por el pipeline
+        cache = request.app['scrape_cache']
+        key = _cache_key(url)
+        entry = _get_cached(cache, key)
+        if entry is not None:
+            logger.info("Scraping request (cache): %s", url)
+            return _cached_response(request, entry)
+
+        # Límite de scrapings en curso: si no hay lugar enseguida se responde
+        # 503 en vez de acumular requests salientes sin cota
+        semaphore = request.app['scrape_semaphore']
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout=SCRAPE_QUEUE_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning("Servidor ocupado, rechazando %s", url)
+            response = _json_response(
+                {'status': 'error', 'error': 'Servidor ocupado, reintentar más tarde'},
+                status=503
+            )
+            response.headers['Retry-After'] = '1'
+            return response
+
+        logger.info("Scraping request: %s", url)
+
+        try:
+            # El servidor de procesamiento descarga la página por su cuenta: el
+            # screenshot y el análisis de rendimiento arrancan junto con el
+            # scraping (sólo los thumbnails esperan las URLs de imágenes)
+            scrape_task = asyncio.create_task(
+                scrape_url(request.app['http_client'], request.app['parse_pool'], url)
+            )
+            processing_task = asyncio.create_task(
+                get_processing_data(request.app['proc_pool'], url, scrape_task)
+            )
+
+            try:
+                scraping_data = await scrape_task
+            except BaseException:
+                processing_task.cancel()
+                raise
+
+            processing_data = await processing_task
+
+        except asyncio.TimeoutError:
+            raise
 
-        # Realizar scraping
-        scraping_data = await scrape_url(url)
+        except Exception as e:
+            # Error de la página (status HTTP, conexión, HTML): se cachea poco
+            # tiempo. Es un error esperable: el traceback sólo en modo debug
+            logger.error("Error al procesar scraping de %s: %s", url, e,
+                         exc_info=logger.isEnabledFor(logging.DEBUG))
+            body = serialize_json({'status': 'error', 'error': str(e)})
+            return _cached_response(request, _store_cached(cache, key, 500, body, SCRAPE_ERROR_TTL,
+                                                           public=False))
 
-        # Obtener datos de procesamiento
-        processing_data = await get_processing_data(url, scraping_data)
+        finally:
+            semaphore.release()
 
         # Construir respuesta consolidada
         response_data = {
             'url': url,
-            'timestamp': datetime.utcnow().isoformat() + 'Z',
+            'timestamp': _utc_timestamp(),
             'scraping_data': scraping_data,
             'processing_data': processing_data,
             'status': 'success'
         }
 
-        logger.info(f"Scraping completado exitosamente: {url}")
-        return web.json_response(response_data)
+        logger.info("Scraping completado exitosamente: %s", url)
+        # Se serializa acá (no con _json_response) para cachear el body ya
+        # armado, que lleva el screenshot y los thumbnails en base64
+        body = serialize_json(response_data)
+        # Si falló el servidor de procesamiento el resultado es parcial: se
+        # guarda sólo hasta el próximo intento y no se ofrece a clientes/proxies
+        if 'error' in processing_data:
+            entry = _store_cached(cache, key, 200, body, SCRAPE_ERROR_TTL, public=False)
+        else:
+            entry = _store_cached(cache, key, 200, body, SCRAPE_CACHE_TTL)
+        return _cached_response(request, entry)
 
     except asyncio.TimeoutError:
-        logger.error(f"Timeout al procesar {url}")
-        return web.json_response(
+        logger.error("Timeout al procesar %s", url)
+        return _json_response(
             {'status': 'error', 'error': 'Timeout al procesar la solicitud'},
             status=504
         )
 
     except Exception as e:
-        logger.error(f"Error al procesar scraping: {e}", exc_info=True)
-        return web.json_response(
+        logger.error("Error al procesar scraping: %s", e, exc_info=True)
+        return _json_response(
             {'status': 'error', 'error': str(e)},
             status=500
         )
 
 
-async def scrape_url(url: str) -> dict:
+async def scrape_url(client: AsyncHTTPClient, executor: Optional[Executor], url: str) -> dict:
     """
     Realiza el scraping de una URL.
 
     Args:
+        client: Cliente HTTP ya iniciado (compartido entre requests)
+        executor: Pool de procesos para el parsing (None para parsear en el
+            event loop)
         url: URL a scrapear
 
     Returns:
         Diccionario con datos extraídos
     """
-    async with AsyncHTTPClient(timeout=30.0) as client:
-        # Descargar HTML
-        html, status, headers = await client.get(url)
-
-        if status != 200:
-            raise Exception(f"HTTP {status} al solicitar {url}")
-
-        # Parsear HTML
-        parser = HTMLParser(html, base_url=url)
-
-        # Extraer información
-        title = parser.get_title()
-        links = parser.get_links()
-        images = parser.get_images()
-        meta_tags = extract_relevant_metadata(html)
-        structure = parser.get_headers_structure()
-
-        return {
-            'title': title,
-            'links': links[:50],  # Limitar a 50 links
-            'meta_tags': meta_tags,
-            'structure': structure,
-            'images_count': len(images),
-            'images_urls': [img['src'] for img in images[:10]]  # Primeras 10 imágenes
-        }
+    # Descargar HTML
+    html, status, headers = await client.get(url)
+
+    if status != 200:
+        raise Exception(f"HTTP {status} al solicitar {url}")
+
+    # El parsing es CPU puro: en otro proceso no frena al resto de los requests
+    if executor is None:
+        return parse_page(html, url)
+    return await asyncio.get_running_loop().run_in_executor(executor, parse_page, html, url)
+
+
+def parse_page(html: str, url: str) -> dict:
+    """
+    Extrae los datos de scraping de un HTML ya descargado.
+
+    Es una función de módulo para poder ejecutarse en el pool de procesos.
+
+    Args:
+        html: Contenido HTML
+        url: URL de la página (base para las URLs relativas)
+
+    Returns:
+        Diccionario con datos extraídos
+    """
+    # Un solo recorrido del documento para todos los datos (ver parse_all)
+    data = HTMLParser(html, base_url=url).parse_all(image_limit=10)
+    data['links'] = data['links'][:50]  # Limitar a 50 links
+    return data
+
+
+# Resultado cuando no hay servidor de procesamiento configurado: es constante,
+# se arma una sola vez (sólo se lee, al serializar la respuesta)
+_EMPTY_PROCESSING = {
+    'screenshot': None,
+    'performance': None,
+    'thumbnails': []
+}
+
 
+def _screenshot_base64(screenshot_data: dict) -> Optional[str]:
+    """
+    Obtiene el screenshot en base64 de la respuesta de procesamiento.
+
+    Args:
+        screenshot_data: Resultado de la operación 'screenshot'
+
+    Returns:
+        Screenshot en base64, o None si la captura falló
+    """
+    if not screenshot_data.get('success'):
+        return None
+    # El base64 se hace recién acá, para la respuesta HTTP en JSON
+    if 'screenshot_ref' in screenshot_data:
+        return encode_binary_to_base64(screenshot_data['_blobs'][screenshot_data['screenshot_ref']])
+    return screenshot_data.get('screenshot')
+
+
+async def _processing_request(pool: ProtocolClientPool, operation: str, params: dict) -> dict:
+    """
+    Envía un request al servidor de procesamiento y devuelve sus datos.
+
+    Args:
+        pool: Pool de conexiones al servidor de procesamiento
+        operation: Operación a ejecutar ('screenshot', 'performance', 'images')
+        params: Parámetros de la operación
+
+    Returns:
+        Campo 'data' de la response
 
-async def get_processing_data(url: str, scraping_data: dict) -> dict:
+    Raises:
+        ProtocolError: Si falla la comunicación o se supera PROCESSING_TIMEOUT
+        Exception: Si el servidor responde con error
+    """
+    request_bytes = serialize_json(create_request(operation, params))
+
+    async def exchange() -> bytes:
+        # Enviar request y recibir response por una conexión persistente
+        client = await pool.acquire()
+        reusable = False
+        try:
+            response = await client.send_and_receive(request_bytes, timeout=None)
+            reusable = True
+            return response
+        finally:
+            await pool.release(client, reusable)
+
+    # Un solo timeout para la espera de una conexión libre y el request: con
+    # el pool ocupado no se hace cola sin límite antes de empezar a contar
+    try:
+        response_bytes = await asyncio.wait_for(exchange(), timeout=PROCESSING_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise ProtocolError(f"Timeout esperando al servidor de procesamiento ({operation})")
+
+    # Deserializar response (los errores de protocolo llegan siempre en JSON)
+    try:
+        response = deserialize_pickle(response_bytes)
+    except SerializationError:
+        response = deserialize_json(response_bytes)
+    validate_response(response)
+
+    if not response['success']:
+        raise Exception(f"Error del servidor de procesamiento: {response.get('error')}")
+
+    return response['data']
+
+
+async def get_processing_data(pool: ProtocolClientPool, url: str,
+                              scrape_task: 'asyncio.Future[dict]') -> dict:
     """
     Obtiene datos de procesamiento del servidor de procesamiento.
 
+    Screenshot y rendimiento se piden de inmediato, en paralelo con el
+    scraping; los thumbnails se piden cuando el scraping termina, porque
+    necesitan las URLs de las imágenes. Cada operación va por su propia
+    conexión del pool y el servidor las atiende en paralelo.
+
     Args:
+        pool: Pool de conexiones al servidor de procesamiento
         url: URL procesada
-        scraping_data: Datos de scraping ya obtenidos
+        scrape_task: Tarea de scraping de la misma URL (resultado de scrape_url)
 
     Returns:
         Diccionario con datos de procesamiento
     """
     if not processing_server_host or not processing_server_port:
         logger.warning("Servidor de procesamiento no configurado, omitiendo procesamiento")
-        return {
-            'screenshot': None,
-            'performance': None,
-            'thumbnails': []
-        }
-
-    try:
-        # Conectar al servidor de procesamiento
-        async with ProtocolClient(processing_server_host, processing_server_port) as client:
-
-            # Crear request para procesamiento completo
-            image_urls = scraping_data.get('images_urls', [])
-
-            request_data = create_request('all', {
-                'url': url,
-                'html': None,  # No enviamos HTML para que el servidor lo descargue
-                'image_urls': image_urls
-            })
-
-            # Enviar request y recibir response
-            request_bytes = serialize_json(request_data)
-            response_bytes = await client.send_and_receive(request_bytes, timeout=90.0)
-
-            # Deserializar response
-            response = deserialize_json(response_bytes)
-            validate_response(response)
-
-            if not response['success']:
-                raise Exception(f"Error del servidor de procesamiento: {response.get('error')}")
-
-            data = response['data']
-
-            # Extraer resultados
-            screenshot_data = data.get('screenshot', {})
-            performance_data = data.get('performance', {})
-            images_data = data.get('images', {})
-
-            return {
-                'screenshot': screenshot_data.get('screenshot') if screenshot_data.get('success') else None,
-                'performance': {
-                    'load_time_ms': performance_data.get('load_time_ms'),
-                    'total_size_kb': performance_data.get('total_size_kb') or performance_data.get('estimated_total_size_kb'),
-                    'num_requests': performance_data.get('num_requests') or performance_data.get('estimated_num_requests')
-                } if performance_data.get('success') else {},
-                'thumbnails': [
-                    t.get('thumbnail')
-                    for t in images_data.get('thumbnails', [])
-                    if 'thumbnail' in t
-                ]
-            }
-
-    except ProtocolError as e:
-        logger.error(f"Error de comunicación con servidor de procesamiento: {e}")
-        return {
-            'screenshot': None,
-            'performance': None,
-            'thumbnails': [],
-            'error': f"Processing server error: {e}"
-        }
+        return _EMPTY_PROCESSING
+
+    async def request_images() -> dict:
+        scraping_data = await scrape_task
+        return await _processing_request(pool, 'images', {
+            'image_urls': scraping_data.get('images_urls', []),
+            'binary': True
+        })
+
+    results = await asyncio.gather(
+        # Screenshot y thumbnails en pickle, con las imágenes como bytes crudos
+        _processing_request(pool, 'screenshot', {'url': url, 'binary': True}),
+        # No enviamos HTML para que el servidor lo descargue
+        _processing_request(pool, 'performance', {'url': url, 'html': None}),
+        request_images(),
+        return_exceptions=True
+    )
 
-    except Exception as e:
-        logger.error(f"Error al obtener datos de procesamiento: {e}", exc_info=True)
-        return {
-            'screenshot': None,
-            'performance': None,
-            'thumbnails': [],
-            'error': str(e)
-        }
+    # Una operación que falla no descarta los resultados de las otras
+    errors = [r for r in results if isinstance(r, BaseException)]
+    screenshot_data, performance_data, images_data = (
+        {} if isinstance(r, BaseException) else r for r in results
+    )
+    blobs = images_data.get('_blobs') or []
+
+    processing_data = {
+        'screenshot': _screenshot_base64(screenshot_data),
+        'performance': {
+            'load_time_ms': performance_data.get('load_time_ms'),
+            'total_size_kb': performance_data.get('total_size_kb') or performance_data.get('estimated_total_size_kb'),
+            'num_requests': performance_data.get('num_requests') or performance_data.get('estimated_num_requests')
+        } if performance_data.get('success') else {},
+        # El base64 se hace recién acá, para la respuesta HTTP en JSON
+        'thumbnails': [
+            encode_binary_to_base64(blobs[t['thumbnail_ref']])
+            if 'thumbnail_ref' in t else t.get('thumbnail')
+            for t in images_data.get('thumbnails', [])
+            if 'thumbnail_ref' in t or 'thumbnail' in t
+        ]
+    }
+
+    for e in errors:
+        if isinstance(e, ProtocolError):
+            logger.error("Error de comunicación con servidor de procesamiento: %s", e)
+        else:
+            logger.error("Error al obtener datos de procesamiento: %s", e,
+                         exc_info=e if logger.isEnabledFor(logging.DEBUG) else None)
+
+    if errors:
+        e = errors[0]
+        processing_data['error'] = f"Processing server error: {e}" if isinstance(e, ProtocolError) else str(e)
+
+    return processing_data
 
 
 async def handle_health(request: web.Request) -> web.Response:
-    """Handler para endpoint /health."""
-    return web.json_response({
-        'status': 'healthy',
-        'timestamp': datetime.utcnow().isoformat() + 'Z'
-    })
+    """
+    Handler para endpoint /health.
 
+    Lo consultan los balanceadores con mucha frecuencia: el body se serializa
+    una vez por segundo, con el timestamp a precisión de segundos.
+    """
+    global _health_second, _health_body
 
-async def handle_index(request: web.Request) -> web.Response:
-    """Handler para endpoint raíz."""
-    return web.Response(
-        text="""
+    second = int(time.time())
+    if second != _health_second:
+        _health_body = serialize_json({
+            'status': 'healthy',
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(second))
+        })
+        _health_second = second
+    return web.Response(body=_health_body, content_type='application/json')
+
+
+# Página del endpoint raíz: es estática, se codifica una sola vez
+_INDEX_HTML = """
 <!DOCTYPE html>
 <html>
 <head>
@@ -282,9 +683,131 @@ async def handle_index(request: web.Request) -> web.Response:
     <pre><code>curl "http://localhost:8000/scrape?url=https://example.com"</code></pre>
 </body>
 </html>
-        """,
-        content_type='text/html'
-    )
+"""
+_INDEX_BYTES = _INDEX_HTML.encode('utf-8')
+_INDEX_GZIP = gzip.compress(_INDEX_BYTES, 9)
+_INDEX_HEADERS = {
+    'Content-Type': 'text/html; charset=utf-8',
+    'Cache-Control': 'public, max-age=3600',
+    'Vary': 'Accept-Encoding'
+}
+_INDEX_GZIP_HEADERS = {**_INDEX_HEADERS, 'Content-Encoding': 'gzip'}
+
+
+async def handle_index(request: web.Request) -> web.Response:
+    """Handler para endpoint raíz (página estática, ya codificada y comprimida)."""
+    if 'gzip' in request.headers.get('Accept-Encoding', ''):
+        return web.Response(body=_INDEX_GZIP, headers=_INDEX_GZIP_HEADERS)
+    return web.Response(body=_INDEX_BYTES, headers=_INDEX_HEADERS)
+
+
+# Las respuestas más chicas que esto se envían sin comprimir (no compensa)
+COMPRESSION_MIN_SIZE = 1024
+
+
+@web.middleware
+async def compression_middleware(request: web.Request, handler) -> web.StreamResponse:
+    """
+    Comprime las respuestas grandes según el Accept-Encoding del cliente.
+
+    El JSON de /scrape lleva el screenshot y los thumbnails en base64, que
+    se reducen bastante con gzip/deflate (o br si está instalado Brotli).
+    Las respuestas que ya traen Content-Encoding no se tocan.
+    """
+    response = await handler(request)
+
+    if (isinstance(response, web.Response)
+            and response.body is not None
+            and len(response.body) >= COMPRESSION_MIN_SIZE
+            and 'Content-Encoding' not in response.headers):
+        response.enable_compression()
+        response.headers['Vary'] = 'Accept-Encoding'
+
+    return response
+
+
+def _is_private_host(url: str) -> bool:
+    """
+    Indica si la URL apunta a la máquina local o a una red privada.
+
+    Sólo mira el host tal como viene (IP literal o 'localhost'): no resuelve
+    DNS, para que el chequeo no agregue latencia a cada request.
+
+    Args:
+        url: URL ya validada con _URL_RE
+
+    Returns:
+        True si el host es local, privado o reservado
+    """
+    host = urlparse(url).hostname
+    if not host:
+        return False
+    if host == 'localhost' or host.endswith('.localhost'):
+        return True
+    try:
+        return not ipaddress.ip_address(host).is_global
+    except ValueError:
+        # Es un nombre de dominio
+        return False
+
+
+def _take_token(buckets: OrderedDict, client: str) -> bool:
+    """
+    Consume un token del bucket del cliente, si tiene.
+
+    Args:
+        buckets: Buckets de la aplicación (app['rate_buckets'])
+        client: IP del cliente
+
+    Returns:
+        True si el request está dentro del límite
+    """
+    now = time.monotonic()
+    tokens, last = buckets.get(client, (RATE_LIMIT_BURST, now))
+    tokens = min(RATE_LIMIT_BURST, tokens + (now - last) * rate_limit)
+
+    allowed = tokens >= 1
+    buckets[client] = (tokens - 1 if allowed else tokens, now)
+    buckets.move_to_end(client)
+    if len(buckets) > RATE_LIMIT_CLIENTS:
+        buckets.popitem(last=False)
+    return allowed
+
+
+@web.middleware
+async def guard_middleware(request: web.Request, handler) -> web.StreamResponse:
+    """
+    Rechaza requests a /scrape antes de llegar al handler.
+
+    Aplica el límite por IP de cliente (--rate-limit) y, con --block-private,
+    rechaza URLs a hosts locales o privados (evita usar el servidor para
+    llegar a servicios internos). Los dos vienen desactivados. Las URLs mal
+    formadas las rechaza handle_scrape.
+    """
+    if request.path != '/scrape':
+        return await handler(request)
+
+    if rate_limit > 0 and not _take_token(request.app['rate_buckets'], request.remote or ''):
+        response = _json_response(
+            {'status': 'error', 'error': 'Demasiados requests, reintentar más tarde'},
+            status=429
+        )
+        response.headers['Retry-After'] = '1'
+        return response
+
+    url = request.query.get('url', '')
+    if block_private_hosts and _URL_RE.match(url) and _is_private_host(url):
+        return _json_response(
+            {'status': 'error', 'error': 'URL a un host local o privado no permitida'},
+            status=400
+        )
+
+    return await handler(request)
+
+
+async def init_rate_limiter(app: web.Application) -> None:
+    """Crea los buckets del límite de requests por IP (LRU de clientes)."""
+    app['rate_buckets'] = OrderedDict()
 
 
 def create_app() -> web.Application:
@@ -294,13 +817,24 @@ def create_app() -> web.Application:
     Returns:
         Aplicación web configurada
     """
-    app = web.Application()
+    # guard_middleware va primero: lo que rechaza no pasa por la compresión
+    app = web.Application(middlewares=[guard_middleware, compression_middleware])
 
     # Rutas
     app.router.add_get('/', handle_index)
     app.router.add_get('/scrape', handle_scrape)
     app.router.add_get('/health', handle_health)
 
+    app.on_startup.append(init_http_client)
+    app.on_startup.append(init_processing_pool)
+    app.on_startup.append(init_scrape_cache)
+    app.on_startup.append(init_scrape_semaphore)
+    app.on_startup.append(init_rate_limiter)
+    app.on_startup.append(init_parse_pool)
+    app.on_cleanup.append(close_http_client)
+    app.on_cleanup.append(close_processing_pool)
+    app.on_cleanup.append(close_parse_pool)
+
     return app
 
 
@@ -339,7 +873,7 @@ Ejemplos:
         '-w', '--workers',
         type=int,
         default=4,
-        help='Número de workers (default: 4)'
+        help='Número de procesos que atienden el puerto (default: 4)'
     )
 
     parser.add_argument(
@@ -355,6 +889,26 @@ Ejemplos:
         help='Puerto del servidor de procesamiento (default: 8001)'
     )
 
+    parser.add_argument(
+        '--max-concurrent',
+        type=int,
+        default=100,
+        help='Máximo de scrapings en curso por proceso (default: 100)'
+    )
+
+    parser.add_argument(
+        '--rate-limit',
+        type=float,
+        default=0.0,
+        help='Requests por segundo a /scrape por IP de cliente, 0 para no limitar (default: 0)'
+    )
+
+    parser.add_argument(
+        '--block-private',
+        action='store_true',
+        help='Rechazar URLs a hosts locales o privados'
+    )
+
     parser.add_argument(
         '--debug',
         action='store_true',
@@ -366,15 +920,19 @@ Ejemplos:
 
 def signal_handler(signum):
     """Handler para señales de terminación."""
-    logger.info(f"Señal {signum} recibida, cerrando servidor...")
+    logger.info("Señal %s recibida, cerrando servidor...", signum)
     sys.exit(0)
 
 
-def main():
-    """Función principal."""
-    global processing_server_host, processing_server_port
+def _configure(args) -> None:
+    """
+    Aplica la configuración de la línea de comandos al proceso actual.
 
-    args = parse_arguments()
+    Args:
+        args: Namespace de parse_arguments
+    """
+    global processing_server_host, processing_server_port, max_concurrent_scrapes
+    global parse_processes, rate_limit, block_private_hosts
 
     # Configurar logging
     if args.debug:
@@ -384,37 +942,145 @@ def main():
     # Configurar servidor de procesamiento
     processing_server_host = args.processing_host
     processing_server_port = args.processing_port
+    max_concurrent_scrapes = args.max_concurrent
+    parse_processes = max(1, (os.cpu_count() or 1) // max(1, args.workers))
+    rate_limit = args.rate_limit
+    block_private_hosts = args.block_private
+
+
+def _reuseport_socket(host: str, port: int) -> socket.socket:
+    """
+    Crea un socket de escucha con SO_REUSEPORT.
+
+    Varios procesos pueden hacer bind al mismo puerto y el kernel reparte
+    las conexiones entrantes entre ellos.
+
+    Args:
+        host: Dirección de escucha (IPv4 o IPv6)
+        port: Puerto de escucha
+
+    Returns:
+        Socket TCP ya asociado a la dirección
+    """
+    family, type_, proto, _, sockaddr = socket.getaddrinfo(
+        host, port, type=socket.SOCK_STREAM, flags=socket.AI_PASSIVE
+    )[0]
+    sock = socket.socket(family, type_, proto)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind(sockaddr)
+    return sock
+
+
+def _serve(args, sock: Optional[socket.socket] = None) -> int:
+    """
+    Ejecuta la aplicación en el proceso actual hasta que se detenga.
 
-    logger.info(f"Servidor de procesamiento: {processing_server_host}:{processing_server_port}")
+    Args:
+        args: Namespace de parse_arguments
+        sock: Socket de escucha ya creado (None para escuchar en args.ip/port)
 
-    # Crear aplicación
+    Returns:
+        Código de salida
+    """
+    # Crear aplicación (sesión HTTP, pool y cache son propios de cada proceso)
     app = create_app()
 
     # Registrar signal handlers (compatible con Windows)
     signal.signal(signal.SIGINT, lambda s, f: signal_handler(s))
     signal.signal(signal.SIGTERM, lambda s, f: signal_handler(s))
 
+    # web.run_app crea su event loop con la policy vigente
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        logger.info("Usando uvloop como event loop")
+
     # Ejecutar servidor
     try:
-        logger.info(f"Iniciando servidor de scraping en {args.ip}:{args.port}")
-        logger.info(f"Workers: {args.workers}")
-
-        web.run_app(
-            app,
-            host=args.ip,
-            port=args.port,
-            access_log=logger if args.debug else None
-        )
+        if sock is not None:
+            web.run_app(app, sock=sock, access_log=logger if args.debug else None)
+        else:
+            web.run_app(
+                app,
+                host=args.ip,
+                port=args.port,
+                access_log=logger if args.debug else None
+            )
 
     except KeyboardInterrupt:
         logger.info("Servidor interrumpido por el usuario")
 
     except Exception as e:
-        logger.error(f"Error al iniciar servidor: {e}", exc_info=True)
+        logger.error("Error al iniciar servidor: %s", e, exc_info=True)
         return 1
 
     return 0
 
 
+def _run_worker(args) -> None:
+    """
+    Proceso worker: sirve la aplicación en su propio socket con SO_REUSEPORT.
+
+    Args:
+        args: Namespace de parse_arguments
+    """
+    # Se vuelve a configurar por si el proceso se creó con spawn
+    _configure(args)
+    sock = _reuseport_socket(args.ip, args.port)
+    logger.info("Worker %d escuchando en %s:%s", os.getpid(), args.ip, args.port)
+    sys.exit(_serve(args, sock))
+
+
+def _run_workers(args) -> int:
+    """
+    Lanza args.workers procesos que atienden el mismo puerto.
+
+    Args:
+        args: Namespace de parse_arguments
+
+    Returns:
+        Código de salida
+    """
+    workers = [
+        Process(target=_run_worker, args=(args,), name=f'scraping-worker-{i}')
+        for i in range(args.workers)
+    ]
+    for worker in workers:
+        worker.start()
+
+    def stop_workers(signum, frame):
+        logger.info("Señal %s recibida, cerrando workers...", signum)
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+
+    signal.signal(signal.SIGINT, stop_workers)
+    signal.signal(signal.SIGTERM, stop_workers)
+
+    for worker in workers:
+        worker.join()
+
+    return 0 if all(worker.exitcode in (0, -signal.SIGTERM) for worker in workers) else 1
+
+
+def main():
+    """Función principal."""
+    args = parse_arguments()
+    _configure(args)
+
+    logger.info("Servidor de procesamiento: %s:%s", processing_server_host, processing_server_port)
+    logger.info("Iniciando servidor de scraping en %s:%s", args.ip, args.port)
+    logger.info("Workers: %d", args.workers)
+
+    # Con SO_REUSEPORT cada worker es un proceso con su propio event loop y el
+    # kernel reparte las conexiones; sin él (Windows) se usa un solo proceso
+    if args.workers > 1:
+        if hasattr(socket, 'SO_REUSEPORT'):
+            return _run_workers(args)
+        logger.warning("SO_REUSEPORT no disponible: se usa un solo proceso")
+
+    return _serve(args)
+
+
 if __name__ == '__main__':
     sys.exit(main())
@@ -5,11 +5,17 @@ Prueba las funcionalidades de codificación/decodificación de mensajes
 y manejo del protocolo binario.
 """
 
+import asyncio
+import socket
+import socketserver
+import threading
 import unittest
 from common.protocol import (
     encode_message, decode_header,
+    send_message, receive_message,
     HEADER_SIZE, MAX_MESSAGE_SIZE,
-    ProtocolError
+    ProtocolError, ConnectionClosedError, IdleTimeoutError, ProtocolClientPool,
+    PipelinedWriter
 )
 
 
@@ -82,5 +88,218 @@ class TestProtocol(unittest.TestCase):
             decode_header(invalid_header)
 
 
+class TestSocketMessages(unittest.TestCase):
+    """Tests de envío/recepción sobre un par de sockets conectados."""
+
+    def setUp(self):
+        self.left, self.right = socket.socketpair()
+
+    def tearDown(self):
+        self.left.close()
+        self.right.close()
+
+    def test_send_receive(self):
+        """Test de envío y recepción de un mensaje."""
+        send_message(self.left, b'payload')
+        self.assertEqual(receive_message(self.right, timeout=1.0), b'payload')
+
+    def test_send_parts(self):
+        """Test de envío de un payload en varias partes (scatter/gather)."""
+        send_message(self.left, [b'uno', memoryview(b'dos'), bytearray(b''), b'tres'])
+        self.assertEqual(receive_message(self.right, timeout=1.0), b'unodostres')
+
+    def test_receive_into_reused_buffer(self):
+        """Test de recepción sobre un buffer reutilizable que crece."""
+        buffer = bytearray(4)
+
+        for data in (b'ab', b'mensaje mas largo', b'xyz'):
+            send_message(self.left, data)
+            view = receive_message(self.right, timeout=1.0, buffer=buffer)
+            self.assertIsInstance(view, memoryview)
+            self.assertEqual(bytes(view), data)
+            view.release()
+
+        self.assertGreaterEqual(len(buffer), len(b'mensaje mas largo'))
+
+    def test_receive_closed_connection(self):
+        """Test de conexión cerrada por el peer."""
+        self.left.close()
+
+        with self.assertRaises(ProtocolError):
+            receive_message(self.right, timeout=1.0)
+
+    def test_receive_truncated_message(self):
+        """Test de mensaje cortado antes de completar el payload."""
+        self.left.sendall(encode_message(b'incompleto')[:-3])
+        self.left.close()
+
+        with self.assertRaises(ProtocolError) as ctx:
+            receive_message(self.right, timeout=1.0)
+        self.assertNotIsInstance(ctx.exception, ConnectionClosedError)
+
+    def test_receive_closed_after_header(self):
+        """Test de cierre justo después del header: no es un cierre limpio."""
+        self.left.sendall(encode_message(b'payload')[:HEADER_SIZE])
+        self.left.close()
+
+        with self.assertRaises(ProtocolError) as ctx:
+            receive_message(self.right, timeout=1.0)
+        self.assertNotIsInstance(ctx.exception, ConnectionClosedError)
+
+    def test_receive_idle_timeout(self):
+        """Test de timeout sin que llegue ningún byte del próximo mensaje."""
+        with self.assertRaises(IdleTimeoutError):
+            receive_message(self.right, timeout=0.05)
+
+    def test_receive_timeout_mid_frame(self):
+        """Test de timeout con el mensaje a medias."""
+        self.left.sendall(encode_message(b'payload')[:HEADER_SIZE + 2])
+
+        with self.assertRaises(ProtocolError) as ctx:
+            receive_message(self.right, timeout=0.05)
+        self.assertNotIsInstance(ctx.exception, ConnectionClosedError)
+
+
+class _RecordingWriter:
+    """Destino de PipelinedWriter que guarda cada escritura."""
+
+    def __init__(self):
+        self.calls = []
+
+    def write(self, data):
+        self.calls.append(('write', data))
+
+    def writelines(self, list_of_data):
+        self.calls.append(('writelines', list(list_of_data)))
+
+    async def drain(self):
+        pass
+
+
+class TestPipelinedWriter(unittest.TestCase):
+    """Tests del agrupamiento de mensajes del PipelinedWriter."""
+
+    def test_small_messages_coalesced(self):
+        """Test de mensajes chicos escritos juntos en el próximo tick."""
+        async def run():
+            target = _RecordingWriter()
+            writer = PipelinedWriter(target, threshold=1024)
+            writer.write(b'uno')
+            writer.write(b'dos')
+            self.assertEqual(target.calls, [])
+            await asyncio.sleep(0)
+            return target.calls
+
+        calls = asyncio.run(run())
+        self.assertEqual(calls, [('write', encode_message(b'uno') + encode_message(b'dos'))])
+
+    def test_large_payload_not_copied(self):
+        """Test de payload grande: se escribe lo pendiente y después el payload sin copiar."""
+        async def run():
+            target = _RecordingWriter()
+            writer = PipelinedWriter(target, threshold=1024)
+            large = bytes(4096)
+            writer.write(b'chico')
+            writer.write(large)
+            await writer.flush()
+            return target.calls, large
+
+        calls, large = asyncio.run(run())
+        self.assertEqual(calls[0], ('write', encode_message(b'chico')))
+        self.assertEqual(calls[1][0], 'writelines')
+        self.assertEqual(calls[1][1][0], encode_message(large)[:HEADER_SIZE])
+        self.assertIs(calls[1][1][1], large)
+        self.assertEqual(len(calls), 2)
+
+
+class _EchoHandler(socketserver.BaseRequestHandler):
+    """Devuelve cada mensaje recibido, hasta que el cliente cierra."""
+
+    def handle(self):
+        try:
+            while True:
+                send_message(self.request, receive_message(self.request, timeout=5.0))
+        except ConnectionClosedError:
+            pass
+
+
+class TestProtocolClientPool(unittest.TestCase):
+    """Tests del pool de conexiones persistentes."""
+
+    def setUp(self):
+        self.server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), _EchoHandler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.port = self.server.server_address[1]
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_reuses_connection(self):
+        """Test de reutilización de la conexión entre requests."""
+        async def run():
+            pool = ProtocolClientPool('127.0.0.1', self.port)
+            first = await pool.acquire()
+            self.assertEqual(await first.send_and_receive(b'uno', timeout=1.0), b'uno')
+            await pool.release(first)
+
+            second = await pool.acquire()
+            self.assertIs(second, first)
+            self.assertEqual(await second.send_and_receive(b'dos', timeout=1.0), b'dos')
+            await pool.release(second)
+            await pool.close()
+
+        asyncio.run(run())
+
+    def test_large_and_pipelined_messages(self):
+        """Test de mensajes grandes y de varios mensajes por el mismo recv."""
+        large = bytes(range(256)) * 8192  # 2 MB: no entra en el buffer intermedio
+        small = [str(i).encode() * (i % 7) for i in range(200)]
+
+        async def run():
+            pool = ProtocolClientPool('127.0.0.1', self.port)
+            client = await pool.acquire()
+            self.assertEqual(await client.send_and_receive(large, timeout=5.0), large)
+            self.assertEqual(await client.send_and_receive_many(small, timeout=5.0), small)
+            await pool.release(client)
+            await pool.close()
+
+        asyncio.run(run())
+
+    def test_pipelined_send_error_propagates(self):
+        """Test de que un envío fallido se propaga sin esperar el timeout."""
+        too_large = bytes(MAX_MESSAGE_SIZE + 1)
+
+        async def run():
+            pool = ProtocolClientPool('127.0.0.1', self.port)
+            client = await pool.acquire()
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            with self.assertRaisesRegex(ProtocolError, 'demasiado grande'):
+                await client.send_and_receive_many([b'ok', too_large], timeout=5.0)
+            self.assertLess(loop.time() - start, 2.0)
+            await pool.release(client, reusable=False)
+            await pool.close()
+
+        asyncio.run(run())
+
+    def test_discards_failed_connection(self):
+        """Test de que una conexión marcada como no reutilizable se cierra."""
+        async def run():
+            pool = ProtocolClientPool('127.0.0.1', self.port, max_size=1)
+            first = await pool.acquire()
+            await pool.release(first, reusable=False)
+            self.assertFalse(first.is_connected)
+
+            # El lugar liberado permite abrir otra conexión
+            second = await pool.acquire()
+            self.assertIsNot(second, first)
+            await pool.release(second)
+            await pool.close()
+
+        asyncio.run(run())
+
+
 if __name__ == '__main__':
     unittest.main()
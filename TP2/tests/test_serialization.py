@@ -5,10 +5,11 @@ Prueba las funcionalidades de serialización JSON y pickle,
 y la creación de mensajes de request/response.
 """
 
+import pickle
 import unittest
 from common.serialization import (
     serialize_json, deserialize_json,
-    serialize_pickle, deserialize_pickle,
+    serialize_pickle, serialize_pickle_parts, deserialize_pickle,
     encode_binary_to_base64, decode_base64_to_binary,
     create_request, create_response,
     validate_request, validate_response,
@@ -53,6 +54,37 @@ class TestSerialization(unittest.TestCase):
         self.assertEqual(deserialized['complex'], data['complex'])
         self.assertEqual(deserialized['set'], data['set'])
 
+    def test_pickle_out_of_band_buffers(self):
+        """Test de pickle con buffers out-of-band (bytearray)."""
+        data = {
+            'thumbnail': bytearray(b'\x89PNG' * 1000),
+            'meta': {'width': 200, 'height': 150}
+        }
+
+        serialized = serialize_pickle(data)
+        deserialized = deserialize_pickle(serialized)
+
+        self.assertEqual(deserialized['thumbnail'], data['thumbnail'])
+        self.assertEqual(deserialized['meta'], data['meta'])
+
+    def test_pickle_parts_zero_copy(self):
+        """Test de partes de pickle: los buffers out-of-band no se copian."""
+        thumbnail = bytearray(b'\x89PNG' * 1000)
+        data = {'thumbnail': pickle.PickleBuffer(thumbnail)}
+
+        parts = serialize_pickle_parts(data)
+
+        # El último buffer es una vista sobre el bytearray original
+        thumbnail[0] = 0
+        self.assertEqual(bytes(parts[-1][:1]), b'\x00')
+        self.assertEqual(b''.join(parts), serialize_pickle(data))
+        self.assertEqual(deserialize_pickle(b''.join(parts))['thumbnail'], thumbnail)
+
+    def test_deserialize_pickle_truncated(self):
+        """Test de pickle truncado."""
+        with self.assertRaises(SerializationError):
+            deserialize_pickle(b'\x00\x00')
+
     def test_base64_encoding(self):
         """Test de codificación/decodificación base64."""
         data = b'Hello, World!'